@@ -1,24 +1,28 @@
 import math
-import random
+import time
 
+from AI.EvaluationCache import EvaluationCache
 from Tetris_Game.Controls import Turn, Direction
-from Tetris_Game.MainGame import Tetris
-from Tetris_Game.Settings import GRID_ROW_COUNT, GRID_COL_COUNT
+from Tetris_Game.Settings import *
 
 
 class Agent:
-    def __init__(self, game: Tetris):
+    def __init__(self, game, evaluation_cache: EvaluationCache = None):
+        """
+        :param game: Tetris or HeadlessTetris game played by the agent
+        :param evaluation_cache: optional cache of placement evaluations
+        """
         self.game = game
+        # optional cache of placement evaluations, shared with other agents
+        self.evaluation_cache = evaluation_cache
 
-        self.one_turn = ['O']
-        self.two_turns = ['I', 'S', 'Z']
-        self.four_turns = ['T', 'L', 'J']
-
-        self.weight_line_cleared = 2 * random.random() - 1
-        self.weight_aggregate_height = 2 * random.random() - 1
-        self.weight_holes = 2 * random.random() - 1
-        self.weight_bumpiness = 2 * random.random() - 1
-        self.mutation_weight = random.random()
+        # weights of the "optimal" fitness function until set_weights, agents of a training get the random
+        # weights of their row of the population
+        self.weight_line_cleared = WEIGHT_LINE_CLEARED
+        self.weight_aggregate_height = WEIGHT_AGGREGATE_HEIGHT
+        self.weight_holes = WEIGHT_HOLES
+        self.weight_bumpiness = WEIGHT_BUMPINESS
+        self.mutation_weight = 0
 
     def set_weights(self, weight_line_cleared, weight_aggregate_height, weight_holes,
                     weight_bumpiness, mutation_chance):
@@ -28,6 +32,11 @@ class Agent:
         self.weight_bumpiness = weight_bumpiness
         self.mutation_weight = mutation_chance
 
+    def get_weights(self) -> tuple:
+        """:return: weights of the agent in the order of set_weights"""
+        return (self.weight_line_cleared, self.weight_aggregate_height, self.weight_holes,
+                self.weight_bumpiness, self.mutation_weight)
+
     def _weight_position(self, lines_cleared, height_sum, hole_count, bumpiness):
         score = self.weight_line_cleared * lines_cleared**5
         score += self.weight_aggregate_height * height_sum
@@ -35,7 +44,13 @@ class Agent:
         score += self.weight_bumpiness * bumpiness
         return score
 
-    def _evaluate_every_position(self, turns: int):
+    def _get_placements(self, board, shape_form, y):
+        """:return: evaluation of every placement of the shape, from the evaluation cache if the agent has one"""
+        if self.evaluation_cache is None:
+            return board.evaluate_all_placements(shape_form, y)
+        return self.evaluation_cache.get_placements(board, shape_form, y)
+
+    def _evaluate_every_position(self):
         # get game board
         board = self.game.tetris_model.game_board
         # get current shape that needs to be placed
@@ -46,40 +61,31 @@ class Agent:
                      "move": 0,
                      "score": -math.inf
                      }
-        # for every turn
-        for i in range(turns):
-            # for every position shape can be placed
-            for x in range(0, GRID_COL_COUNT - len(current_shape.shape) + 1):
-                val = board.evaluate_position(current_shape.shape, x, current_shape.y)
-                if not val["valid"]:
-                    continue
-                # score if the shape would be placed at the current position
-                score = self._weight_position(val["lines_cleared"],
-                                              val["max_heights"],
-                                              val["number_of_holes"],
-                                              val["bumpiness"])
-                # test if current score is better than best score
-                if score > best_move["score"]:
-                    best_move["turn"] = i
-                    best_move["move"] = x - current_shape.x
-                    best_move["score"] = score
-
-            # turn shape back to starting position
-            current_shape.shape = current_shape.turned(Turn.LEFT_TURN)
+        number_of_orientations = len(current_shape.orientations)
+        # evaluation of every orientation at every position the shape can be placed
+        placements = self._get_placements(board, current_shape.shape_form, current_shape.y)
+        for i in range(placements.size):
+            # score if the shape would be placed at the current position
+            score = self._weight_position(placements.lines_cleared[i],
+                                          placements.aggregate_height[i],
+                                          placements.number_of_holes[i],
+                                          placements.bumpiness[i])
+            # test if current score is better than best score
+            if score > best_move["score"]:
+                # left turns needed from the current orientation of the shape
+                best_move["turn"] = (placements.turns[i] - current_shape.turns) % number_of_orientations
+                best_move["move"] = placements.x[i] - current_shape.x
+                best_move["score"] = score
 
         return best_move
 
-    def calculate_next_move(self):
-        # get current shape that needs to be placed
-        current_shape = self.game.tetris_model.get_current_shape()
+    def _find_best_move(self):
+        """:return: left turns and shift of the current shape to its best placement"""
+        return self._evaluate_every_position()
 
+    def calculate_next_move(self):
         # find best move
-        if current_shape.name in self.one_turn:
-            next_move = self._evaluate_every_position(1)
-        elif current_shape.name in self.two_turns:
-            next_move = self._evaluate_every_position(2)
-        else:
-            next_move = self._evaluate_every_position(4)
+        next_move = self._find_best_move()
 
         # execute best move
         for i in range(next_move["turn"]):
@@ -92,30 +98,286 @@ class Agent:
 
         # self.game.tetris_controller.drop(True)
 
-    def mutate_value(self, value: float):
-        # random value in (-1, 1)
-        mutation_value = 2 * random.random() - 1
-        return (value + mutation_value * self.mutation_weight) / 2
 
-    def get_mutation_value(self, agent, value_1, value_2):
-        return self.mutate_value(value_1) * 0.5 + agent.mutate_value(value_2) * 0.5
+class LookaheadAgent(Agent):
+    """
+    agent that places the current shape by a beam search over the current shape and the preview shape. the
+    score of a path is the score of the lines it clears plus the score of the board it ends in
+    """
+
+    def __init__(self, game, evaluation_cache: EvaluationCache = None, beam_width=LOOKAHEAD_BEAM_WIDTH,
+                 depth=LOOKAHEAD_DEPTH, prune_margin=LOOKAHEAD_PRUNE_MARGIN, max_nodes=LOOKAHEAD_MAX_NODES,
+                 time_budget=LOOKAHEAD_TIME_BUDGET):
+        """
+        :param beam_width: number of placements expanded at every depth
+        :param depth: number of shapes searched, at most the current and the preview shape
+        :param prune_margin: placements scoring more than this below the best placement are never expanded
+        :param max_nodes: number of evaluated placements after which the search stops
+        :param time_budget: seconds after which the search stops, no limit if None
+        """
+        super().__init__(game, evaluation_cache)
+        self.beam_width = beam_width
+        self.depth = depth
+        self.prune_margin = prune_margin
+        self.max_nodes = max_nodes
+        self.time_budget = time_budget
+
+        # shape the last search was done for and the orientation and column found for it
+        self.planned_shape = None
+        self.planned_turns = 0
+        self.planned_x = 0
+        # number of evaluated placements of the last search
+        self.number_of_nodes = 0
+
+    def _find_best_move(self):
+        tetris_model = self.game.tetris_model
+        current_shape = tetris_model.get_current_shape()
+        # search only once per shape, later ticks only continue moving to the planned placement
+        if current_shape is not self.planned_shape:
+            self.planned_shape = current_shape
+            self.planned_turns, self.planned_x = self._search(tetris_model.game_board, current_shape,
+                                                              tetris_model.get_next_shape().shape_form)
+        return {"turn": (self.planned_turns - current_shape.turns) % len(current_shape.orientations),
+                "move": self.planned_x - current_shape.x}
+
+    def _search(self, board, current_shape, next_shape_form):
+        """:return: number of left turns and column of the current shape of the best path"""
+        deadline = math.inf if self.time_budget is None else time.perf_counter() + self.time_budget
+        placements = self._get_placements(board, current_shape.shape_form, current_shape.y)
+        self.number_of_nodes = placements.size
+        beam = self._prune(self._expand(placements, current_shape.shape_form, (), 0))
+        if len(beam) == 0:
+            return current_shape.turns, current_shape.x
+
+        for shape_form in [next_shape_form][:self.depth - 1]:
+            candidates = []
+            for _, path, line_score in beam:
+                # a level that was not searched completely is not comparable to the previous one
+                if self.number_of_nodes >= self.max_nodes or time.perf_counter() > deadline:
+                    return beam[0][1][0][1:]
+                tokens = []
+                for placement in path:
+                    token = board.apply(placement)
+                    if token is None:
+                        break
+                    tokens.append(token)
+                if len(tokens) == len(path):
+                    placements = self._get_placements(board, shape_form, GRID_ROW_COUNT - 1)
+                    self.number_of_nodes += placements.size
+                    candidates += self._expand(placements, shape_form, path, line_score)
+                for token in reversed(tokens):
+                    board.undo(token)
+            # every path of the beam ends the game
+            if len(candidates) == 0:
+                break
+            beam = self._prune(candidates)
+        # orientation and column of the first placement of the best path
+        return beam[0][1][0][1:]
+
+    def _expand(self, placements, shape_form, path, line_score):
+        """:return: score, placements and score of the cleared lines of every path extended by a placement"""
+        candidates = []
+        for i in range(placements.size):
+            new_line_score = line_score + self.weight_line_cleared * placements.lines_cleared[i]**5
+            score = new_line_score + self._weight_position(0, placements.aggregate_height[i],
+                                                           placements.number_of_holes[i], placements.bumpiness[i])
+            candidates.append((score, path + ((shape_form, placements.turns[i], placements.x[i]),), new_line_score))
+        return candidates
+
+    def _prune(self, candidates):
+        """:return: best candidates that are not worse than the best candidate by more than the prune margin"""
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        if len(candidates) == 0:
+            return candidates
+        bound = candidates[0][0] - self.prune_margin
+        return [candidate for candidate in candidates[:self.beam_width] if candidate[0] >= bound]
+
+
+def weight_placement(weights, lines_cleared, height_sum, hole_count, bumpiness):
+    """:return: score of a placement like Agent._weight_position for weights in the order of Agent.set_weights"""
+    weight_line_cleared, weight_aggregate_height, weight_holes, weight_bumpiness = weights[:4]
+    return (weight_line_cleared * lines_cleared**5 + weight_aggregate_height * height_sum
+            + weight_holes * hole_count + weight_bumpiness * bumpiness)
+
+
+def evaluate_chance_node(board, distribution, weights) -> float:
+    """
+    expected score of the best placement of a shape drawn from the distribution, leaf of the expectimax search.
+    runs in a worker process if the agent has an executor
+
+    :param board: board the shape is placed on
+    :param distribution: (shape form value, count) of every shape form that can be drawn
+    :param weights: weights of the agent in the order of Agent.set_weights
+    :return: expected score, -inf if a shape that can be drawn cannot be placed anymore
+    """
+    total = sum(count for _, count in distribution)
+    result = 0
+    for shape_form, count in distribution:
+        placements = board.evaluate_all_placements(shape_form)
+        best_score = -math.inf
+        for i in range(placements.size):
+            score = weight_placement(weights, placements.lines_cleared[i], placements.aggregate_height[i],
+                                     placements.number_of_holes[i], placements.bumpiness[i])
+            if score > best_score:
+                best_score = score
+        result += count / total * best_score
+    return result
+
+
+class ExpectimaxAgent(LookaheadAgent):
+    """
+    agent that searches the current and the preview shape like LookaheadAgent and averages the shapes that
+    follow them over all shapes that can still be drawn. chance nodes are cached by the zobrist hash of their
+    board, leaves are evaluated in one batch, by the worker pool of the executor if the agent has one
+    """
+
+    def __init__(self, game, evaluation_cache: EvaluationCache = None, executor=None,
+                 beam_width=EXPECTIMAX_BEAM_WIDTH, depth=EXPECTIMAX_DEPTH, prune_margin=LOOKAHEAD_PRUNE_MARGIN,
+                 max_nodes=EXPECTIMAX_MAX_NODES, time_budget=EXPECTIMAX_TIME_BUDGET, use_bag=EXPECTIMAX_USE_BAG):
+        """
+        :param executor: executor the leaves are evaluated by, evaluated by the agent itself if None
+        :param depth: number of unknown shapes searched after the current and the preview shape
+        :param use_bag: average over the shapes left in the current bag instead of all seven shapes
+        """
+        super().__init__(game, evaluation_cache, beam_width, depth, prune_margin, max_nodes, time_budget)
+        self.executor = executor
+        self.use_bag = use_bag
+        # expected score of already expanded chance nodes by zobrist hash, distribution and depth. only nodes whose
+        # subtree was searched without running out of budget are cached
+        self.chance_cache = {}
+        # number of max nodes of the current search that stopped expanding because the budget was used
+        self.number_of_truncations = 0
+        # boards and distributions of the leaves waiting for their evaluation by the executor
+        self.pending_leaves = {}
+        # time after which the current search stops expanding nodes, set at the start of every search
+        self.deadline = math.inf
+
+    def set_weights(self, weight_line_cleared, weight_aggregate_height, weight_holes,
+                    weight_bumpiness, mutation_chance):
+        super().set_weights(weight_line_cleared, weight_aggregate_height, weight_holes,
+                            weight_bumpiness, mutation_chance)
+        # cached scores depend on the weights
+        self.chance_cache = {}
+
+    def get_distribution(self) -> tuple:
+        """:return: (shape form value, count) of every shape that can follow the preview shape"""
+        shapes = self.game.tetris_model.shapes
+        # shapes of the current bag after the current and the preview shape
+        remaining_shapes = shapes[:len(shapes) - 2]
+        if not self.use_bag or len(remaining_shapes) == 0:
+            return tuple((shape_form, 1) for shape_form in range(1, len(SHAPES_ID) + 1))
+        counts = {}
+        for shape in remaining_shapes:
+            counts[int(shape.shape_form)] = counts.get(int(shape.shape_form), 0) + 1
+        return tuple(sorted(counts.items()))
+
+    def _search(self, board, current_shape, next_shape_form):
+        self.deadline = math.inf if self.time_budget is None else time.perf_counter() + self.time_budget
+        self.number_of_nodes = 0
+        self.number_of_truncations = 0
+        if len(self.chance_cache) > EXPECTIMAX_CACHE_SIZE:
+            self.chance_cache = {}
+
+        # expand the tree first, so that all uncached leaves can be evaluated in one batch
+        shapes = ((current_shape.shape_form, current_shape.y), (next_shape_form, GRID_ROW_COUNT - 1))
+        root = self._expand_max_node(board, shapes, self.get_distribution(), self.depth)
+        self._evaluate_pending_leaves()
+        if len(root) == 0:
+            return current_shape.turns, current_shape.x
+
+        best_placement = max(root, key=lambda child: child[0] + self._get_value(child[2]))[1]
+        return best_placement[1:]
+
+    def _expand_max_node(self, board, shapes, distribution, depth):
+        """
+        :param shapes: known shapes that still have to be placed and their positions
+        :return: score of the lines cleared, placement and child node of every placement that is searched
+        """
+        shape_form, y = shapes[0]
+        placements = self._get_placements(board, shape_form, y)
+        self.number_of_nodes += placements.size
+        candidates = self._prune(self._expand(placements, shape_form, (), 0))
+
+        children = []
+        for _, path, line_score in candidates:
+            # search stops expanding once the budget is used, but every node keeps at least one child
+            if len(children) > 0 and (self.number_of_nodes >= self.max_nodes or
+                                      time.perf_counter() > self.deadline):
+                self.number_of_truncations += 1
+                break
+            token = board.apply(path[0])
+            if token is None:
+                continue
+            if len(shapes) > 1:
+                child = ("max", self._expand_max_node(board, shapes[1:], distribution, depth))
+            else:
+                child = self._expand_chance_node(board, distribution, depth)
+            board.undo(token)
+            children.append((line_score, path[0], child))
+        return children
 
-    def get_child(self, agent, game):
-        weight_holes = self.get_mutation_value(agent, self.weight_holes, agent.weight_holes)
+    def _expand_chance_node(self, board, distribution, depth):
+        """:return: node of the expected score of the shapes of the distribution on the board"""
+        key = (board.zobrist_hash, distribution, depth)
+        if key in self.chance_cache or key in self.pending_leaves:
+            return "cached", key
+        if depth == 1:
+            self.number_of_nodes += len(distribution)
+            if self.executor is None:
+                self.chance_cache[key] = evaluate_chance_node(board, distribution, self.get_weights())
+            else:
+                self.pending_leaves[key] = (board.clone(), distribution)
+            return "cached", key
 
-        weight_bumpiness = self.get_mutation_value(agent, self.weight_bumpiness, agent.weight_bumpiness)
+        total = sum(count for _, count in distribution)
+        number_of_truncations = self.number_of_truncations
+        outcomes = []
+        for shape_form, count in distribution:
+            # shape is not in the bag anymore after it was drawn
+            next_distribution = tuple((form, number - (form == shape_form)) for form, number in distribution
+                                      if number - (form == shape_form) > 0)
+            if len(next_distribution) == 0:
+                next_distribution = tuple((form, 1) for form in range(1, len(SHAPES_ID) + 1))
+            children = self._expand_max_node(board, ((shape_form, GRID_ROW_COUNT - 1),), next_distribution,
+                                             depth - 1)
+            outcomes.append((count / total, children))
+        return "chance", (key, outcomes, self.number_of_truncations == number_of_truncations)
 
-        weight_line_cleared = self.get_mutation_value(agent, self.weight_line_cleared, agent.weight_line_cleared)
+    def _evaluate_pending_leaves(self):
+        """evaluates every leaf that was expanded but not evaluated yet in one batch by the executor"""
+        if len(self.pending_leaves) == 0:
+            return
+        keys = list(self.pending_leaves)
+        boards = [self.pending_leaves[key][0] for key in keys]
+        distributions = [self.pending_leaves[key][1] for key in keys]
+        weights = self.get_weights()
+        values = self.executor.map(evaluate_chance_node, boards, distributions, [weights] * len(keys),
+                                   chunksize=max(1, len(keys) // EXPECTIMAX_CHUNKS_PER_SEARCH))
+        for key, value in zip(keys, values):
+            self.chance_cache[key] = value
+        self.pending_leaves = {}
 
-        weight_aggregate_height = self.get_mutation_value(agent, self.weight_aggregate_height,
-                                                          agent.weight_aggregate_height)
+    def _get_value(self, node) -> float:
+        """:return: expected score of the node, complete chance nodes are cached after their first evaluation"""
+        kind, content = node
+        if kind == "cached":
+            return self.chance_cache[content]
+        if kind == "max":
+            return max((line_score + self._get_value(child) for line_score, _, child in content), default=-math.inf)
+        key, outcomes, complete = content
+        value = 0
+        for probability, children in outcomes:
+            value += probability * max((line_score + self._get_value(child) for line_score, _, child in children),
+                                       default=-math.inf)
+        # the value of a subtree cut short by the budget is not exact, a later search expands it again
+        if complete:
+            self.chance_cache[key] = value
+        return value
 
-        mutation_chance = self.get_mutation_value(agent, self.mutation_weight, agent.mutation_weight)
 
-        result_agent = Agent(game)
-        result_agent.set_weights(weight_line_cleared=weight_line_cleared,
-                                 weight_aggregate_height=weight_aggregate_height,
-                                 weight_bumpiness=weight_bumpiness,
-                                 weight_holes=weight_holes,
-                                 mutation_chance=mutation_chance)
-        return result_agent
+# agents the population of a training can consist of
+AGENT_TYPES = {
+    "greedy": Agent,
+    "lookahead": LookaheadAgent,
+    "expectimax": ExpectimaxAgent,
+}
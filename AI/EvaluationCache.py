@@ -0,0 +1,110 @@
+import sys
+from collections import OrderedDict
+
+from Tetris_Game.Board import PlacementBuffer
+from Tetris_Game.Settings import GRID_ROW_COUNT
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+# estimated size of the key, the entry object and the dictionary slot of every entry
+ENTRY_OVERHEAD_BYTES = 400
+# height of the highest orientation of all shapes
+MAX_SHAPE_HEIGHT = max(orientation.height for orientations in SHAPE_ORIENTATIONS.values()
+                       for orientation in orientations)
+
+
+class CachedPlacements:
+    """immutable copy of the valid entries of a placement buffer, has the same fields as PlacementBuffer"""
+
+    __slots__ = ("size", "turns", "x", "lines_cleared", "aggregate_height", "number_of_holes", "bumpiness")
+
+    def __init__(self, placements: PlacementBuffer):
+        size = placements.size
+        self.size = size
+        self.turns = placements.turns[:size]
+        self.x = placements.x[:size]
+        self.lines_cleared = placements.lines_cleared[:size]
+        self.aggregate_height = placements.aggregate_height[:size]
+        self.number_of_holes = placements.number_of_holes[:size]
+        self.bumpiness = placements.bumpiness[:size]
+
+    def get_size_in_bytes(self) -> int:
+        """:return: estimated memory used by this entry"""
+        arrays_size = sum(sys.getsizeof(values) for values in (self.turns, self.x, self.lines_cleared,
+                                                               self.aggregate_height, self.number_of_holes,
+                                                               self.bumpiness))
+        return arrays_size + ENTRY_OVERHEAD_BYTES
+
+
+class EvaluationCache:
+    """
+    least recently used cache of the raw features of every placement of a shape on a board. the features
+    do not depend on the weights of an agent, so one cache can be shared by every agent of a population
+    """
+
+    def __init__(self, max_size_in_bytes: int):
+        """
+        :param max_size_in_bytes: memory bound of all entries, least recently used entries are evicted above it
+        """
+        self.max_size_in_bytes = max_size_in_bytes
+        self.size_in_bytes = 0
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def get_key(board, shape_form, y) -> tuple:
+        """
+        :param board: board the shape is placed on, identified by its zobrist hash
+        :param shape_form: form of the shape
+        :param y: position of the shape, placements only depend on it if the shape already fell into the board
+        :return: key of the placements of the shape on the board
+        """
+        # every position above the highest column has the same placements as the starting position
+        if y + 1 - MAX_SHAPE_HEIGHT >= max(board.get_col_heights()):
+            y = GRID_ROW_COUNT - 1
+        return board.zobrist_hash, int(shape_form), y
+
+    def get_placements(self, board, shape_form, y):
+        """
+        :return: evaluation of every placement of the shape on the board like board.evaluate_all_placements,
+        evaluated only if the board and shape are not in the cache yet
+        """
+        key = self.get_key(board, shape_form, y)
+        placements = self.entries.get(key)
+        if placements is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return placements
+
+        self.misses += 1
+        placements = CachedPlacements(board.evaluate_all_placements(shape_form, y))
+        self._insert(key, placements)
+        return placements
+
+    def _insert(self, key, placements: CachedPlacements):
+        entry_size = placements.get_size_in_bytes()
+        # entries larger than the whole cache are never stored
+        if entry_size > self.max_size_in_bytes:
+            return
+        self.entries[key] = placements
+        self.size_in_bytes += entry_size
+        # evict least recently used entries until the cache is inside of its bound again
+        while self.size_in_bytes > self.max_size_in_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size_in_bytes -= evicted.get_size_in_bytes()
+            self.evictions += 1
+
+    def get_hit_rate(self) -> float:
+        """:return: share of lookups that were answered by the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def clear(self):
+        """removes every entry, counters are kept"""
+        self.entries.clear()
+        self.size_in_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+
+from Tetris_Game.Settings import *
+
+# columns of the weight matrix in the order of Agent.set_weights, the last one is the mutation chance
+NUMBER_OF_WEIGHTS = 5
+MUTATION_CHANCE = NUMBER_OF_WEIGHTS - 1
+SELECTION_TYPES = ("best", "tournament")
+
+
+def _get_generator() -> np.random.Generator:
+    """:return: generator seeded by the random module, so the state of the random module also restores it"""
+    return np.random.default_rng(random.getrandbits(64))
+
+
+class Population:
+    """
+    weights of every agent as the rows of one (number_of_agents, 5) matrix and the fitness of the last generation.
+    a new generation is bred for all agents at once, agents only copy the weights of their row
+    """
+
+    def __init__(self, number_of_agents: int, selection=GA_SELECTION, number_of_elites=GA_ELITES,
+                 tournament_size=GA_TOURNAMENT_SIZE):
+        """
+        :param selection: "best" breeds every child from the best agent and the next agent of the ranking,
+        "tournament" breeds it from the winners of two tournaments
+        :param number_of_elites: best agents that are part of the next generation without a change
+        :param tournament_size: agents of every tournament
+        """
+        if selection not in SELECTION_TYPES:
+            raise ValueError("Value {} is no valid selection".format(selection))
+        self.selection = selection
+        self.number_of_elites = min(max(number_of_elites, 0), number_of_agents)
+        self.tournament_size = max(tournament_size, 1)
+
+        generator = _get_generator()
+        # random weights in (-1, 1) and a random mutation chance in (0, 1)
+        self.weights = generator.uniform(-1, 1, (number_of_agents, NUMBER_OF_WEIGHTS))
+        self.weights[:, MUTATION_CHANCE] = generator.uniform(0, 1, number_of_agents)
+        self.fitness = np.zeros(number_of_agents)
+
+    def __len__(self):
+        return len(self.weights)
+
+    def set_fitness(self, fitness):
+        """:param fitness: score of every agent in the order of the rows"""
+        self.fitness = np.asarray(fitness, dtype=np.float64)
+
+    def get_ranking(self) -> np.ndarray:
+        """:return: rows sorted by descending fitness, rows with the same fitness keep their order"""
+        return np.argsort(-self.fitness, kind="stable")
+
+    def _select_tournament_winners(self, generator: np.random.Generator, number_of_winners: int) -> np.ndarray:
+        """:return: fittest row of number_of_winners tournaments between random rows"""
+        candidates = generator.integers(0, len(self), (number_of_winners, self.tournament_size))
+        return candidates[np.arange(number_of_winners), np.argmax(self.fitness[candidates], axis=1)]
+
+    def breed(self):
+        """
+        replaces the weights by the next generation: the elites and a child of two parents for every other row.
+        every weight of a child is the mean of the mutated weights of its parents
+        """
+        generator = _get_generator()
+        ranking = self.get_ranking()
+        number_of_children = len(self) - self.number_of_elites
+        if self.selection == "best":
+            first_parents = np.repeat(ranking[:1], number_of_children)
+            second_parents = ranking[self.number_of_elites:]
+        else:
+            first_parents = self._select_tournament_winners(generator, number_of_children)
+            second_parents = self._select_tournament_winners(generator, number_of_children)
+
+        children = (self._mutate(generator, self.weights[first_parents])
+                    + self._mutate(generator, self.weights[second_parents])) / 2
+        self.weights = np.concatenate((self.weights[ranking[:self.number_of_elites]], children))
+        self.fitness = np.zeros(len(self))
+
+    @staticmethod
+    def _mutate(generator: np.random.Generator, weights: np.ndarray) -> np.ndarray:
+        """:return: weights moved by a random value in (-1, 1) times the mutation chance of their row, halved"""
+        mutation_values = generator.uniform(-1, 1, weights.shape)
+        return (weights + mutation_values * weights[:, MUTATION_CHANCE:]) / 2
+
+    def apply(self, agents: list):
+        """sets the weights of every agent to its row"""
+        for agent, weights in zip(agents, self.weights.tolist()):
+            agent.set_weights(*weights)
+
+    def get_weights(self) -> list:
+        """:return: weights of every row as tuples like Agent.get_weights"""
+        return [tuple(weights) for weights in self.weights.tolist()]
@@ -0,0 +1,292 @@
+"""
+benchmarks of the board engines, the agent, whole generations and the renderer with fixed seeds. the batch engine
+only plays generations. run from the repository with
+
+    python -m Benchmark.Benchmarks --output benchmark.json --compare old_benchmark.json
+
+every result has a median, a minimum and a unit. pieces per second are better if higher, all other units if lower
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from AI.AI_Agent import Agent
+from Parallel.HeadlessTraining import BATCH_ENGINE, play_batch_games
+from Tetris_Game.GameCore import BOARD_ENGINES, HeadlessTetris
+from Tetris_Game.Settings import *
+from Tetris_Game.Shape import Shape
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+BENCHMARK_SEED = 2021
+BENCHMARK_WEIGHTS = (WEIGHT_LINE_CLEARED, WEIGHT_AGGREGATE_HEIGHT, WEIGHT_HOLES, WEIGHT_BUMPINESS, 0.5)
+# units of results that are better if they are higher
+HIGHER_IS_BETTER = {"pieces/s"}
+# engines of every benchmark, the batch engine only plays whole generations
+ENGINES = tuple(BOARD_ENGINES) + (BATCH_ENGINE,)
+
+
+def summarize(values: list, unit: str, **details) -> dict:
+    """:return: result of a benchmark with the median and minimum of the measured values"""
+    result = {"median": statistics.median(values), "min": min(values), "unit": unit, "samples": len(values)}
+    result.update(details)
+    return result
+
+
+def get_positions(board_engine: str, number_of_boards: int, seed=BENCHMARK_SEED) -> list:
+    """
+    plays a seeded game with an agent and takes a copy of the board before every placement
+
+    :return: list of boards with the shape form that is placed next
+    """
+    positions = []
+    game = HeadlessTetris(board_engine=board_engine, seed=seed)
+    agent = Agent(game)
+    agent.set_weights(*BENCHMARK_WEIGHTS)
+    tetris_model = game.tetris_model
+    while len(positions) < number_of_boards:
+        if tetris_model.game_over:
+            game.reset(seed + len(positions))
+        positions.append((tetris_model.game_board.clone(), tetris_model.get_current_shape().shape_form))
+        agent.calculate_next_move()
+        game.tetris_controller.drop_to_landing()
+    return positions
+
+
+def get_game(board_engine: str, board, shape_form) -> HeadlessTetris:
+    """:return: game on a copy of the board with a shape of the shape form at its spawn position as current shape"""
+    game = HeadlessTetris(board_engine=board_engine, seed=BENCHMARK_SEED)
+    tetris_model = game.tetris_model
+    tetris_model.game_board = board.clone()
+    # shapes are bound to the board they were created for, so they are created again for the copy
+    tetris_model.shapes.clear()
+    game.tetris_controller.generate_shapes()
+    tetris_model.shapes.append(Shape(shape_form, tetris_model.game_board, GRID_COL_COUNT // 2, GRID_ROW_COUNT - 1))
+    return game
+
+
+def get_placements(positions: list) -> list:
+    """:return: board, shape, x and y of every orientation of the next shape at every column at the spawn row"""
+    placements = []
+    for board, shape_form in positions:
+        for orientation in SHAPE_ORIENTATIONS[int(shape_form)]:
+            for x in range(GRID_COL_COUNT - orientation.width + 1):
+                placements.append((board, orientation.shape, x, GRID_ROW_COUNT - 1))
+    return placements
+
+
+def time_calls(function, calls: list, repeats: int) -> list:
+    """
+    :param function: called with every argument tuple of calls
+    :param calls: argument tuples
+    :param repeats: number of times all calls are timed
+    :return: nanoseconds per call of every repetition
+    """
+    results = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for arguments in calls:
+            function(*arguments)
+        results.append((time.perf_counter_ns() - start) / len(calls))
+    return results
+
+
+def run_micro_benchmarks(board_engine: str, number_of_boards=200, repeats=5) -> dict:
+    """:return: nanoseconds per call of the board operations and of an agent move"""
+    positions = get_positions(board_engine, number_of_boards)
+    placements = get_placements(positions)
+    results = {}
+
+    results["distance_to_collision"] = summarize(time_calls(
+        lambda board, shape, x, y: board.distance_to_collision(shape, x, y), placements, repeats), "ns/call")
+    results["evaluate_position"] = summarize(time_calls(
+        lambda board, shape, x, y: board.evaluate_position(shape, x, y), placements, repeats), "ns/call")
+
+    # placing changes the board, every repetition places the shapes on fresh copies
+    place_times = []
+    remove_times = []
+    for _ in range(repeats):
+        calls = [(board.clone(), shape, x, y) for board, shape, x, y in placements]
+        place_times += time_calls(lambda board, shape, x, y: board.place_shape(shape, x, y), calls, 1)
+        remove_times += time_calls(lambda board, shape, x, y: board.remove_full_rows(), calls, 1)
+    results["place_shape"] = summarize(place_times, "ns/call")
+    results["remove_full_rows"] = summarize(remove_times, "ns/call")
+
+    move_times = []
+    for _ in range(repeats):
+        agents = []
+        for board, shape_form in positions:
+            agent = Agent(get_game(board_engine, board, shape_form))
+            agent.set_weights(*BENCHMARK_WEIGHTS)
+            agents.append((agent,))
+        move_times += time_calls(Agent.calculate_next_move, agents, 1)
+    results["agent_calculate_next_move"] = summarize(move_times, "ns/call")
+    return results
+
+
+def play_game(board_engine: str, weights: tuple, seed: int, max_pieces: int) -> int:
+    """:return: number of shapes placed in a headless game of a greedy agent without an evaluation cache"""
+    game = HeadlessTetris(board_engine=board_engine, seed=seed)
+    agent = Agent(game)
+    agent.set_weights(*weights)
+    tetris_model = game.tetris_model
+    while not tetris_model.game_over and tetris_model.pieces < max_pieces:
+        agent.calculate_next_move()
+        game.tetris_controller.drop_to_landing()
+    return tetris_model.pieces
+
+
+def run_game_benchmark(board_engine: str, max_pieces=HEADLESS_MAX_PIECES, seeds=(BENCHMARK_SEED,)) -> dict:
+    """:return: pieces per second of whole headless games of an agent"""
+    pieces_per_second = []
+    number_of_pieces = 0
+    for seed in seeds:
+        start = time.perf_counter()
+        pieces = play_game(board_engine, BENCHMARK_WEIGHTS, seed, max_pieces)
+        pieces_per_second.append(pieces / (time.perf_counter() - start))
+        number_of_pieces += pieces
+    return summarize(pieces_per_second, "pieces/s", pieces=number_of_pieces)
+
+
+def get_generation_weights(number_of_agents: int) -> list:
+    """:return: seeded weights of the agents of a generation around the benchmark weights"""
+    randomizer = random.Random(BENCHMARK_SEED)
+    return [tuple(weight + randomizer.uniform(-0.2, 0.2) for weight in BENCHMARK_WEIGHTS)
+            for _ in range(number_of_agents)]
+
+
+def run_generation_benchmark(board_engine: str, number_of_agents: int, max_pieces=HEADLESS_MAX_PIECES,
+                             repeats=1) -> dict:
+    """
+    :return: pieces per second of a generation of greedy agents that play a game of the same seed in this
+    process, one game after another or all at once with the batch engine. every engine places the same pieces
+    """
+    agent_weights = get_generation_weights(number_of_agents)
+    pieces_per_second = []
+    number_of_pieces = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if board_engine == BATCH_ENGINE:
+            number_of_pieces = sum(result.pieces for result in play_batch_games(agent_weights, (BENCHMARK_SEED,),
+                                                                                 max_pieces))
+        else:
+            number_of_pieces = sum(play_game(board_engine, weights, BENCHMARK_SEED, max_pieces)
+                                   for weights in agent_weights)
+        pieces_per_second.append(number_of_pieces / (time.perf_counter() - start))
+    return summarize(pieces_per_second, "pieces/s", pieces=number_of_pieces)
+
+
+def run_render_benchmark(board_engine: str, number_of_games: int, number_of_frames=60, warm_up_frames=5) -> dict:
+    """:return: milliseconds of TetrisParallelView.draw for a number of rendered games, one step per frame"""
+    # imported here, the other benchmarks run without pygame
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from Parallel.TetrisParallel import TetrisParallelController, TetrisParallelModel, TetrisParallelView
+
+    random.seed(BENCHMARK_SEED)
+    model = TetrisParallelModel(number_of_games, board_engine)
+    model.randomizer.seed(BENCHMARK_SEED)
+    view = TetrisParallelView(model)
+    controller = TetrisParallelController(model)
+    frame_times = []
+    for frame in range(warm_up_frames + number_of_frames):
+        controller.step()
+        start = time.perf_counter()
+        view.draw()
+        if frame >= warm_up_frames:
+            frame_times.append((time.perf_counter() - start) * 1000)
+    return summarize(frame_times, "ms/frame", p95=sorted(frame_times)[int(0.95 * (len(frame_times) - 1))])
+
+
+def run_benchmarks(board_engines=ENGINES, numbers_of_games=(18, 100, 500), quick=False, render=True,
+                   number_of_agents=100) -> dict:
+    """
+    :param number_of_agents: agents of the generation benchmark
+    :return: results of every benchmark of every board engine with information about the machine
+    """
+    results = {
+        "meta": {
+            "seed": BENCHMARK_SEED,
+            "quick": quick,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "engines": {},
+    }
+    for board_engine in board_engines:
+        generation_result = run_generation_benchmark(board_engine, number_of_agents, 50 if quick else 200)
+        if board_engine == BATCH_ENGINE:
+            results["engines"][board_engine] = {"generation_{}_agents".format(number_of_agents): generation_result}
+            continue
+        engine_results = run_micro_benchmarks(board_engine, 50 if quick else 200, 3 if quick else 5)
+        engine_results["headless_game"] = run_game_benchmark(
+            board_engine, 100 if quick else HEADLESS_MAX_PIECES,
+            (BENCHMARK_SEED,) if quick else (BENCHMARK_SEED, BENCHMARK_SEED + 1, BENCHMARK_SEED + 2))
+        engine_results["generation_{}_agents".format(number_of_agents)] = generation_result
+        if render:
+            for number_of_games in numbers_of_games:
+                engine_results["render_{}_games".format(number_of_games)] = run_render_benchmark(
+                    board_engine, number_of_games, 10 if quick else 60)
+        results["engines"][board_engine] = engine_results
+    return results
+
+
+def compare(old_results: dict, new_results: dict, max_regression: float) -> list:
+    """
+    :param max_regression: share by which a median may get worse before it is a regression
+    :return: name, old median and new median of every regression
+    """
+    regressions = []
+    for board_engine, engine_results in new_results["engines"].items():
+        old_engine_results = old_results["engines"].get(board_engine, {})
+        for name, result in engine_results.items():
+            if name not in old_engine_results or old_engine_results[name]["unit"] != result["unit"]:
+                continue
+            old_median = old_engine_results[name]["median"]
+            new_median = result["median"]
+            if result["unit"] in HIGHER_IS_BETTER:
+                regressed = new_median < old_median * (1 - max_regression)
+            else:
+                regressed = new_median > old_median * (1 + max_regression)
+            if regressed:
+                regressions.append(("{}/{}".format(board_engine, name), old_median, new_median))
+    return regressions
+
+
+def print_results(results: dict):
+    for board_engine, engine_results in results["engines"].items():
+        for name, result in engine_results.items():
+            print("{:<10} {:<28} {:>14.1f} {}".format(board_engine, name, result["median"], result["unit"]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks the board engines, the agent and the renderer")
+    parser.add_argument("--output", default="benchmark.json", help="json file the results are written to")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), help="board engines to benchmark")
+    parser.add_argument("--agents", type=int, default=100, help="number of agents of the generation benchmark")
+    parser.add_argument("--games", type=int, nargs="+", default=[18, 100, 500],
+                        help="numbers of rendered games of the render benchmarks")
+    parser.add_argument("--quick", action="store_true", help="fewer boards, pieces and frames")
+    parser.add_argument("--no-render", action="store_true", help="skip the render benchmarks")
+    parser.add_argument("--compare", default=None, help="json file of earlier results to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.1,
+                        help="share by which a median may get worse before the comparison fails")
+    args = parser.parse_args()
+
+    benchmark_results = run_benchmarks(args.engines, args.games, args.quick, not args.no_render, args.agents)
+    print_results(benchmark_results)
+    with open(args.output, "w") as file:
+        json.dump(benchmark_results, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            found_regressions = compare(json.load(file), benchmark_results, args.max_regression)
+        for regression in found_regressions:
+            print("Regression {}: {:.1f} -> {:.1f}".format(*regression))
+        sys.exit(1 if found_regressions else 0)
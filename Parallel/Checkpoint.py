@@ -0,0 +1,110 @@
+import os
+import random
+import struct
+import zlib
+
+# file type, format version, generation, number of agents, number of seeds, high score and its lines
+HEADER = struct.Struct("<4sHIII2d")
+MAGIC = b"TGAC"
+VERSION = 1
+# version, 625 words of a Mersenne Twister state, whether a gaussian is cached and the cached gaussian
+RANDOM_STATE = struct.Struct("<I625I?d")
+CHECKSUM = struct.Struct("<I")
+# weights and mutation chance of an agent like Agent.get_weights
+NUMBER_OF_WEIGHTS = 5
+
+
+class Checkpoint:
+    """
+    state of a training at the start of a generation, enough to continue a headless training like it never stopped.
+    rendered games and their searches depend on the clock, a resumed rendered training only continues the population
+    """
+
+    def __init__(self, generation: int, agent_weights: list, generation_seeds: list, high_score: float,
+                 high_score_lines: float, best_weights: tuple, randomizer_state: tuple, random_state: tuple):
+        """
+        :param agent_weights: weights of every agent in the order of Agent.get_weights
+        :param best_weights: weights of the agent with the high score
+        :param randomizer_state: state of the random generator of the generation seeds
+        :param random_state: state of the random module, which mutates the agents
+        """
+        self.generation = generation
+        self.agent_weights = agent_weights
+        self.generation_seeds = generation_seeds
+        self.high_score = high_score
+        self.high_score_lines = high_score_lines
+        self.best_weights = best_weights
+        self.randomizer_state = randomizer_state
+        self.random_state = random_state
+
+    @classmethod
+    def from_model(cls, tetris_parallel_model):
+        model = tetris_parallel_model
+        return cls(model.generation, model.population.get_weights(), list(model.generation_seeds),
+                   model.high_score, model.high_score_lines,
+                   (model.weight_line_cleared, model.weight_aggregate_height, model.weight_holes,
+                    model.weight_bumpiness, model.mutation_chance),
+                   model.randomizer.getstate(), random.getstate())
+
+
+def _pack_random_state(state: tuple) -> bytes:
+    version, words, gauss_next = state
+    return RANDOM_STATE.pack(version, *words, gauss_next is not None, gauss_next or 0.0)
+
+
+def _unpack_random_state(data: bytes, offset: int) -> tuple:
+    values = RANDOM_STATE.unpack_from(data, offset)
+    return values[0], tuple(values[1:626]), values[627] if values[626] else None
+
+
+def write_checkpoint(path: str, checkpoint: Checkpoint):
+    """
+    writes the checkpoint to a temporary file and replaces the file of the path with it, so the path always holds
+    a complete checkpoint even if the training is stopped while writing
+    """
+    number_of_agents = len(checkpoint.agent_weights)
+    weights = [value for agent_weights in checkpoint.agent_weights for value in agent_weights]
+    data = b"".join((
+        HEADER.pack(MAGIC, VERSION, checkpoint.generation, number_of_agents, len(checkpoint.generation_seeds),
+                    checkpoint.high_score, checkpoint.high_score_lines),
+        struct.pack("<{}d".format(NUMBER_OF_WEIGHTS), *checkpoint.best_weights),
+        struct.pack("<{}d".format(NUMBER_OF_WEIGHTS * number_of_agents), *weights),
+        struct.pack("<{}I".format(len(checkpoint.generation_seeds)), *checkpoint.generation_seeds),
+        _pack_random_state(checkpoint.randomizer_state),
+        _pack_random_state(checkpoint.random_state),
+    ))
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(data)
+        file.write(CHECKSUM.pack(zlib.crc32(data)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def read_checkpoint(path: str) -> Checkpoint:
+    """:raise ValueError: if the file is no checkpoint of this version or is damaged"""
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size + CHECKSUM.size:
+        raise ValueError("File {} is no checkpoint".format(path))
+    data, (checksum,) = data[:-CHECKSUM.size], CHECKSUM.unpack(data[-CHECKSUM.size:])
+    magic, version, generation, number_of_agents, number_of_seeds, high_score, high_score_lines = \
+        HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("File {} is no checkpoint of version {}".format(path, VERSION))
+    if zlib.crc32(data) != checksum:
+        raise ValueError("Checkpoint {} is damaged".format(path))
+
+    offset = HEADER.size
+    best_weights = struct.unpack_from("<{}d".format(NUMBER_OF_WEIGHTS), data, offset)
+    offset += 8 * NUMBER_OF_WEIGHTS
+    weights = struct.unpack_from("<{}d".format(NUMBER_OF_WEIGHTS * number_of_agents), data, offset)
+    offset += 8 * NUMBER_OF_WEIGHTS * number_of_agents
+    agent_weights = [weights[i:i + NUMBER_OF_WEIGHTS] for i in range(0, len(weights), NUMBER_OF_WEIGHTS)]
+    generation_seeds = list(struct.unpack_from("<{}I".format(number_of_seeds), data, offset))
+    offset += 4 * number_of_seeds
+    randomizer_state = _unpack_random_state(data, offset)
+    random_state = _unpack_random_state(data, offset + RANDOM_STATE.size)
+    return Checkpoint(generation, agent_weights, generation_seeds, high_score, high_score_lines, best_weights,
+                      randomizer_state, random_state)
@@ -0,0 +1,174 @@
+import numpy as np
+
+from AI.AI_Agent import AGENT_TYPES, LookaheadAgent
+from AI.EvaluationCache import EvaluationCache
+from Tetris_Game.BatchBoard import SHAPE_HEIGHTS, TetrisBatchBoard
+from Tetris_Game.GameCore import HeadlessTetris
+from Tetris_Game.PieceSequence import get_piece_sequence
+from Tetris_Game.Settings import *
+
+# board engine of headless trainings that play the games of all greedy agents at once on a TetrisBatchBoard
+BATCH_ENGINE = "batch"
+# evaluation cache of the current worker process, shared by all games the worker plays
+_evaluation_cache = None
+
+
+def _get_evaluation_cache():
+    global _evaluation_cache
+    if _evaluation_cache is None and EVALUATION_CACHE_SIZE > 0:
+        _evaluation_cache = EvaluationCache(EVALUATION_CACHE_SIZE)
+    return _evaluation_cache
+
+
+class GameResult(tuple):
+    """score, lines and weights of the games of an agent, with the number of placed shapes as attribute"""
+
+    def __new__(cls, score, lines, weights, pieces: int):
+        result = super().__new__(cls, (score, lines, weights))
+        result.pieces = pieces
+        return result
+
+    def __reduce__(self):
+        # results are sent back from the worker processes
+        return GameResult, (*self, self.pieces)
+
+
+def play_agent_game(weights, seed=None, board_engine=BOARD_ENGINE, max_pieces=HEADLESS_MAX_PIECES,
+                    agent_type=AGENT_TYPE):
+    """
+    plays a whole game with an agent without rendering it, runs in a worker process of the training. searching
+    agents ignore their time budget
+
+    :param weights: weights of the agent in the order of Agent.set_weights
+    :param seed: seed of the shape sequence, random if None
+    :param board_engine: board implementation of the game
+    :param max_pieces: game ends after this number of placed shapes
+    :param agent_type: key of the agent in AGENT_TYPES
+    :return: score and lines of the game and the weights of the agent, the placed shapes in pieces
+    """
+    game = HeadlessTetris(board_engine=board_engine, seed=seed)
+    agent_class = AGENT_TYPES[agent_type]
+    if issubclass(agent_class, LookaheadAgent):
+        # searches are only limited by their number of nodes, a game has the same result on every machine and load
+        agent = agent_class(game, _get_evaluation_cache(), time_budget=None)
+    else:
+        agent = agent_class(game, _get_evaluation_cache())
+    agent.set_weights(*weights)
+
+    tetris_model = game.tetris_model
+    # ticks of the rendered games without waiting for the timer, a shape falls in one tick with TIME_SKIP
+    while not tetris_model.game_over and tetris_model.pieces < max_pieces:
+        agent.calculate_next_move()
+        if TIME_SKIP:
+            game.tetris_controller.drop_to_landing()
+        else:
+            game.tetris_controller.drop()
+    return GameResult(tetris_model.score, tetris_model.lines, weights, tetris_model.pieces)
+
+
+def play_agent_games(weights, seeds, board_engine=BOARD_ENGINE, max_pieces=HEADLESS_MAX_PIECES,
+                     agent_type=AGENT_TYPE):
+    """
+    plays one game with every piece sequence, all agents of a generation play the same sequences
+
+    :param weights: weights of the agent in the order of Agent.set_weights
+    :param seeds: seeds of the piece sequences
+    :param board_engine: board implementation of the games
+    :param max_pieces: every game ends after this number of placed shapes
+    :param agent_type: key of the agent in AGENT_TYPES
+    :return: mean score and mean lines of the games and the weights of the agent, the placed shapes of all games
+    in pieces
+    """
+    score = 0
+    lines = 0
+    pieces = 0
+    for seed in seeds:
+        result = play_agent_game(weights, seed, board_engine, max_pieces, agent_type)
+        score += result[0]
+        lines += result[1]
+        pieces += result.pieces
+    return GameResult(score / len(seeds), lines / len(seeds), weights, pieces)
+
+
+def get_shape_forms(seed):
+    """:return: endless iterator over the shape forms of the piece sequence of the seed in the order they are played"""
+    piece_sequence = get_piece_sequence(seed)
+    bag_index = 0
+    while True:
+        # games take their current shape from the end of a bag
+        yield from reversed(piece_sequence.get_bag(bag_index))
+        bag_index += 1
+
+
+def play_batch_game(agent_weights: np.ndarray, seed, max_pieces=HEADLESS_MAX_PIECES) -> tuple:
+    """
+    plays the game of the seed with every greedy agent at once. every agent chooses the best placement like
+    Agent.calculate_next_move and its shape is turned, shifted and dropped from the top rows like in a game, so
+    the games end like the games of play_agent_game
+
+    :param agent_weights: (number_of_agents, 5) array of the weights of every agent in the order of
+    Agent.set_weights
+    :param seed: seed of the shape sequence
+    :param max_pieces: every game ends after this number of placed shapes
+    :return: score, lines and placed shapes of the game of every agent
+    """
+    number_of_agents = len(agent_weights)
+    batch_board = TetrisBatchBoard(number_of_agents)
+    # one column of weights for the placements of every agent
+    weight_line_cleared, weight_aggregate_height, weight_holes, weight_bumpiness = (
+        agent_weights[:, i, None] for i in range(4))
+    score = np.zeros(number_of_agents)
+    lines = np.zeros(number_of_agents, dtype=np.int64)
+    pieces = np.zeros(number_of_agents, dtype=np.int64)
+
+    for _, shape_form in zip(range(max_pieces), get_shape_forms(seed)):
+        if batch_board.game_over.all():
+            break
+        placements = batch_board.evaluate_all_placements(shape_form)
+        # same order of operations as Agent._weight_position, so the agents choose the same placements
+        placement_scores = weight_line_cleared * placements.lines_cleared ** 5
+        placement_scores += weight_aggregate_height * placements.aggregate_height
+        placement_scores += weight_holes * placements.number_of_holes
+        placement_scores += weight_bumpiness * placements.bumpiness
+        placement_scores[~placements.valid] = -np.inf
+        # first best placement like the strict comparison of the agent
+        best_placements = np.argmax(placement_scores, axis=1)
+
+        # a shape that is blocked on its way to the best placement ends where a game would leave it
+        turns, columns = batch_board.move_from_spawn(shape_form, placements.turns[best_placements],
+                                                     placements.x[best_placements])
+        shape_forms = np.full(number_of_agents, int(shape_form))
+        # score of every row the shape fell from its starting position at the top of the board
+        fallen_rows = GRID_ROW_COUNT - batch_board.landing_rows(shape_forms, turns, columns) \
+            - SHAPE_HEIGHTS[shape_forms, turns]
+        placed = batch_board.place_shapes(shape_forms, turns, columns)
+        lines_cleared = batch_board.remove_full_rows()
+        score[placed] += PER_STEP_SCORE_GAIN * fallen_rows[placed]
+        score += np.where(lines_cleared > 0, MULTI_SCORE_ALGORITHM(lines_cleared), 0)
+        lines += lines_cleared
+        pieces += placed
+    return score, lines, pieces
+
+
+def play_batch_games(agent_weights: list, seeds, max_pieces=HEADLESS_MAX_PIECES) -> list:
+    """
+    plays one game with every piece sequence with all greedy agents of a generation at once, in the process that
+    calls it
+
+    :param agent_weights: weights of every agent in the order of Agent.set_weights
+    :param seeds: seeds of the piece sequences
+    :param max_pieces: every game ends after this number of placed shapes
+    :return: result of every agent like play_agent_games
+    """
+    weight_matrix = np.array(agent_weights, dtype=np.float64)
+    score = np.zeros(len(weight_matrix))
+    lines = np.zeros(len(weight_matrix), dtype=np.int64)
+    pieces = np.zeros(len(weight_matrix), dtype=np.int64)
+    for seed in seeds:
+        game_score, game_lines, game_pieces = play_batch_game(weight_matrix, seed, max_pieces)
+        score += game_score
+        lines += game_lines
+        pieces += game_pieces
+    return [GameResult(agent_score / len(seeds), agent_lines / len(seeds), weights, agent_pieces)
+            for weights, agent_score, agent_lines, agent_pieces in zip(agent_weights, score.tolist(), lines.tolist(),
+                                                                       pieces.tolist())]
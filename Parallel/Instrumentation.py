@@ -0,0 +1,262 @@
+import cProfile
+import io
+import pstats
+import time
+
+from Tetris_Game.GameCore import BOARD_ENGINES
+from Tetris_Game.TetrisUtilities import log
+
+# phases of the parallel controller, every one is called once per tick or per generation
+CONTROLLER_PHASES = ("calculate_agent_moves", "drop", "find_best_agent", "all_games_over", "start_new_round")
+# operations of every board engine, nested operations are included in the time of the outer one
+BOARD_OPERATIONS = ("distance_to_collision", "place_shape", "remove_full_rows", "evaluate_position",
+                    "evaluate_all_placements")
+
+
+class Histogram:
+    """histogram of durations in nanoseconds with power of two buckets, adding a value is constant time"""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value: int):
+        self.buckets[min(value.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def get_percentile(self, share: float) -> int:
+        """:return: upper bound of the bucket of the percentile, 0 if the histogram is empty"""
+        if self.count == 0:
+            return 0
+        rank = share * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count > 0:
+                return min(1 << bucket, self.max)
+        return self.max
+
+    def get_mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def get_summary(self) -> dict:
+        """:return: count, mean, median, 99th percentile and maximum in milliseconds"""
+        return {"count": self.count, "mean_ms": self.get_mean() / 1e6, "p50_ms": self.get_percentile(0.5) / 1e6,
+                "p99_ms": self.get_percentile(0.99) / 1e6, "max_ms": self.max / 1e6}
+
+
+class Phase:
+    """time of a phase per call, per tick and per generation"""
+
+    __slots__ = ("name", "calls", "ticks", "generations", "tick_time", "generation_time", "tick_calls")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = Histogram()
+        self.ticks = Histogram()
+        self.generations = Histogram()
+        self.tick_time = 0
+        self.generation_time = 0
+        self.tick_calls = 0
+
+    def add(self, duration: int):
+        self.calls.add(duration)
+        self.tick_time += duration
+        self.generation_time += duration
+        self.tick_calls += 1
+
+    def end_tick(self):
+        # ticks without a call, like draws in turbo mode, are not part of the histogram
+        if self.tick_calls > 0:
+            self.ticks.add(self.tick_time)
+        self.tick_time = 0
+        self.tick_calls = 0
+
+    def end_generation(self) -> int:
+        """:return: time of the phase in the generation"""
+        generation_time = self.generation_time
+        if self.calls.count > 0:
+            self.generations.add(generation_time)
+        self.generation_time = 0
+        return generation_time
+
+
+class Instrumentation:
+    """
+    opt-in timers and counters of the phases of the parallel training. the timed methods are replaced by timing
+    wrappers when the instrumentation is attached and restored when it is detached, so the training has no
+    overhead without it. phases of the drawing thread are recorded without a lock, a tick or generation that ends
+    during a draw may miss that draw
+    """
+
+    def __init__(self, profile_generations=0, profile_file=None, report_every=1):
+        """
+        :param profile_generations: generations of the cProfile capture window, requested by attach or with "p"
+        :param profile_file: file the statistics of a capture window are dumped to, only logged if None
+        :param report_every: the timings are logged every this number of generations, never if 0
+        """
+        self.profile_generations = profile_generations
+        self.profile_file = profile_file
+        self.report_every = report_every
+
+        self.phases = {}
+        self.counters = {}
+        self.generation = 0
+        # time of every phase in the last generation
+        self.last_generation = {}
+
+        self.profiler = None
+        self.profile_end = 0
+        # generations of a requested capture window, it starts with the next tick of the simulating thread
+        self.requested_profile_generations = 0
+        self.patches = []
+
+    def get_phase(self, name: str) -> Phase:
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = Phase(name)
+            self.phases[name] = phase
+        return phase
+
+    def count(self, name: str, number=1):
+        self.counters[name] = self.counters.get(name, 0) + number
+
+    def instrument(self, owner, name: str, phase_name=None, after=None, before=None):
+        """
+        replaces a method of an object or class with a wrapper that times every call
+
+        :param owner: object or class of the method
+        :param name: name of the method
+        :param phase_name: phase the time is added to, the name of the method if None
+        :param after: called after every call
+        :param before: called before every call, not part of the time
+        """
+        method = getattr(owner, name)
+        phase = self.get_phase(phase_name or name)
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            if before is not None:
+                before()
+            start = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                phase.add(perf_counter_ns() - start)
+                if after is not None:
+                    after()
+
+        timed.__wrapped__ = method
+        # methods of objects are not in their dict, they are restored by deleting the wrapper
+        self.patches.append((owner, name, vars(owner).get(name)))
+        setattr(owner, name, timed)
+
+    def attach(self, controller, view=None, board_operations=True):
+        """
+        times the phases of a parallel controller and the draws of its view
+
+        :param board_operations: also time the operations of every board engine, this slows them down
+        """
+        for name in CONTROLLER_PHASES:
+            self.instrument(controller, name, after=self.end_generation if name == "start_new_round" else None)
+        # the capture window starts in the thread of the ticks, the simulation thread if the games are rendered
+        self.instrument(controller, "step", "tick", self.end_tick, self.start_requested_profile)
+        if view is not None:
+            self.instrument(view, "draw")
+        if board_operations:
+            for board_engine, board_class in BOARD_ENGINES.items():
+                for name in BOARD_OPERATIONS:
+                    if hasattr(board_class, name):
+                        self.instrument(board_class, name, "{}.{}".format(board_engine, name))
+        controller.key_actions["p"] = lambda: self.start_profile(self.profile_generations or 1)
+        self.patches.append((controller.key_actions, "p", None))
+        if self.profile_generations > 0:
+            self.start_profile(self.profile_generations)
+
+    def detach(self):
+        """restores every timed method and stops a running capture window"""
+        self.requested_profile_generations = 0
+        self.stop_profile()
+        for owner, name, original in reversed(self.patches):
+            if isinstance(owner, dict):
+                owner.pop(name, None)
+            elif original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self.patches = []
+
+    def end_tick(self):
+        self.count("ticks")
+        for phase in self.phases.values():
+            phase.end_tick()
+
+    def end_generation(self):
+        self.count("generations")
+        self.generation += 1
+        self.last_generation = {name: phase.end_generation() for name, phase in self.phases.items()}
+        if self.profiler is not None and self.generation >= self.profile_end:
+            self.stop_profile()
+        if self.report_every > 0 and self.generation % self.report_every == 0:
+            log(self.get_report(), 10)
+
+    def start_profile(self, number_of_generations: int):
+        """
+        requests a capture window of number_of_generations generations. cProfile only profiles the thread that
+        enables it, so the window is started by start_requested_profile in the thread that simulates the games
+        """
+        if self.profiler is None:
+            self.requested_profile_generations = number_of_generations
+
+    def start_requested_profile(self):
+        """profiles the calling thread until the requested number of generations ended, if a window was requested"""
+        if self.requested_profile_generations == 0 or self.profiler is not None:
+            return
+        self.profile_end = self.generation + self.requested_profile_generations
+        self.requested_profile_generations = 0
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        log("Profiling generations {} to {}".format(self.generation, self.profile_end - 1), 10)
+
+    def stop_profile(self):
+        if self.profiler is None:
+            return
+        self.profiler.disable()
+        stream = io.StringIO()
+        statistics = pstats.Stats(self.profiler, stream=stream)
+        if self.profile_file is not None:
+            statistics.dump_stats(self.profile_file)
+        statistics.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(20)
+        log(stream.getvalue(), 10)
+        self.profiler = None
+
+    def get_summary(self) -> dict:
+        """:return: histograms of every phase per call, per tick and per generation and the counters"""
+        return {
+            "counters": dict(self.counters),
+            "phases": {name: {"calls": phase.calls.get_summary(), "ticks": phase.ticks.get_summary(),
+                              "generations": phase.generations.get_summary()}
+                       for name, phase in self.phases.items()},
+        }
+
+    def get_report(self) -> str:
+        """:return: table of the time of every called phase, slowest phase of the last generation first"""
+        lines = ["Generation {}, {} ticks".format(self.generation, self.counters.get("ticks", 0)),
+                 "{:<36} {:>9} {:>10} {:>10} {:>10} {:>10}".format(
+                     "phase", "calls", "last gen", "tick p50", "tick p99", "call max")]
+        for name in sorted(self.phases, key=lambda phase_name: -self.last_generation.get(phase_name, 0)):
+            phase = self.phases[name]
+            if phase.calls.count == 0:
+                continue
+            lines.append("{:<36} {:>9} {:>8.1f}ms {:>8.3f}ms {:>8.3f}ms {:>8.3f}ms".format(
+                name, phase.calls.count, self.last_generation.get(name, 0) / 1e6,
+                phase.ticks.get_percentile(0.5) / 1e6, phase.ticks.get_percentile(0.99) / 1e6,
+                phase.calls.max / 1e6))
+        return "\n".join(lines)
@@ -0,0 +1,66 @@
+import csv
+import json
+import os
+import queue
+import threading
+
+# columns of every record, the elite weights are the weights of the best agent of the generation
+METRICS_FIELDS = ("generation", "time", "duration", "pieces", "pieces_per_second", "score_min", "score_median",
+                  "score_max", "lines_min", "lines_median", "lines_max", "high_score", "weight_line_cleared",
+                  "weight_aggregate_height", "weight_holes", "weight_bumpiness", "mutation_chance")
+
+
+class MetricsLog:
+    """
+    appends one record per generation to a JSON lines file, or to a csv file if the path ends with .csv. records
+    are written by a thread of their own, so writing never waits for the disk
+    """
+
+    def __init__(self, path: str):
+        """:param path: file the records are appended to, a run that continues it keeps the earlier records"""
+        self.path = path
+        self.csv = path.lower().endswith(".csv")
+        self.records = queue.SimpleQueue()
+        self.number_of_records = 0
+        self.writer = threading.Thread(target=self._write_records, daemon=True)
+        self.writer.start()
+
+    def write(self, record: dict):
+        """:param record: values of METRICS_FIELDS, the record is written later"""
+        self.records.put(record)
+        self.number_of_records += 1
+
+    def close(self):
+        """writes every remaining record and closes the file"""
+        if self.writer.is_alive():
+            self.records.put(None)
+            self.writer.join()
+
+    def _write_records(self):
+        # the header of a csv file is only written once
+        write_header = self.csv and (not os.path.exists(self.path) or os.path.getsize(self.path) == 0)
+        with open(self.path, "a", newline="") as file:
+            csv_writer = csv.DictWriter(file, METRICS_FIELDS, extrasaction="ignore") if self.csv else None
+            if write_header:
+                csv_writer.writeheader()
+            while True:
+                # every waiting record is written before the file is flushed
+                records = [self.records.get()]
+                while not self.records.empty():
+                    records.append(self.records.get())
+                for record in records:
+                    if record is None:
+                        return
+                    if csv_writer is not None:
+                        csv_writer.writerow(record)
+                    else:
+                        file.write(json.dumps(record, separators=(",", ":")) + "\n")
+                file.flush()
+
+
+def read_metrics(path: str) -> list:
+    """:return: records of a metrics file, numbers of csv files are converted to float"""
+    with open(path, newline="") as file:
+        if path.lower().endswith(".csv"):
+            return [{key: float(value) for key, value in row.items()} for row in csv.DictReader(file)]
+        return [json.loads(line) for line in file if line.strip()]
@@ -0,0 +1,148 @@
+import threading
+
+
+class BoardSnapshot:
+    """immutable copy of the filled cells of a board"""
+
+    __slots__ = ("zobrist_hash", "cells")
+
+    def __init__(self, board):
+        self.zobrist_hash = board.zobrist_hash
+        self.cells = frozenset(board.get_cells())
+
+    def get_cells(self):
+        """:return: (x, y, value) of every filled cell like board.get_cells"""
+        return self.cells
+
+
+class ShapeSnapshot:
+    """immutable copy of everything of a shape that is drawn"""
+
+    __slots__ = ("shape_form", "name", "shape", "orientation", "x", "y", "turns", "y_distance_to_collision")
+
+    def __init__(self, shape, y_distance_to_collision: int):
+        self.shape_form = shape.shape_form
+        self.name = shape.name
+        self.shape = shape.shape
+        self.orientation = shape.get_orientation()
+        self.x = shape.x
+        self.y = shape.y
+        self.turns = shape.turns
+        self.y_distance_to_collision = y_distance_to_collision
+
+    def get_orientation(self):
+        return self.orientation
+
+    def get_y_distance_to_collision(self) -> int:
+        return self.y_distance_to_collision
+
+
+class GameSnapshot:
+    """
+    immutable copy of a tetris model at the end of a simulation step. it has every field of TetrisModel a
+    TetrisView reads, so a view can draw it instead of the model
+    """
+
+    __slots__ = ("index", "title", "visible", "game_board", "current_shape", "next_shape", "paused", "game_over",
+                 "score", "lines", "high_score", "high_score_lines")
+
+    def __init__(self, index: int, title: str, tetris_model, game_board: BoardSnapshot):
+        self.index = index
+        self.title = title
+        self.visible = tetris_model.visible
+        self.game_board = game_board
+        self.paused = tetris_model.paused
+        self.game_over = tetris_model.game_over
+        current_shape = tetris_model.get_current_shape()
+        # the prediction is not drawn for finished games
+        self.current_shape = ShapeSnapshot(
+            current_shape, 0 if self.game_over else current_shape.get_y_distance_to_collision())
+        self.next_shape = ShapeSnapshot(tetris_model.get_next_shape(), 0)
+        self.score = tetris_model.score
+        self.lines = tetris_model.lines
+        self.high_score = tetris_model.high_score
+        self.high_score_lines = tetris_model.high_score_lines
+
+    def get_current_shape(self) -> ShapeSnapshot:
+        return self.current_shape
+
+    def get_next_shape(self) -> ShapeSnapshot:
+        return self.next_shape
+
+
+class ParallelSnapshot:
+    """immutable copy of everything the parallel view draws, only the games on its boards are copied"""
+
+    __slots__ = ("number", "games", "best_game", "display_best_of_generation", "number_of_games",
+                 "number_of_top_games", "page", "number_of_pages", "high_score", "high_score_lines",
+                 "weight_line_cleared", "weight_aggregate_height", "weight_holes", "weight_bumpiness",
+                 "mutation_chance")
+
+    def __init__(self, tetris_parallel_model, previous=None):
+        """
+        :param tetris_parallel_model: model the snapshot is taken from, it must not change meanwhile
+        :param previous: last snapshot of the model, boards that did not change are shared with it
+        """
+        model = tetris_parallel_model
+        self.number = previous.number + 1 if previous is not None else 0
+        previous_boards = {}
+        if previous is not None:
+            previous_boards = {game.index: game.game_board for game in previous.games}
+
+        games = []
+        for index in model.get_visible_games():
+            tetris_game = model.tetris_games[index]
+            board = tetris_game.tetris_model.game_board
+            board_snapshot = previous_boards.get(index)
+            if board_snapshot is None or board_snapshot.zobrist_hash != board.zobrist_hash:
+                board_snapshot = BoardSnapshot(board)
+            games.append(GameSnapshot(index, tetris_game.tetris_view.title, tetris_game.tetris_model,
+                                      board_snapshot))
+        self.games = tuple(games)
+
+        self.best_game = model.best_game
+        self.display_best_of_generation = model.display_best_of_generation
+        self.number_of_games = model.number_of_games
+        self.number_of_top_games = model.number_of_top_games
+        self.page = model.page
+        self.number_of_pages = model.get_number_of_pages()
+        self.high_score = model.high_score
+        self.high_score_lines = model.high_score_lines
+        self.weight_line_cleared = model.weight_line_cleared
+        self.weight_aggregate_height = model.weight_aggregate_height
+        self.weight_holes = model.weight_holes
+        self.weight_bumpiness = model.weight_bumpiness
+        self.mutation_chance = model.mutation_chance
+
+    def get_game(self, index: int):
+        """:return: snapshot of the game with the index, None if it is not on a board"""
+        for game in self.games:
+            if game.index == index:
+                return game
+        return None
+
+
+class SnapshotBuffer:
+    """
+    double buffer between the simulation thread, which publishes a snapshot after every step, and the drawing
+    loop, which reads the latest one at its own rate
+    """
+
+    def __init__(self):
+        self.buffers = [None, None]
+        # index of the buffer that is read, the other one is written
+        self.front = 0
+        self.lock = threading.Lock()
+        self.number_of_published = 0
+
+    def publish(self, snapshot: ParallelSnapshot):
+        """:param snapshot: snapshot that replaces the one that is read"""
+        with self.lock:
+            self.buffers[1 - self.front] = snapshot
+            self.front = 1 - self.front
+            self.number_of_published += 1
+
+    def get_latest(self):
+        """:return: last published snapshot, None before the first one"""
+        with self.lock:
+            return self.buffers[self.front]
@@ -1,39 +1,278 @@
+import os
+import queue
 import random
-
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from heapq import nlargest
+from itertools import repeat
+
+import numpy as np
 import pygame
 
 from math import sqrt, ceil
 
-from AI.AI_Agent import Agent
-from Tetris_Game.MainGame import Tetris
+from AI.AI_Agent import AGENT_TYPES
+from AI.EvaluationCache import EvaluationCache
+from AI.Population import Population
+from Parallel.Checkpoint import Checkpoint, read_checkpoint, write_checkpoint
+from Parallel.HeadlessTraining import BATCH_ENGINE, GameResult, play_agent_games, play_batch_games
+from Parallel.Instrumentation import Instrumentation
+from Parallel.MetricsLog import MetricsLog
+from Parallel.Snapshot import GameSnapshot, ParallelSnapshot, SnapshotBuffer
+from Tetris_Game.MainGame import Tetris, TetrisView
 from Tetris_Game.Settings import *
-from Tetris_Game.TetrisUtilities import get_color_tuple
+from Tetris_Game.TextCache import get_text_cache
+from Tetris_Game.TetrisUtilities import get_color_tuple, log
 
 
 class TetrisParallel:
-    def __init__(self, number_of_games: int):
-        self.tetris_parallel_model = TetrisParallelModel(number_of_games)
-        self.tetris_parallel_view = TetrisParallelView(self.tetris_parallel_model)
-        self.tetris_parallel_controller = TetrisParallelController(self.tetris_parallel_model)
-        self.run_games()
+    def __init__(self, number_of_games: int, board_engine=BOARD_ENGINE, headless=False,
+                 number_of_workers=HEADLESS_WORKERS, number_of_generations=None, agent_type=AGENT_TYPE,
+                 turbo=TURBO_MODE, instrument=INSTRUMENTATION, profile_generations=PROFILE_GENERATIONS,
+                 metrics_file=METRICS_FILE, checkpoint_file=CHECKPOINT_FILE, checkpoint_every=CHECKPOINT_EVERY,
+                 resume_file=None):
+        """
+        :param number_of_games: number of agents of every generation
+        :param board_engine: board implementation used by every game, BATCH_ENGINE plays the games of all agents of
+        a headless training of greedy agents at once
+        :param agent_type: key of the agents of the population in AGENT_TYPES
+        :param headless: train without rendering by playing the games of a generation in worker processes
+        :param number_of_workers: number of worker processes of the headless training, number of cores if None
+        :param number_of_generations: headless training stops after this number of generations, never if None
+        :param turbo: rendered games advance by a number of steps every frame instead of with the timer
+        :param instrument: time the phases of every tick and generation
+        :param profile_generations: profile this number of generations with cProfile, also enables the timing
+        :param metrics_file: jsonl or csv file the metrics of every generation are appended to, not logged if None
+        :param checkpoint_file: file the population is saved to every checkpoint_every generations, never if None
+        :param checkpoint_every: number of generations between two checkpoints
+        :param resume_file: checkpoint the training continues from, its number of agents replaces number_of_games
+        """
+        checkpoint = None
+        if resume_file is not None:
+            checkpoint = read_checkpoint(resume_file)
+            number_of_games = len(checkpoint.agent_weights)
+        self.tetris_parallel_model = TetrisParallelModel(number_of_games, board_engine, headless, agent_type, turbo)
+        self.tetris_parallel_model.checkpoint_file = checkpoint_file
+        self.tetris_parallel_model.checkpoint_every = checkpoint_every
+        if metrics_file is not None:
+            self.tetris_parallel_model.metrics_log = MetricsLog(metrics_file)
+        self.instrumentation = None
+        if instrument or profile_generations > 0:
+            self.instrumentation = Instrumentation(profile_generations, PROFILE_FILE)
+        if headless:
+            self.tetris_parallel_controller = TetrisParallelController(self.tetris_parallel_model)
+            if checkpoint is not None:
+                self.tetris_parallel_controller.restore_checkpoint(checkpoint)
+            if self.instrumentation is not None:
+                # the games are played in the workers, only the generations are timed
+                self.instrumentation.attach(self.tetris_parallel_controller, board_operations=False)
+                self.instrumentation.instrument(self, "play_generation",
+                                                before=self.instrumentation.start_requested_profile)
+                if profile_generations > 0 and board_engine != BATCH_ENGINE:
+                    log("Only the main process is profiled, the games played by the worker processes are not", 10)
+            self.run_headless(number_of_workers, number_of_generations)
+        else:
+            self.tetris_parallel_view = TetrisParallelView(self.tetris_parallel_model)
+            self.tetris_parallel_controller = TetrisParallelController(self.tetris_parallel_model)
+            if checkpoint is not None:
+                self.tetris_parallel_controller.restore_checkpoint(checkpoint)
+            if self.instrumentation is not None:
+                self.instrumentation.attach(self.tetris_parallel_controller, self.tetris_parallel_view)
+            # steps of the simulation thread
+            self.number_of_steps = 0
+            self.run_games()
+        if self.instrumentation is not None:
+            self.instrumentation.detach()
+        if self.tetris_parallel_model.metrics_log is not None:
+            self.tetris_parallel_model.metrics_log.close()
 
     def run_games(self):
+        if SIMULATION_THREAD:
+            self.run_threaded()
+        else:
+            self.run_single_threaded()
+        if self.tetris_parallel_model.leaf_executor is not None:
+            self.tetris_parallel_model.leaf_executor.shutdown()
+        pygame.quit()
+
+    def run_threaded(self):
+        """
+        simulates the games in a thread of their own, which publishes a snapshot after every step. this thread
+        passes the events to the simulation and draws the latest snapshot at its own rate
+        """
+        model = self.tetris_parallel_model
+        snapshot_buffer = SnapshotBuffer()
+        events = queue.SimpleQueue()
+        simulation = threading.Thread(target=self.run_simulation, args=(snapshot_buffer, events), daemon=True)
+        pygame.time.set_timer(pygame.USEREVENT + 2, DISPLAY_TEXT_SPEED)
+        clock = pygame.time.Clock()
+        start = time.perf_counter()
+        number_of_frames = 0
+        snapshot = None
+        simulation.start()
+        while model.running:
+            # events change the games, so they are handled by the simulation
+            for event in pygame.event.get():
+                events.put(event)
+            latest_snapshot = snapshot_buffer.get_latest()
+            if latest_snapshot is not None and latest_snapshot is not snapshot:
+                snapshot = latest_snapshot
+                self.tetris_parallel_view.draw(snapshot)
+                number_of_frames += 1
+            clock.tick(MAX_FPS)
+        simulation.join()
+        duration = time.perf_counter() - start
+        log("Simulated {:.0f} steps/s, drew {:.0f} frames/s".format(self.number_of_steps / duration,
+                                                                    number_of_frames / duration), 2)
+
+    def run_simulation(self, snapshot_buffer: SnapshotBuffer, events):
+        """
+        advances the games with the timer, or by a frame of steps at most MAX_FPS times per second in turbo mode
+        (without a limit if TURBO_UNLIMITED), until the model stops running
+
+        :param snapshot_buffer: buffer the state of the games is published to after every step, in turbo mode after
+        every TURBO_RENDER_EVERY-th frame
+        :param events: queue of the pygame events of the drawing thread
+        """
+        model = self.tetris_parallel_model
+        snapshot = ParallelSnapshot(model)
+        snapshot_buffer.publish(snapshot)
+        next_tick = time.perf_counter()
+        next_frame = next_tick
+        frame = 0
+        while model.running:
+            while not events.empty():
+                self.tetris_parallel_controller.handle_event(events.get())
+            if model.turbo:
+                # frames are capped at MAX_FPS like the turbo frames of the main thread
+                if not TURBO_UNLIMITED:
+                    delay = next_frame - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(min(delay, 0.01))
+                        continue
+                    next_frame = max(next_frame + 1 / MAX_FPS, time.perf_counter())
+                self.number_of_steps += self.simulate_frame()
+                frame += 1
+                # only every TURBO_RENDER_EVERY-th frame is published to be drawn
+                if frame % TURBO_RENDER_EVERY != 0:
+                    continue
+            else:
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    # short sleeps so that events are still handled at once
+                    time.sleep(min(delay, 0.01))
+                    continue
+                next_tick = max(next_tick + SPEED_DEFAULT / 1000, time.perf_counter())
+                self.tetris_parallel_controller.step()
+                self.number_of_steps += 1
+            snapshot = ParallelSnapshot(model, snapshot)
+            snapshot_buffer.publish(snapshot)
+
+    def run_single_threaded(self):
         pygame.time.set_timer(pygame.USEREVENT + 1, SPEED_DEFAULT)
         pygame.time.set_timer(pygame.USEREVENT + 2, DISPLAY_TEXT_SPEED)
         clock = pygame.time.Clock()
+        frame = 0
         # while game is running
         while self.tetris_parallel_model.running:
-            # draw and update game
-            self.tetris_parallel_view.draw()
+            if not self.tetris_parallel_model.turbo:
+                # draw and update game, games advance with the timer events
+                self.tetris_parallel_view.draw()
+                self.tetris_parallel_controller.update()
+                clock.tick(MAX_FPS)
+                continue
+            # games advance a fixed number of steps every frame, independent of the timer
+            self.simulate_frame()
             self.tetris_parallel_controller.update()
-            clock.tick(MAX_FPS)
-        pygame.quit()
+            if frame % TURBO_RENDER_EVERY == 0:
+                self.tetris_parallel_view.draw()
+            frame += 1
+            clock.tick(0 if TURBO_UNLIMITED else MAX_FPS)
+
+    def simulate_frame(self) -> int:
+        """
+        advances every game by TURBO_STEPS_PER_FRAME steps, or by as many steps as fit into the frame budget
+
+        :return: number of steps executed
+        """
+        deadline = time.perf_counter() + TURBO_FRAME_BUDGET
+        number_of_steps = 0
+        while self.tetris_parallel_model.running:
+            if TURBO_STEPS_PER_FRAME is None:
+                if number_of_steps > 0 and time.perf_counter() >= deadline:
+                    break
+            elif number_of_steps >= TURBO_STEPS_PER_FRAME:
+                break
+            self.tetris_parallel_controller.step()
+            number_of_steps += 1
+        return number_of_steps
+
+    def run_headless(self, number_of_workers=HEADLESS_WORKERS, number_of_generations=None):
+        """plays every generation in worker processes at cpu speed until the number of generations is reached"""
+        model = self.tetris_parallel_model
+        number_of_workers = number_of_workers or os.cpu_count() or 1
+        # several agents per task so that workers are not waiting for the main process
+        chunk_size = max(1, model.number_of_games // (4 * number_of_workers))
+        # the batch engine plays all games in this process
+        workers = nullcontext() if model.board_engine == BATCH_ENGINE else ProcessPoolExecutor(number_of_workers)
+        with workers as executor:
+            while model.running and (number_of_generations is None or model.generation < number_of_generations):
+                results = self.play_generation(executor, chunk_size)
+                best_score, best_lines, _ = max(results, key=lambda result: result[0])
+                log("Generation {}: best score {:.3f} with {} lines".format(model.generation, best_score,
+                                                                            best_lines), 10)
+                self.tetris_parallel_controller.start_new_round(results)
+
+    def play_generation(self, executor, chunk_size: int) -> list:
+        """
+        :return: score, lines and weights of every agent of the generation played by the workers, or by this
+        process at once with the batch engine
+        """
+        model = self.tetris_parallel_model
+        if model.board_engine == BATCH_ENGINE:
+            return play_batch_games(model.population.get_weights(), model.generation_seeds, HEADLESS_MAX_PIECES)
+        return list(executor.map(play_agent_games, model.population.get_weights(), repeat(model.generation_seeds),
+                                 repeat(model.board_engine), repeat(HEADLESS_MAX_PIECES),
+                                 repeat(model.agent_type), chunksize=chunk_size))
 
 
 class TetrisParallelModel:
-    def __init__(self, number_of_games: int):
+    def __init__(self, number_of_games: int, board_engine=BOARD_ENGINE, headless=False, agent_type=AGENT_TYPE,
+                 turbo=TURBO_MODE):
         self.number_of_games = number_of_games
-
+        # board implementation used by every game
+        self.board_engine = board_engine
+        if agent_type not in AGENT_TYPES:
+            raise ValueError("Value {} is no valid agent type".format(agent_type))
+        if board_engine == BATCH_ENGINE and (not headless or agent_type != "greedy"):
+            raise ValueError("Board engine {} only plays headless trainings of greedy agents".format(board_engine))
+        self.agent_type = agent_type
+        # worker pool evaluating the search leaves of rendered expectimax agents
+        self.leaf_executor = None
+        if agent_type == "expectimax" and EXPECTIMAX_WORKERS > 0 and not headless:
+            self.leaf_executor = ProcessPoolExecutor(max_workers=EXPECTIMAX_WORKERS)
+        # headless models have no games, the agents play in worker processes
+        self.headless = headless
+        self.generation = 0
+        self.generation_start = time.perf_counter()
+        # log the metrics of every generation are written to
+        self.metrics_log = None
+        # file the population is saved to every checkpoint_every generations, never if None
+        self.checkpoint_file = None
+        self.checkpoint_every = CHECKPOINT_EVERY
+        # games advance by a number of steps every frame instead of with the timer
+        self.turbo = turbo
+        # seeds of the piece sequences every agent of the current generation plays
+        self.randomizer = random.Random(TRAINING_SEED)
+        self.generation_seeds = []
+        # placement evaluations shared by all agents
+        self.evaluation_cache = EvaluationCache(EVALUATION_CACHE_SIZE) if EVALUATION_CACHE_SIZE > 0 else None
+
+        # weights of every agent, the agents copy their row
+        self.population = None
         self.agents = []
         self.tetris_games = []
         self.best_game = 0
@@ -52,8 +291,15 @@ class TetrisParallelModel:
         self.mutation_chance = 0
         self.timer = 0
 
-        # get scale based of number of games
-        self.number_of_rows = 2 * ceil(sqrt(0.5 * number_of_games))
+        # only a slice of the games is drawn, the first boards show the best games and the others a page of all
+        self.number_of_visible_games = min(number_of_games, MAX_VISIBLE_GAMES)
+        self.number_of_top_games = 0
+        if number_of_games > self.number_of_visible_games:
+            self.number_of_top_games = min(max(1, VISIBLE_TOP_GAMES), self.number_of_visible_games - 1)
+        self.page = 0
+
+        # get scale based of number of visible games
+        self.number_of_rows = 2 * ceil(sqrt(0.5 * self.number_of_visible_games))
         self.scale = 2 / self.number_of_rows
 
         # offset for each game
@@ -61,6 +307,27 @@ class TetrisParallelModel:
         self.text_x_start = GRID_COL_COUNT * (SCREEN_HEIGHT_ALGORITHM(self.scale) // GRID_ROW_COUNT) + self.margin
         self.text_y_start = SCREEN_HEIGHT_ALGORITHM(self.scale) + self.margin
 
+    def get_number_of_pages(self) -> int:
+        """:return: number of pages the games are split into"""
+        return ceil(self.number_of_games / (self.number_of_visible_games - self.number_of_top_games))
+
+    def get_visible_games(self) -> list:
+        """
+        :return: index of the game of every drawn board. if not all games are drawn, the best running games come
+        first, starting with the best game, followed by the games of the current page
+        """
+        if self.number_of_games == self.number_of_visible_games:
+            return list(range(self.number_of_games))
+        top_games = [self.best_game]
+        if self.number_of_top_games > 1:
+            top_games += nlargest(self.number_of_top_games - 1,
+                                  (i for i in range(self.number_of_games) if i != self.best_game),
+                                  key=lambda i: (not self.tetris_games[i].tetris_model.game_over,
+                                                 self.tetris_games[i].tetris_model.score, -i))
+        page_size = self.number_of_visible_games - self.number_of_top_games
+        start = self.page * page_size
+        return top_games + list(range(start, min(start + page_size, self.number_of_games)))
+
 
 class TetrisParallelView:
     def __init__(self, tetris_parallel_model: TetrisParallelModel):
@@ -80,7 +347,7 @@ class TetrisParallelView:
                      self.tetris_parallel_model.number_of_rows - 3 * MARGIN
 
         # todo change this mess
-        number_of_games_in_column = ceil(self.tetris_parallel_model.number_of_games
+        number_of_games_in_column = ceil(self.tetris_parallel_model.number_of_visible_games
                                          / self.tetris_parallel_model.number_of_rows)
         game_board_height = (SCREEN_HEIGHT_ALGORITHM(
             self.tetris_parallel_model.scale) // GRID_ROW_COUNT) * GRID_ROW_COUNT
@@ -89,14 +356,123 @@ class TetrisParallelView:
 
         self.height = (number_of_games_in_column
                        - 1) * self.tetris_parallel_model.text_y_start + game_board_height + margin_correction
-
-    def draw(self):
-        self.screen.fill(get_color_tuple(COLORS.get("BACKGROUND_BLACK")))
-        for i in range(self.tetris_parallel_model.number_of_games):
-            self.tetris_parallel_model.tetris_games[i].tetris_view.draw()
-        self.draw_right_side()
-        # update screen
-        pygame.display.update()
+        # state of the right side in the last frame, None if the whole screen has to be drawn
+        self.right_side_state = None
+        # view drawing the statistics of the best game and the enlarged surface of the game with its key
+        self.best_agent_view = None
+        self.best_agent_board = None
+        # views of the drawn boards, every view draws the game assigned to it in its own surface
+        self.game_views = []
+        # number of views that showed a game in the last frame, the boards of a partial last page are empty
+        self.number_of_shown_views = 0
+        # snapshot drawn in the last frame
+        self.last_snapshot = None
+
+    def invalidate(self):
+        """the whole screen is drawn again at the next frame"""
+        self.right_side_state = None
+
+    def draw(self, snapshot=None):
+        """
+        composes the screen from the surfaces of the games, only the parts that changed are copied
+
+        :param snapshot: state of the games that is drawn, taken from the model if None
+        """
+        if snapshot is None:
+            snapshot = ParallelSnapshot(self.tetris_parallel_model, self.last_snapshot)
+        self.last_snapshot = snapshot
+        rects = []
+        full = self.right_side_state is None
+        if full:
+            # first frame, everything is drawn on a cleared screen
+            self.screen.fill(get_color_tuple(COLORS.get("BACKGROUND_BLACK")))
+            rects.append(self.screen.get_rect())
+        game_views = self.get_game_views(snapshot)
+        for view in game_views:
+            view_rects = view.draw()
+            if full:
+                view_rects = [view.screen.get_rect()]
+            for rect in view_rects:
+                screen_rect = rect.move(view.screen_position)
+                self.screen.blit(view.screen, screen_rect, rect)
+                rects.append(screen_rect)
+        # boards that lost their game are cleared once
+        for view in self.game_views[len(game_views):self.number_of_shown_views]:
+            screen_rect = view.screen.get_rect().move(view.screen_position)
+            self.screen.fill(get_color_tuple(COLORS.get("BACKGROUND_BLACK")), screen_rect)
+            rects.append(screen_rect)
+        self.number_of_shown_views = len(game_views)
+
+        right_side_state = self.get_right_side_state(snapshot)
+        if right_side_state != self.right_side_state:
+            # texts and the best game can reach outside of the frame, the whole column right of the games is drawn
+            rect = pygame.Rect(self.x, 0, self.screen_width - self.x, self.screen_height)
+            self.screen.fill(get_color_tuple(COLORS.get("BACKGROUND_BLACK")), rect)
+            self.draw_right_side(snapshot)
+            self.right_side_state = right_side_state
+            rects.append(rect)
+        # update changed parts of the screen
+        if rects:
+            pygame.display.update(rects)
+
+    def get_game_views(self, snapshot: ParallelSnapshot) -> list:
+        """
+        :return: views of the drawn boards, each showing the game of the board in the snapshot. boards without a
+        game on a partial last page are not part of it
+        """
+        model = self.tetris_parallel_model
+        if not self.game_views:
+            for i, game in enumerate(snapshot.games):
+                view = TetrisView(game, offset_x=i % model.number_of_rows * model.text_x_start + model.margin,
+                                  offset_y=i // model.number_of_rows * model.text_y_start + model.margin,
+                                  display_statistics=False, display_controls=False, scale=model.scale)
+                view.set_offscreen()
+                self.game_views.append(view)
+        # games that are not drawn cost nothing, a board showing another game is drawn again completely
+        for view, game in zip(self.game_views, snapshot.games):
+            if view.tetris_model.index != game.index:
+                view.invalidate()
+            view.tetris_model = game
+            view.title = game.title
+        # a board without a game is drawn completely once it shows a game again
+        for view in self.game_views[len(snapshot.games):]:
+            view.invalidate()
+        return self.game_views[:len(snapshot.games)]
+
+    def get_best_game_view(self, snapshot: ParallelSnapshot):
+        """:return: view of the board showing the best game, None if it is not drawn"""
+        for view in self.game_views[:len(snapshot.games)]:
+            if view.tetris_model.index == snapshot.best_game:
+                return view
+        return None
+
+    def get_right_side_state(self, snapshot: ParallelSnapshot) -> tuple:
+        """:return: everything that is displayed at the right side, it is only drawn again if this changed"""
+        if not snapshot.display_best_of_generation:
+            game = snapshot.get_game(snapshot.best_game)
+            game_view = self.get_best_game_view(snapshot)
+            return (False, snapshot.best_game, snapshot.page, id(game_view), game_view.version if game_view else 0,
+                    game.game_over, game.paused, game.score, game.lines, game.high_score, game.high_score_lines,
+                    game.get_next_shape().name)
+        return (True, snapshot.page, snapshot.weight_line_cleared, snapshot.weight_aggregate_height,
+                snapshot.weight_holes, snapshot.weight_bumpiness, snapshot.mutation_chance, snapshot.high_score,
+                snapshot.high_score_lines)
+
+    def get_best_agent_view(self, game: GameSnapshot) -> TetrisView:
+        """:return: view of the statistics of the best game, it draws the statistics of the game to the screen"""
+        if self.best_agent_view is None:
+            self.best_agent_view = TetrisView(game, display_controls=False, scale=0.75)
+            self.best_agent_view.set_scale(0.75, 1)
+        self.best_agent_view.tetris_model = game
+        self.best_agent_view.title = game.title
+        return self.best_agent_view
+
+    def get_best_agent_board(self, game_view: TetrisView, size: tuple) -> pygame.Surface:
+        """:return: enlarged copy of the surface of the game, it is only scaled again if the game changed"""
+        key = (id(game_view), game_view.version, size)
+        if self.best_agent_board is None or self.best_agent_board[0] != key:
+            self.best_agent_board = (key, pygame.transform.scale(game_view.screen, size))
+        return self.best_agent_board[1]
 
     def _draw_text_center_x(self, text: str, font_size: int, x: int, y: int, width: int, color_str="WHITE"):
         """:param: text the text that will be displayed
@@ -105,45 +481,41 @@ class TetrisParallelView:
            :param: y y coordinates of the text (top)
            :param: width to which the text should be centered
            :param: color_str Color of the text with default white"""
-        text_image = pygame.font.SysFont(FONT_NAME, int(font_size)) \
-            .render(text, False, get_color_tuple(COLORS[color_str]))
+        text_image = get_text_cache().render(text, int(font_size), get_color_tuple(COLORS[color_str]))
 
         self.screen.blit(text_image, (x + width // 2 - text_image.get_width() // 2, y))
 
     def draw_text(self, text: str, font_size: int, x: int, y: int, index: int, color_str="WHITE"):
-        text_image = pygame.font.SysFont(FONT_NAME, int(font_size)) \
-            .render(text, False, get_color_tuple(COLORS[color_str]))
+        text_image = get_text_cache().render(text, int(font_size), get_color_tuple(COLORS[color_str]))
         self.screen.blit(text_image, (x, y))
 
-    def draw_right_side(self):
+    def draw_right_side(self, snapshot: ParallelSnapshot):
         color = get_color_tuple(COLORS.get("PADDING_DARK"))
         pygame.draw.rect(self.screen, color, (self.x, self.y, self.width, self.height), 3, 10)
 
         self._draw_text_center_x(text="Tetris Parallel", font_size=64, x=self.x, y=self.y, width=self.width)
+        if snapshot.number_of_top_games > 0:
+            self._draw_text_center_x(text="Page {} of {} ({} agents)".format(
+                snapshot.page + 1, snapshot.number_of_pages, snapshot.number_of_games), font_size=16,
+                x=self.x, y=self.y + 68, width=self.width)
 
-        if not self.tetris_parallel_model.display_best_of_generation:
-            self.tetris_parallel_model.current_text_index = 0
-            # get best game
-            i = self.tetris_parallel_model.best_game
+        if not snapshot.display_best_of_generation:
             # best agent of current generation
             self._draw_text_center_x(text="Best AI-Agent", font_size=32, x=self.x, y=self.y + 96, width=self.width)
 
-            # back up current values
-            std_scale = self.tetris_parallel_model.tetris_games[i].tetris_view.game_scale
-            std_view_offset_x = self.tetris_parallel_model.tetris_games[i].tetris_view.offset_x
-            std_view_offset_y = self.tetris_parallel_model.tetris_games[i].tetris_view.offset_y
-
-            self.tetris_parallel_model.tetris_games[i].tetris_view.set_scale(0.75, 1)
+            game = snapshot.get_game(snapshot.best_game)
+            view = self.get_best_agent_view(game)
             # center coordinates
-            y = self.height + self.y - self.tetris_parallel_model.tetris_games[i].tetris_view.screen_height - MARGIN
-            x = self.width // 2 + self.x - self.tetris_parallel_model.tetris_games[i].tetris_view.screen_width // 2
-            self.tetris_parallel_model.tetris_games[i].tetris_view.set_offset(x, y)
-            self.tetris_parallel_model.tetris_games[i].tetris_view.display_statistics = True
-            self.tetris_parallel_model.tetris_games[i].tetris_view.draw()
-
-            self.tetris_parallel_model.tetris_games[i].tetris_view.display_statistics = False
-            self.tetris_parallel_model.tetris_games[i].tetris_view.set_scale(std_scale)
-            self.tetris_parallel_model.tetris_games[i].tetris_view.set_offset(std_view_offset_x, std_view_offset_y)
+            y = self.height + self.y - view.screen_height - MARGIN
+            x = self.width // 2 + self.x - view.screen_width // 2
+            view.set_offset(x, y)
+            # the game itself is not drawn again, the surface of its board is enlarged
+            game_view = self.get_best_game_view(snapshot)
+            if game_view is not None:
+                self.screen.blit(self.get_best_agent_board(
+                    game_view, (GRID_COL_COUNT * view.grid_size, view.screen_height)), (x, y))
+            if not game.game_over:
+                view.draw_statistics()
 
         # display data of the best agent of all generations
         else:
@@ -152,45 +524,45 @@ class TetrisParallelView:
             self._draw_text_center_x(text="Best AI-Agent over all", font_size=32,
                                      x=self.x, y=y, width=self.width)
 
-            lines_cleared = self.tetris_parallel_model.weight_line_cleared
-            aggregate_height = self.tetris_parallel_model.weight_aggregate_height
-            weight_holes = self.tetris_parallel_model.weight_holes
-            weight_bumpiness = self.tetris_parallel_model.weight_bumpiness
-            mutation_chance = self.tetris_parallel_model.mutation_chance
+            lines_cleared = snapshot.weight_line_cleared
+            aggregate_height = snapshot.weight_aggregate_height
+            weight_holes = snapshot.weight_holes
+            weight_bumpiness = snapshot.weight_bumpiness
+            mutation_chance = snapshot.mutation_chance
 
             x = self.x + MARGIN
             y += 64
             self.draw_text(text=f"Weight aggregate height: {aggregate_height:.3f}", font_size=16,
                            x=x, y=y,
-                           index=self.tetris_parallel_model.current_text_index)
+                           index=0)
             y += 32
             self.draw_text(text=f"Weight holes: {weight_holes:.3f}", font_size=16,
                            x=x, y=y,
-                           index=self.tetris_parallel_model.current_text_index)
+                           index=0)
             y += 32
             self.draw_text(text=f"Weight bumpiness: {weight_bumpiness:.3f}", font_size=16,
                            x=x, y=y,
-                           index=self.tetris_parallel_model.current_text_index)
+                           index=0)
             y += 32
             self.draw_text(text=f"Weight lines cleared: {lines_cleared:.3f}", font_size=16,
                            x=x, y=y,
-                           index=self.tetris_parallel_model.current_text_index)
+                           index=0)
             y += 32
             self.draw_text(text=f"Mutation chance: {mutation_chance:.3f}", font_size=16,
                            x=x, y=y,
-                           index=self.tetris_parallel_model.current_text_index)
+                           index=0)
 
-            high_score = self.tetris_parallel_model.high_score
-            high_score_lines = self.tetris_parallel_model.high_score_lines
+            high_score = snapshot.high_score
+            high_score_lines = snapshot.high_score_lines
 
             y += 64
             self.draw_text(text=f"Highest score: {high_score:.3f}", font_size=16,
                            x=x, y=y,
-                           index=self.tetris_parallel_model.current_text_index)
+                           index=0)
             y += 32
             self.draw_text(text=f"Highest number of lines cleared: {high_score_lines}",
                            font_size=16, x=x, y=y,
-                           index=self.tetris_parallel_model.current_text_index)
+                           index=0)
 
 
 class TetrisParallelController:
@@ -200,31 +572,43 @@ class TetrisParallelController:
         # map keys to methods
         self.key_actions = {
             "TAB": lambda: self.toggle_display_mode(),
-            "c": lambda: self.start_new_round()
+            "c": lambda: self.start_new_round(),
+            "t": lambda: self.toggle_turbo(),
+            "PAGEUP": lambda: self.change_page(-1),
+            "PAGEDOWN": lambda: self.change_page(1)
         }
 
-        self.generate_games()
+        self.generate_generation_seeds()
+        if not self.tetris_parallel_model.headless:
+            self.generate_games()
         self.generate_agents()
 
     def update(self):
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.quit()
-            elif event.type == pygame.USEREVENT + 1:
-                self.tetris_parallel_model.timer += 1
-                self.calculate_agent_moves()
-                self.drop()
-                # check which game has highest score now
-                self.find_best_agent()
-                if self.all_games_over():
-                    self.tetris_parallel_model.timer = 0
-                    self.start_new_round()
-            elif event.type == pygame.USEREVENT + 2 and self.tetris_parallel_model.display_best_of_generation:
-                self.tetris_parallel_model.current_text_index += 1
-            elif event.type == pygame.KEYDOWN and self.tetris_parallel_model.running:
-                for key in self.key_actions:
-                    if event.key == eval("pygame.K_" + key):
-                        self.key_actions[key]()
+            self.handle_event(event)
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.quit()
+        elif event.type == pygame.USEREVENT + 1 and not self.tetris_parallel_model.turbo:
+            self.step()
+        elif event.type == pygame.USEREVENT + 2 and self.tetris_parallel_model.display_best_of_generation:
+            self.tetris_parallel_model.current_text_index += 1
+        elif event.type == pygame.KEYDOWN and self.tetris_parallel_model.running:
+            for key in self.key_actions:
+                if event.key == eval("pygame.K_" + key):
+                    self.key_actions[key]()
+
+    def step(self):
+        """advances every game by one tick and starts the next generation once every game is over"""
+        self.tetris_parallel_model.timer += 1
+        self.calculate_agent_moves()
+        self.drop()
+        # check which game has highest score now
+        self.find_best_agent()
+        if self.all_games_over():
+            self.tetris_parallel_model.timer = 0
+            self.start_new_round()
 
     def calculate_agent_moves(self):
         for agent in self.tetris_parallel_model.agents:
@@ -244,73 +628,168 @@ class TetrisParallelController:
         self.tetris_parallel_model.best_game = index
 
     def generate_games(self):
-        number_of_rows = self.tetris_parallel_model.number_of_rows
-        board_width = self.tetris_parallel_model.text_x_start
-        board_height = self.tetris_parallel_model.text_y_start
-        margin = self.tetris_parallel_model.margin
-        # generate all games
+        # generate all games, the parallel view draws them on its own boards
         for i in range(self.tetris_parallel_model.number_of_games):
             self.tetris_parallel_model.tetris_games.append(
                 Tetris(interactive=False,
                        visible=True,
-                       offset_x=i % number_of_rows * board_width + margin,
-                       offset_y=i // number_of_rows * board_height + margin,
                        display_statistics=False,
                        display_controls=False,
                        title="AI_AGENT {}".format(i),
                        lock_step=True,
-                       scale=self.tetris_parallel_model.scale))
+                       scale=self.tetris_parallel_model.scale,
+                       board_engine=self.tetris_parallel_model.board_engine))
+            self.tetris_parallel_model.tetris_games[i].tetris_controller.reset_game(
+                self.tetris_parallel_model.generation_seeds[0])
         # default best game is game with index zero
         self.tetris_parallel_model.best_game = 0
 
-    def start_new_round(self):
-
-        agents, games = self.tetris_parallel_model.agents, self.tetris_parallel_model.tetris_games
-        agents_game_mapping = list(zip(agents, games))
-        n = len(agents_game_mapping) // 2
-        # sort best agents
-        agents_game_mapping = sorted(agents_game_mapping, reverse=True, key=lambda x: x[1].tetris_model.score)
-
-        if agents_game_mapping[0][1].tetris_model.score > self.tetris_parallel_model.high_score:
-            self.update_best_overall_agent(high_score=agents_game_mapping[0][1].tetris_model.score,
-                                           high_score_lines=agents_game_mapping[0][1].tetris_model.lines,
-                                           weight_line_cleared=agents_game_mapping[0][0].weight_line_cleared,
-                                           weight_holes=agents_game_mapping[0][0].weight_holes,
-                                           weight_bumpiness=agents_game_mapping[0][0].weight_bumpiness,
-                                           weight_aggregate_height=agents_game_mapping[0][0].weight_aggregate_height,
-                                           mutation_chance=agents_game_mapping[0][0].mutation_weight)
-        # reset all games of the model
-        for game in self.tetris_parallel_model.tetris_games:
-            game.tetris_controller.reset_game()
-
-        # reset game state of the best agent
-        agents_game_mapping[0][0].game = self.tetris_parallel_model.tetris_games[0]
-        # best agent will be part of next generation
-        agents = [agents_game_mapping[0][0]]
-
-        for i in range(1, self.tetris_parallel_model.number_of_games):
-            # every new agent is based on the winner and another agent
-            agents.append(agents_game_mapping[0][0].get_child(agents_game_mapping[i][0], games[i]))
-
-        # set models agents to the new list of agents
-        self.tetris_parallel_model.agents = agents
+    def start_new_round(self, results=None):
+        """
+        selects the best agents of the generation and breeds the next generation from them
+
+        :param results: score, lines and weights of the game of every agent, read from the games if None
+        """
+        games = self.tetris_parallel_model.tetris_games
+        if results is None:
+            results = [GameResult(game.tetris_model.score, game.tetris_model.lines, agent.get_weights(),
+                                  game.tetris_model.pieces)
+                       for agent, game in zip(self.tetris_parallel_model.agents, games)]
+        population = self.tetris_parallel_model.population
+        population.set_fitness([result[0] for result in results])
+
+        high_score, high_score_lines, weights = results[population.get_ranking()[0]]
+        if high_score > self.tetris_parallel_model.high_score:
+            self.update_best_overall_agent(high_score, high_score_lines, *weights)
+        self.log_generation(results, weights)
+        self.generate_generation_seeds()
+        # reset all games of the model, every game of a generation gets the same shapes
+        for game in games:
+            game.tetris_controller.reset_game(self.tetris_parallel_model.generation_seeds[0])
+
+        # the best agents are kept in the first rows, every other row gets a child. agents keep their games
+        population.breed()
+        population.apply(self.tetris_parallel_model.agents)
+        self.tetris_parallel_model.generation += 1
+
+        evaluation_cache = self.tetris_parallel_model.evaluation_cache
+        if evaluation_cache is not None:
+            log("Evaluation cache: {} entries, {:.1%} hits, {} evictions".format(
+                len(evaluation_cache), evaluation_cache.get_hit_rate(), evaluation_cache.evictions), 2)
+        if not self.tetris_parallel_model.headless:
+            text_cache = get_text_cache()
+            log("Text cache: {} texts, {:.1%} hits, {} evictions".format(
+                len(text_cache), text_cache.get_hit_rate(), text_cache.evictions), 2)
+        model = self.tetris_parallel_model
+        if model.checkpoint_file is not None and model.generation % max(1, model.checkpoint_every) == 0:
+            self.save_checkpoint()
+
+    def save_checkpoint(self):
+        """saves the population of the current generation to the checkpoint file of the model"""
+        model = self.tetris_parallel_model
+        write_checkpoint(model.checkpoint_file, Checkpoint.from_model(model))
+        log("Saved generation {} to {}".format(model.generation, model.checkpoint_file), 2)
+
+    def restore_checkpoint(self, checkpoint: Checkpoint):
+        """continues the training at the generation of the checkpoint with its agents and random states"""
+        model = self.tetris_parallel_model
+        if len(checkpoint.agent_weights) != model.number_of_games:
+            raise ValueError("Checkpoint has {} agents instead of {}".format(len(checkpoint.agent_weights),
+                                                                           model.number_of_games))
+        model.population.weights = np.array(checkpoint.agent_weights, dtype=np.float64)
+        model.population.apply(model.agents)
+        model.generation = checkpoint.generation
+        model.generation_seeds = list(checkpoint.generation_seeds)
+        model.randomizer.setstate(checkpoint.randomizer_state)
+        random.setstate(checkpoint.random_state)
+        high_score_lines = checkpoint.high_score_lines
+        if float(high_score_lines).is_integer():
+            high_score_lines = int(high_score_lines)
+        self.update_best_overall_agent(checkpoint.high_score, high_score_lines, *checkpoint.best_weights)
+        for game in model.tetris_games:
+            game.tetris_controller.reset_game(model.generation_seeds[0])
+        model.timer = 0
+        model.generation_start = time.perf_counter()
+        log("Resumed generation {}".format(model.generation), 10)
+
+    def log_generation(self, results, elite_weights):
+        """
+        appends the metrics of the finished generation to the metrics log of the model
+
+        :param results: score, lines and weights of every agent, the placed shapes in pieces if it is a GameResult
+        :param elite_weights: weights of the best agent of the generation
+        """
+        model = self.tetris_parallel_model
+        end = time.perf_counter()
+        duration = end - model.generation_start
+        model.generation_start = end
+        if model.metrics_log is None:
+            return
+        scores = [result[0] for result in results]
+        lines = [result[1] for result in results]
+        pieces = sum(getattr(result, "pieces", 0) for result in results)
+        record = {
+            "generation": model.generation,
+            "time": time.time(),
+            "duration": duration,
+            "pieces": pieces,
+            "pieces_per_second": pieces / duration if duration > 0 else 0.0,
+            "score_min": min(scores),
+            "score_median": statistics.median(scores),
+            "score_max": max(scores),
+            "lines_min": min(lines),
+            "lines_median": statistics.median(lines),
+            "lines_max": max(lines),
+            "high_score": model.high_score,
+        }
+        record.update(zip(("weight_line_cleared", "weight_aggregate_height", "weight_holes", "weight_bumpiness",
+                           "mutation_chance"), elite_weights))
+        model.metrics_log.write(record)
+
+    def generate_generation_seeds(self):
+        """draws the seeds of the piece sequences of the next generation, rendered games only play the first one"""
+        randomizer = self.tetris_parallel_model.randomizer
+        self.tetris_parallel_model.generation_seeds = [randomizer.getrandbits(32)
+                                                       for _ in range(PIECE_SEQUENCES_PER_GENERATION)]
+
+    def _get_game(self, index):
+        """:return: game with the index, None in headless mode"""
+        games = self.tetris_parallel_model.tetris_games
+        return games[index] if index < len(games) else None
 
     def all_games_over(self):
         return all([game.tetris_model.game_over for game in self.tetris_parallel_model.tetris_games])
 
     def generate_agents(self):
+        self.tetris_parallel_model.population = Population(self.tetris_parallel_model.number_of_games)
         for i in range(self.tetris_parallel_model.number_of_games):
-            self.tetris_parallel_model.agents.append(Agent(self.tetris_parallel_model.tetris_games[i]))
+            agent_class = AGENT_TYPES[self.tetris_parallel_model.agent_type]
+            agent = agent_class(self._get_game(i), self.tetris_parallel_model.evaluation_cache)
+            if self.tetris_parallel_model.leaf_executor is not None:
+                agent.executor = self.tetris_parallel_model.leaf_executor
+            self.tetris_parallel_model.agents.append(agent)
+        self.tetris_parallel_model.population.apply(self.tetris_parallel_model.agents)
 
     def toggle_display_mode(self):
         toggle_value = not self.tetris_parallel_model.display_best_of_generation
         self.tetris_parallel_model.display_best_of_generation = toggle_value
 
+    def change_page(self, direction: int):
+        """:param direction: number of pages the drawn games move forward"""
+        model = self.tetris_parallel_model
+        model.page = min(max(0, model.page + direction), model.get_number_of_pages() - 1)
+
+    def toggle_turbo(self):
+        self.tetris_parallel_model.turbo = not self.tetris_parallel_model.turbo
+
     def drop(self):
         for tetris_game in self.tetris_parallel_model.tetris_games:
-            tetris_game.tetris_controller.drop()
+            if TIME_SKIP:
+                tetris_game.tetris_controller.drop_to_landing()
+            else:
+                tetris_game.tetris_controller.drop()
 
-    def update_best_overall_agent(self, high_score: int, high_score_lines: int, weight_line_cleared: float,
+    def update_best_overall_agent(self, high_score: float, high_score_lines: int, weight_line_cleared: float,
                                   weight_aggregate_height: float, weight_holes: float, weight_bumpiness: float,
                                   mutation_chance: float):
         self.tetris_parallel_model.high_score = high_score
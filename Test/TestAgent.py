@@ -0,0 +1,116 @@
+import math
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from AI.AI_Agent import Agent, ExpectimaxAgent, LookaheadAgent, evaluate_chance_node
+from Tetris_Game.GameCore import HeadlessTetris
+from Tetris_Game.Settings import *
+from Tetris_Game.Shape import Shape, ShapeForms
+
+WEIGHTS = (WEIGHT_LINE_CLEARED, WEIGHT_AGGREGATE_HEIGHT, WEIGHT_HOLES, WEIGHT_BUMPINESS, 0.5)
+
+
+class AgentTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.game = HeadlessTetris(seed=11)
+        board = self.game.tetris_model.game_board
+        for placement in ((ShapeForms.I_SHAPE, 0, 0), (ShapeForms.O_SHAPE, 0, 4), (ShapeForms.T_SHAPE, 2, 6)):
+            board.apply(placement)
+
+    def _create_agent(self, agent_class, **kwargs):
+        agent = agent_class(self.game, **kwargs)
+        agent.set_weights(*WEIGHTS)
+        return agent
+
+    def test_depth_one_is_greedy(self):
+        greedy_move = self._create_agent(Agent)._find_best_move()
+        lookahead_move = self._create_agent(LookaheadAgent, depth=1)._find_best_move()
+        self.assertEqual((greedy_move["turn"], greedy_move["move"]), (lookahead_move["turn"], lookahead_move["move"]))
+
+    def test_search_keeps_board(self):
+        board = self.game.tetris_model.game_board
+        state = (str(board), board.zobrist_hash)
+        agent = self._create_agent(LookaheadAgent, time_budget=None)
+        agent._find_best_move()
+        self.assertEqual(state, (str(board), board.zobrist_hash))
+        # every beam entry was expanded with the preview shape
+        self.assertGreater(agent.number_of_nodes, board.evaluate_all_placements(
+            self.game.tetris_model.get_current_shape().shape_form).size)
+
+    def test_node_budget(self):
+        greedy_move = self._create_agent(Agent)._find_best_move()
+        placements = self.game.tetris_model.game_board.evaluate_all_placements(
+            self.game.tetris_model.get_current_shape().shape_form)
+        agent = self._create_agent(LookaheadAgent, max_nodes=placements.size, time_budget=None)
+        move = agent._find_best_move()
+        # budget was used by the current shape, so the best placement of it is used
+        self.assertEqual(placements.size, agent.number_of_nodes)
+        self.assertEqual((greedy_move["turn"], greedy_move["move"]), (move["turn"], move["move"]))
+
+    def test_search_once_per_shape(self):
+        agent = self._create_agent(LookaheadAgent, time_budget=None)
+        shape = self.game.tetris_model.get_current_shape()
+        agent.calculate_next_move()
+        self.game.step()
+        agent.number_of_nodes = 0
+        agent.calculate_next_move()
+        self.assertEqual(0, agent.number_of_nodes)
+        self.assertEqual((agent.planned_turns, agent.planned_x), (shape.turns, shape.x))
+
+    def test_distribution(self):
+        agent = self._create_agent(ExpectimaxAgent)
+        shapes = self.game.tetris_model.shapes
+        distribution = agent.get_distribution()
+        self.assertEqual(len(shapes) - 2, sum(count for _, count in distribution))
+        # no shapes left in the bag -> every shape can be drawn
+        del shapes[:len(shapes) - 2]
+        self.assertEqual(tuple((shape_form, 1) for shape_form in range(1, 8)), agent.get_distribution())
+        agent.use_bag = False
+        self.assertEqual(tuple((shape_form, 1) for shape_form in range(1, 8)), agent.get_distribution())
+
+    def test_chance_node(self):
+        board = self.game.tetris_model.game_board
+        value = evaluate_chance_node(board, ((int(ShapeForms.I_SHAPE), 1), (int(ShapeForms.O_SHAPE), 3)), WEIGHTS)
+        scores = []
+        for shape_form in (ShapeForms.I_SHAPE, ShapeForms.O_SHAPE):
+            agent = self._create_agent(Agent)
+            self.game.tetris_model.shapes.append(Shape(shape_form, board, GRID_COL_COUNT // 2, GRID_ROW_COUNT - 1))
+            scores.append(agent._find_best_move()["score"])
+            self.game.tetris_model.shapes.pop()
+        self.assertAlmostEqual(0.25 * scores[0] + 0.75 * scores[1], value)
+
+    def test_expectimax_cache(self):
+        board = self.game.tetris_model.game_board
+        state = (str(board), board.zobrist_hash)
+        agent = self._create_agent(ExpectimaxAgent, time_budget=None)
+        move = agent._find_best_move()
+        self.assertEqual(state, (str(board), board.zobrist_hash))
+        self.assertGreater(len(agent.chance_cache), 0)
+        # second search of the same position only reads cached chance nodes
+        agent.planned_shape = None
+        number_of_entries = len(agent.chance_cache)
+        self.assertEqual(move, agent._find_best_move())
+        self.assertEqual(number_of_entries, len(agent.chance_cache))
+
+    def test_expectimax_budget_is_not_cached(self):
+        # inner chance nodes of a search that ran out of nodes are not cached, leaves are always exact
+        agent = self._create_agent(ExpectimaxAgent, depth=2, time_budget=None, max_nodes=50)
+        agent._find_best_move()
+        self.assertGreater(agent.number_of_truncations, 0)
+        self.assertEqual([], [key for key in agent.chance_cache if key[2] == 2])
+        agent = self._create_agent(ExpectimaxAgent, depth=2, time_budget=None, max_nodes=math.inf)
+        agent._find_best_move()
+        self.assertEqual(0, agent.number_of_truncations)
+        self.assertNotEqual([], [key for key in agent.chance_cache if key[2] == 2])
+
+    def test_expectimax_executor(self):
+        move = self._create_agent(ExpectimaxAgent, depth=2, time_budget=None)._find_best_move()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            agent = self._create_agent(ExpectimaxAgent, depth=2, time_budget=None, executor=executor)
+            self.assertEqual(move, agent._find_best_move())
+        self.assertEqual({}, agent.pending_leaves)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import random
+import unittest
+
+import numpy as np
+
+from Tetris_Game.BatchBoard import TetrisBatchBoard, SHAPE_WIDTHS
+from Tetris_Game.BitBoard import TetrisBitBoard
+from Tetris_Game.Settings import *
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+
+class BatchBoardTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.number_of_boards = 16
+        self.batch_board = TetrisBatchBoard(self.number_of_boards)
+
+    def test_drop(self):
+        # I shapes next to each other and an O shape clear the lowest row of the first board only
+        for column in (0, 4):
+            self.batch_board.drop([1, 1] + [2] * 14, [0] * 16, [column] * 16)
+        lines_cleared = self.batch_board.drop([2] * 16, [0] * 16, [8] * 16)
+        self.assertEqual([1, 1] + [0] * 14, lines_cleared.tolist())
+        self.assertEqual([0] * 8 + [1, 1], self.batch_board.heights[0].tolist())
+        self.assertEqual([0] * 8 + [SHAPES_ID['O']] * 2, self.batch_board.cells[0, 0].tolist())
+
+    def test_invalid_column(self):
+        self.assertRaises(ValueError, lambda: self.batch_board.drop([1] * 16, [0] * 16, [7] * 16))
+
+    def test_matches_single_boards(self):
+        """drops random shapes on all boards and compares them to single bit boards"""
+        randomizer = random.Random(7)
+        boards = [TetrisBitBoard() for _ in range(self.number_of_boards)]
+        for _ in range(200):
+            shape_forms = [randomizer.randint(1, 7) for _ in boards]
+            turns = [randomizer.randrange(4) for _ in boards]
+            columns = [randomizer.randrange(GRID_COL_COUNT - SHAPE_WIDTHS[shape_form, turn] + 1)
+                       for shape_form, turn in zip(shape_forms, turns)]
+
+            placed = self.batch_board.place_shapes(shape_forms, turns, columns)
+            lines_cleared = self.batch_board.remove_full_rows()
+
+            for i, board in enumerate(boards):
+                orientations = SHAPE_ORIENTATIONS[shape_forms[i]]
+                shape = orientations[turns[i] % len(orientations)].shape
+                # drop from the top rows like the shape of a game
+                self.assertEqual(board.place_shape(shape, columns[i], GRID_ROW_COUNT - 1), placed[i])
+                if not placed[i]:
+                    continue
+                self.assertEqual(board.remove_full_rows(), lines_cleared[i])
+                cells = np.zeros((GRID_ROW_COUNT, GRID_COL_COUNT), dtype=np.uint8)
+                for x, y, val in board.get_cells():
+                    cells[y, x] = val
+                self.assertTrue(np.array_equal(cells, self.batch_board.cells[i]))
+                self.assertEqual(board.get_col_heights(), self.batch_board.heights[i].tolist())
+                self.assertEqual(board.get_hole_count(), self.batch_board.get_hole_count()[i])
+                self.assertEqual(board.get_bumpiness(), self.batch_board.get_bumpiness()[i])
+
+            # start over on every board that is game over
+            game_over = self.batch_board.game_over.copy()
+            self.batch_board.reset_board(game_over)
+            boards = [TetrisBitBoard() if over else board for board, over in zip(boards, game_over)]
+
+    def test_evaluate_all_placements(self):
+        """evaluates the placements of random shapes on all boards and compares them to single bit boards"""
+        randomizer = random.Random(3)
+        boards = [TetrisBitBoard() for _ in range(self.number_of_boards)]
+        for _ in range(200):
+            shape_form = randomizer.randint(1, 7)
+            placements = self.batch_board.evaluate_all_placements(shape_form)
+            for i, board in enumerate(boards):
+                if self.batch_board.game_over[i]:
+                    continue
+                buffer = board.evaluate_all_placements(shape_form)
+                expected = [(buffer.turns[j], buffer.x[j], buffer.lines_cleared[j], buffer.aggregate_height[j],
+                             buffer.number_of_holes[j], buffer.bumpiness[j]) for j in range(buffer.size)]
+                self.assertEqual(expected, [
+                    (placements.turns[j], placements.x[j], placements.lines_cleared[i, j],
+                     placements.aggregate_height[i, j], placements.number_of_holes[i, j], placements.bumpiness[i, j])
+                    for j in range(len(placements.turns)) if placements.valid[i, j]])
+
+            # random placements, boards that are game over start over
+            turns = [randomizer.randrange(4) for _ in boards]
+            columns = [randomizer.randrange(GRID_COL_COUNT - SHAPE_WIDTHS[shape_form, turn] + 1) for turn in turns]
+            placed = self.batch_board.place_shapes([shape_form] * self.number_of_boards, turns, columns)
+            self.batch_board.remove_full_rows()
+            orientations = SHAPE_ORIENTATIONS[shape_form]
+            for i, board in enumerate(boards):
+                if placed[i]:
+                    board.place_shape(orientations[turns[i] % len(orientations)].shape, columns[i], GRID_ROW_COUNT - 1)
+                    board.remove_full_rows()
+            game_over = self.batch_board.game_over.copy()
+            self.batch_board.reset_board(game_over)
+            boards = [TetrisBitBoard() if over else board for board, over in zip(boards, game_over)]
+
+    def test_move_from_spawn(self):
+        # a tower next to the start column blocks every shift to the right of the shapes on the first board
+        column = GRID_COL_COUNT // 2 + 2
+        for _ in range(GRID_ROW_COUNT // 4):
+            self.batch_board.place_shapes([1] + [2] * 15, [1] + [0] * 15, [column] * 16)
+            self.batch_board.reset_board(np.arange(1, 16))
+        turns, columns = self.batch_board.move_from_spawn(SHAPES_ID['O'], [0] * 16, [GRID_COL_COUNT - 2] * 16)
+        self.assertEqual([0] * 16, turns.tolist())
+        self.assertEqual([column - 2] + [GRID_COL_COUNT - 2] * 15, columns.tolist())
+        # the second turn of a T shape reaches into the tower, the shape is shifted without the later turns
+        turns, columns = self.batch_board.move_from_spawn(SHAPES_ID['T'], [3] * 16, [0] * 16)
+        self.assertEqual([1] + [3] * 15, turns.tolist())
+        self.assertEqual([0] * 16, columns.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from Benchmark.Benchmarks import compare, get_game, get_positions, run_game_benchmark, run_generation_benchmark, \
+    run_micro_benchmarks
+
+
+def get_results(unit: str, median: float) -> dict:
+    return {"engines": {"column": {"benchmark": {"median": median, "min": median, "unit": unit}}}}
+
+
+class BenchmarksTestCase(unittest.TestCase):
+
+    def test_positions_are_seeded(self):
+        positions = get_positions("bitboard", 10)
+        same_positions = get_positions("bitboard", 10)
+        self.assertEqual(len(positions), 10)
+        self.assertEqual([(board.zobrist_hash, shape_form) for board, shape_form in positions],
+                         [(board.zobrist_hash, shape_form) for board, shape_form in same_positions])
+
+    def test_game_of_position(self):
+        board, shape_form = get_positions("column", 5)[4]
+        game = get_game("column", board, shape_form)
+        tetris_model = game.tetris_model
+        self.assertEqual(board.zobrist_hash, tetris_model.game_board.zobrist_hash)
+        self.assertEqual(shape_form, tetris_model.get_current_shape().shape_form)
+        # every shape is placed on the board of the game
+        self.assertTrue(all(shape.board is tetris_model.game_board for shape in tetris_model.shapes))
+
+    def test_micro_benchmarks(self):
+        results = run_micro_benchmarks("column", 3, 1)
+        self.assertEqual(set(results), {"distance_to_collision", "evaluate_position", "place_shape",
+                                        "remove_full_rows", "agent_calculate_next_move"})
+        for result in results.values():
+            self.assertEqual(result["unit"], "ns/call")
+            self.assertGreater(result["median"], 0)
+
+    def test_game_benchmark(self):
+        result = run_game_benchmark("bitboard", 5)
+        self.assertEqual(result["unit"], "pieces/s")
+        self.assertEqual(result["pieces"], 5)
+
+    def test_generation_benchmark(self):
+        result = run_generation_benchmark("column", 4, 20)
+        batch_result = run_generation_benchmark("batch", 4, 20)
+        self.assertEqual(batch_result["unit"], "pieces/s")
+        # the batch engine places the same pieces as the games of the other engines
+        self.assertEqual(result["pieces"], batch_result["pieces"])
+        self.assertEqual(result["pieces"], 4 * 20)
+
+    def test_compare(self):
+        self.assertEqual(compare(get_results("ns/call", 100), get_results("ns/call", 105), 0.1), [])
+        self.assertEqual(compare(get_results("ns/call", 100), get_results("ns/call", 120), 0.1),
+                         [("column/benchmark", 100, 120)])
+        # more pieces per second are better
+        self.assertEqual(compare(get_results("pieces/s", 100), get_results("pieces/s", 120), 0.1), [])
+        self.assertEqual(compare(get_results("pieces/s", 100), get_results("pieces/s", 80), 0.1),
+                         [("column/benchmark", 100, 80)])
+
+
+if __name__ == '__main__':
+    unittest.main()
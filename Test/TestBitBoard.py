@@ -0,0 +1,70 @@
+import random
+import unittest
+
+from Tetris_Game.BitBoard import TetrisBitBoard
+from Tetris_Game.Board import TetrisBoard
+from Tetris_Game.Settings import *
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+
+class BitBoardTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.board = TetrisBitBoard()
+
+    def test_distance_to_collision(self):
+        self.assertEqual(20, self.board.distance_to_collision(I_shape, 0, 20))
+        self.assertEqual(9, self.board.distance_to_collision(O_shape, 0, 10))
+        self.assertEqual(15, self.board.distance_to_collision(T_shape, 3, 16))
+        self.assertEqual(-2, self.board.distance_to_collision(T_shape, 5, -1))
+        self.assertEqual(12, self.board.distance_to_collision(J_shape, 6, 14))
+
+    def test_place_shape(self):
+        self.board.place_shape(I_shape, 0, 16)
+        self.board.place_shape(Z_shape, 0, 20)
+        self.assertEqual([SHAPES_ID['I']] * 4 + [0] * 6, self.board.cell_rows[0])
+        self.assertEqual([0, SHAPES_ID['Z'], SHAPES_ID['Z']] + [0] * 7, self.board.cell_rows[1])
+        self.assertEqual([SHAPES_ID['Z'], SHAPES_ID['Z']] + [0] * 8, self.board.cell_rows[2])
+        self.assertEqual([3, 3, 2, 1] + [0] * 6, self.board.get_col_heights())
+        self.assertEqual(1, self.board.get_hole_count())
+        self.assertRaises(IndexError, lambda: self.board.place_shape(I_shape, 0, 2, 0))
+
+    def test_remove_full_rows(self):
+        self.board.place_shape(I_shape, 0, 20)
+        self.board.place_shape(I_shape, 4, 20)
+        self.board.place_shape(O_shape, 8, 20)
+        self.assertEqual(1, self.board.remove_full_rows())
+        self.assertEqual([0] * 8 + [1, 1], self.board.get_col_heights())
+        self.assertEqual([0] * 8 + [SHAPES_ID['O']] * 2, self.board.cell_rows[0])
+        self.assertEqual(0, self.board.row_masks[1])
+
+    def test_matches_column_board(self):
+        """plays random games on both boards and compares every result"""
+        randomizer = random.Random(42)
+        column_board = TetrisBoard()
+        for _ in range(400):
+            structure = randomizer.choice(SHAPE_ORIENTATIONS[randomizer.randint(1, 7)]).shape
+            x = randomizer.randrange(GRID_COL_COUNT - len(structure) + 1)
+            y = GRID_ROW_COUNT - 1
+
+            self.assertEqual(column_board.has_collision(structure, x, y), self.board.has_collision(structure, x, y))
+            self.assertEqual(column_board.distance_to_collision(structure, x, y),
+                             self.board.distance_to_collision(structure, x, y))
+            self.assertEqual(column_board.evaluate_position(structure, x, y),
+                             self.board.evaluate_position(structure, x, y))
+
+            placed = column_board.place_shape(structure, x, y)
+            self.assertEqual(placed, self.board.place_shape(structure, x, y))
+            if not placed:
+                column_board.reset_board()
+                self.board.reset_board()
+                continue
+            self.assertEqual(column_board.remove_full_rows(), self.board.remove_full_rows())
+            self.assertEqual(column_board.get_col_heights(), self.board.get_col_heights())
+            self.assertEqual(column_board.get_hole_count(), self.board.get_hole_count())
+            self.assertEqual(column_board.get_bumpiness(), self.board.get_bumpiness())
+            self.assertEqual(sorted(column_board.get_cells()), sorted(self.board.get_cells()))
+
+
+if __name__ == '__main__':
+    unittest.main()
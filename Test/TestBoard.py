@@ -1,9 +1,12 @@
+import random
 import unittest
 
-from Tetris_Game.Board import TetrisBoard
+from Tetris_Game.BitBoard import TetrisBitBoard
+from Tetris_Game.Board import TetrisBoard, ZOBRIST_KEYS
 from Tetris_Game.Controls import Turn
 from Tetris_Game.Settings import *
 from Tetris_Game.Shape import Shape, ShapeForms
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
 
 
 class MyTestCase(unittest.TestCase):
@@ -115,6 +118,127 @@ class MyTestCase(unittest.TestCase):
         self.assertTrue(all([column.highest_index == -1 or column.column[column.highest_index] != 0
                              for column in self.board.column_list]))
 
+    def test_evaluate_all_placements(self):
+        """bulk evaluation matches evaluate_position for every placement"""
+        randomizer = random.Random(11)
+        for board in (self.board, TetrisBitBoard()):
+            for _ in range(300):
+                shape_form = randomizer.choice(list(ShapeForms))
+                y = randomizer.randrange(GRID_ROW_COUNT)
+                placements = board.evaluate_all_placements(shape_form, y)
+                expected = []
+                for orientation in SHAPE_ORIENTATIONS[int(shape_form)]:
+                    for x in range(GRID_COL_COUNT - orientation.width + 1):
+                        val = board.evaluate_position(orientation.shape, x, y)
+                        if val["valid"]:
+                            expected.append((orientation.turns, x, val["lines_cleared"], val["max_heights"],
+                                             val["number_of_holes"], val["bumpiness"]))
+                self.assertEqual(expected, [(placements.turns[i], placements.x[i], placements.lines_cleared[i],
+                                             placements.aggregate_height[i], placements.number_of_holes[i],
+                                             placements.bumpiness[i]) for i in range(placements.size)])
+
+                orientation = randomizer.choice(SHAPE_ORIENTATIONS[int(shape_form)])
+                x = randomizer.randrange(GRID_COL_COUNT - orientation.width + 1)
+                if not board.place_shape(orientation.shape, x, GRID_ROW_COUNT - 1):
+                    board.reset_board()
+                board.remove_full_rows()
+
+    def test_apply_undo(self):
+        """undoing placements in reverse order restores every previous state"""
+        randomizer = random.Random(5)
+        for board in (self.board, TetrisBitBoard()):
+            for _ in range(100):
+                states = []
+                tokens = []
+                for _ in range(randomizer.randrange(1, 6)):
+                    states.append((str(board), board.get_col_heights(), board.get_hole_count(),
+                                   sorted(board.get_cells()), board.zobrist_hash))
+                    shape_form = randomizer.choice(list(ShapeForms))
+                    turns = randomizer.randrange(4)
+                    orientations = SHAPE_ORIENTATIONS[int(shape_form)]
+                    x = randomizer.randrange(GRID_COL_COUNT - orientations[turns % len(orientations)].width + 1)
+                    token = board.apply((shape_form, turns, x))
+                    if token is None:
+                        states.pop()
+                        break
+                    tokens.append(token)
+                for token, state in zip(reversed(tokens), reversed(states)):
+                    board.undo(token)
+                    self.assertEqual(state, (str(board), board.get_col_heights(), board.get_hole_count(),
+                                             sorted(board.get_cells()), board.zobrist_hash))
+                # continue with a different board
+                for _ in range(randomizer.randrange(4)):
+                    orientation = randomizer.choice(SHAPE_ORIENTATIONS[randomizer.randint(1, 7)])
+                    x = randomizer.randrange(GRID_COL_COUNT - orientation.width + 1)
+                    if not board.place_shape(orientation.shape, x, GRID_ROW_COUNT - 1):
+                        board.reset_board()
+                    board.remove_full_rows()
+
+    def test_apply_undo_line_clear(self):
+        for board in (self.board, TetrisBitBoard()):
+            # two rows filled except the last two columns and shapes above them
+            for x in range(0, GRID_COL_COUNT - 2, 2):
+                board.apply((ShapeForms.O_SHAPE, 0, x))
+            board.apply((ShapeForms.L_SHAPE, 2, 1))
+            board.apply((ShapeForms.I_SHAPE, 1, 5))
+            state = (str(board), board.get_col_heights(), board.get_hole_count(), board.zobrist_hash)
+            token = board.apply((ShapeForms.O_SHAPE, 0, 8))
+            self.assertEqual(2, token.lines_cleared)
+            board.undo(token)
+            self.assertEqual(state, (str(board), board.get_col_heights(), board.get_hole_count(), board.zobrist_hash))
+
+    def test_apply_matches_place_shape(self):
+        other_board = TetrisBoard()
+        randomizer = random.Random(8)
+        for _ in range(200):
+            shape_form = randomizer.choice(list(ShapeForms))
+            orientation = randomizer.choice(SHAPE_ORIENTATIONS[int(shape_form)])
+            x = randomizer.randrange(GRID_COL_COUNT - orientation.width + 1)
+            token = self.board.apply((shape_form, orientation.turns, x))
+            if token is None:
+                self.assertFalse(other_board.place_shape(orientation.shape, x, GRID_ROW_COUNT - 1))
+                self.board.reset_board()
+                other_board.reset_board()
+                continue
+            self.assertTrue(other_board.place_shape(orientation.shape, x, GRID_ROW_COUNT - 1))
+            self.assertEqual(other_board.remove_full_rows(), token.lines_cleared)
+            self.assertEqual(str(other_board), str(self.board))
+            self.assertEqual([(column.highest_index, column.number_of_wholes) for column in other_board.column_list],
+                             [(column.highest_index, column.number_of_wholes) for column in self.board.column_list])
+
+    def test_zobrist_hash(self):
+        """the incremental hash is the xor of the keys of all filled cells and equal on both engines"""
+        other_board = TetrisBitBoard()
+        randomizer = random.Random(13)
+        for _ in range(300):
+            shape_form = randomizer.choice(list(ShapeForms))
+            orientation = randomizer.choice(SHAPE_ORIENTATIONS[int(shape_form)])
+            x = randomizer.randrange(GRID_COL_COUNT - orientation.width + 1)
+            if self.board.apply((shape_form, orientation.turns, x)) is None:
+                self.assertIsNone(other_board.apply((shape_form, orientation.turns, x)))
+                self.board.reset_board()
+                other_board.reset_board()
+                self.assertEqual(0, self.board.zobrist_hash)
+                continue
+            other_board.apply((shape_form, orientation.turns, x))
+            expected = 0
+            for x, y, _ in self.board.get_cells():
+                expected ^= ZOBRIST_KEYS[x][y]
+            self.assertEqual(expected, self.board.zobrist_hash)
+            self.assertEqual(expected, other_board.zobrist_hash)
+
+    def test_clone(self):
+        for board in (self.board, TetrisBitBoard()):
+            board.apply((ShapeForms.T_SHAPE, 0, 3))
+            clone = board.clone()
+            state = (str(board), board.get_col_heights(), board.get_hole_count(), board.zobrist_hash)
+            self.assertEqual(state, (str(clone), clone.get_col_heights(), clone.get_hole_count(), clone.zobrist_hash))
+
+            clone.apply((ShapeForms.I_SHAPE, 1, 0))
+            clone.apply((ShapeForms.O_SHAPE, 0, 3))
+            self.assertEqual(state, (str(board), board.get_col_heights(), board.get_hole_count(), board.zobrist_hash))
+            self.assertNotEqual(board.zobrist_hash, clone.zobrist_hash)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import os
+import random
+import tempfile
+import unittest
+
+from Parallel.Checkpoint import Checkpoint, read_checkpoint, write_checkpoint
+from Parallel.TetrisParallel import TetrisParallel
+
+
+def get_state(tetris_parallel) -> tuple:
+    model = tetris_parallel.tetris_parallel_model
+    return (model.generation, [agent.get_weights() for agent in model.agents], model.generation_seeds,
+            model.high_score, model.high_score_lines, model.randomizer.getstate())
+
+
+class CheckpointTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "population.ckpt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_read(self):
+        randomizer = random.Random(3)
+        randomizer.gauss(0, 1)
+        checkpoint = Checkpoint(7, [(0.5, -0.25, -1.0, 0.125, 0.75), (1.0, 0.0, -0.5, 0.25, 0.1)], [1, 2 ** 32 - 1],
+                                12.5, 3, (0.1, 0.2, 0.3, 0.4, 0.5), randomizer.getstate(), random.getstate())
+        write_checkpoint(self.path, checkpoint)
+        self.assertEqual(["population.ckpt"], os.listdir(self.directory.name))
+
+        restored = read_checkpoint(self.path)
+        self.assertEqual(vars(checkpoint), vars(restored))
+        # the restored generator continues with the same numbers
+        restored_randomizer = random.Random()
+        restored_randomizer.setstate(restored.randomizer_state)
+        self.assertEqual(randomizer.gauss(0, 1), restored_randomizer.gauss(0, 1))
+
+    def test_damaged(self):
+        write_checkpoint(self.path, Checkpoint(1, [(0.0,) * 5], [1], 0, 0, (0.0,) * 5, random.getstate(),
+                                               random.getstate()))
+        with open(self.path, "r+b") as file:
+            file.seek(30)
+            file.write(b"\xff")
+        with self.assertRaises(ValueError):
+            read_checkpoint(self.path)
+
+    def test_resume(self):
+        # saved after the second generation only
+        uninterrupted = TetrisParallel(4, headless=True, number_of_workers=2, number_of_generations=3,
+                                       checkpoint_file=self.path, checkpoint_every=2)
+        resumed = TetrisParallel(4, headless=True, number_of_workers=2, number_of_generations=3,
+                                 resume_file=self.path)
+        self.assertEqual(3, resumed.tetris_parallel_model.generation)
+        self.assertEqual(get_state(uninterrupted), get_state(resumed))
+
+
+if __name__ == '__main__':
+    unittest.main()
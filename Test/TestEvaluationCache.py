@@ -0,0 +1,74 @@
+import unittest
+
+from AI.EvaluationCache import EvaluationCache
+from Tetris_Game.BitBoard import TetrisBitBoard
+from Tetris_Game.Board import TetrisBoard
+from Tetris_Game.Settings import *
+from Tetris_Game.Shape import ShapeForms
+
+
+class EvaluationCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = EvaluationCache(1024 * 1024)
+        self.board = TetrisBoard()
+
+    def test_matches_board(self):
+        self.board.apply((ShapeForms.S_SHAPE, 0, 2))
+        for board in (self.board, TetrisBitBoard()):
+            expected = board.evaluate_all_placements(ShapeForms.T_SHAPE)
+            expected = [(expected.turns[i], expected.x[i], expected.lines_cleared[i], expected.aggregate_height[i],
+                         expected.number_of_holes[i], expected.bumpiness[i]) for i in range(expected.size)]
+            for _ in range(2):
+                placements = self.cache.get_placements(board, ShapeForms.T_SHAPE, GRID_ROW_COUNT - 1)
+                self.assertEqual(expected, [(placements.turns[i], placements.x[i], placements.lines_cleared[i],
+                                             placements.aggregate_height[i], placements.number_of_holes[i],
+                                             placements.bumpiness[i]) for i in range(placements.size)])
+        self.assertEqual((2, 2), (self.cache.hits, self.cache.misses))
+        self.assertEqual(0.5, self.cache.get_hit_rate())
+
+    def test_shared_between_equal_boards(self):
+        other_board = TetrisBitBoard()
+        for board in (self.board, other_board):
+            board.apply((ShapeForms.I_SHAPE, 0, 0))
+            board.apply((ShapeForms.O_SHAPE, 0, 5))
+        self.cache.get_placements(self.board, ShapeForms.Z_SHAPE, GRID_ROW_COUNT - 1)
+        self.cache.get_placements(other_board, ShapeForms.Z_SHAPE, GRID_ROW_COUNT - 1)
+        self.cache.get_placements(other_board, ShapeForms.J_SHAPE, GRID_ROW_COUNT - 1)
+        self.assertEqual((1, 2), (self.cache.hits, self.cache.misses))
+
+    def test_falling_shape(self):
+        self.board.apply((ShapeForms.I_SHAPE, 1, 0))
+        # shape above every column shares the entry of its starting position
+        self.cache.get_placements(self.board, ShapeForms.T_SHAPE, GRID_ROW_COUNT - 1)
+        self.cache.get_placements(self.board, ShapeForms.T_SHAPE, 7)
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        # shape next to the I shape cannot be turned everywhere anymore
+        placements = self.cache.get_placements(self.board, ShapeForms.T_SHAPE, 4)
+        self.assertEqual((1, 2), (self.cache.hits, self.cache.misses))
+        self.assertEqual(self.board.evaluate_all_placements(ShapeForms.T_SHAPE, 4).size, placements.size)
+
+    def test_lru_eviction(self):
+        entry_size = self.cache.get_placements(self.board, ShapeForms.I_SHAPE, GRID_ROW_COUNT - 1) \
+            .get_size_in_bytes()
+        self.cache = EvaluationCache(3 * entry_size)
+        # every shape with two orientations has the same number of placements on an empty board
+        for shape_form in (ShapeForms.I_SHAPE, ShapeForms.S_SHAPE, ShapeForms.Z_SHAPE):
+            self.cache.get_placements(self.board, shape_form, GRID_ROW_COUNT - 1)
+        # I shape becomes the most recently used entry, the S shape is evicted next
+        self.cache.get_placements(self.board, ShapeForms.I_SHAPE, GRID_ROW_COUNT - 1)
+        other_board = TetrisBoard()
+        other_board.apply((ShapeForms.O_SHAPE, 0, 0))
+        self.cache.get_placements(other_board, ShapeForms.I_SHAPE, GRID_ROW_COUNT - 1)
+
+        self.assertEqual(1, self.cache.evictions)
+        self.assertEqual((1, 4), (self.cache.hits, self.cache.misses))
+        self.assertLessEqual(self.cache.size_in_bytes, self.cache.max_size_in_bytes)
+        keys = [EvaluationCache.get_key(self.board, ShapeForms.Z_SHAPE, GRID_ROW_COUNT - 1),
+                EvaluationCache.get_key(self.board, ShapeForms.I_SHAPE, GRID_ROW_COUNT - 1),
+                EvaluationCache.get_key(other_board, ShapeForms.I_SHAPE, GRID_ROW_COUNT - 1)]
+        self.assertEqual(keys, list(self.cache.entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
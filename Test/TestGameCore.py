@@ -0,0 +1,102 @@
+import subprocess
+import sys
+import unittest
+
+from AI.AI_Agent import Agent
+from Tetris_Game.Controls import Action
+from Tetris_Game.GameCore import HeadlessTetris
+from Tetris_Game.PieceSequence import PieceSequence, get_piece_sequence
+from Tetris_Game.Settings import *
+from Tetris_Game.Shape import ShapeForms
+
+
+class GameCoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.game = HeadlessTetris(seed=3)
+
+    def test_no_pygame(self):
+        code = "import sys; import Tetris_Game.GameCore; import AI.AI_Agent; print('pygame' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual("False", result.stdout.strip())
+
+    def test_reset_seed(self):
+        shapes = [shape.shape_form for shape in self.game.tetris_model.shapes]
+        self.game.place(0, 0)
+        self.game.reset(3)
+        self.assertEqual(shapes, [shape.shape_form for shape in self.game.tetris_model.shapes])
+        self.assertEqual((0, 0), (self.game.tetris_model.score, self.game.tetris_model.lines))
+        self.assertEqual([], list(self.game.tetris_model.game_board.get_cells()))
+
+    def test_piece_sequence(self):
+        sequence = get_piece_sequence(3)
+        self.assertIs(sequence, get_piece_sequence(3))
+        self.assertIs(sequence, self.game.tetris_controller.piece_sequence)
+        # sequence is the same in every process
+        other_sequence = PieceSequence(3)
+        self.assertEqual([sequence.get_bag(i) for i in range(5)], [other_sequence.get_bag(i) for i in range(5)])
+        self.assertEqual(sorted(sequence.get_bag(4), key=int), sorted(list(ShapeForms) * 2, key=int))
+
+        # two games with the same seed get the same shapes
+        other_game = HeadlessTetris(seed=3)
+        for game in (self.game, other_game):
+            for _ in range(20):
+                game.place(0, 0 if len(game.tetris_model.shapes) % 2 == 0 else GRID_COL_COUNT - 2)
+        self.assertEqual([shape.shape_form for shape in self.game.tetris_model.shapes],
+                         [shape.shape_form for shape in other_game.tetris_model.shapes])
+        self.assertNotEqual(get_piece_sequence(4).get_bag(0), sequence.get_bag(0))
+
+    def test_step(self):
+        shape = self.game.tetris_model.get_current_shape()
+        score, game_over = self.game.step(Action.LEFT)
+        self.assertEqual((GRID_COL_COUNT // 2 - 1, GRID_ROW_COUNT - 2), (shape.x, shape.y))
+        self.assertAlmostEqual(PER_STEP_SCORE_GAIN, score)
+        self.assertFalse(game_over)
+
+        self.game.step(Action.HARD_DROP)
+        self.assertIsNot(shape, self.game.tetris_model.get_current_shape())
+        self.assertEqual(4, len(list(self.game.tetris_model.game_board.get_cells())))
+
+    def test_place(self):
+        shape = self.game.tetris_model.get_current_shape()
+        orientation = shape.orientations[-1]
+        score, game_over = self.game.place(orientation.turns, 0)
+        self.assertFalse(game_over)
+        self.assertAlmostEqual(PER_STEP_SCORE_GAIN * (GRID_ROW_COUNT - orientation.height), score)
+        expected = sorted((rel_x, row, int(shape.shape_form)) for rel_x, row in orientation.cells)
+        self.assertEqual(expected, sorted(self.game.tetris_model.game_board.get_cells()))
+
+    def test_time_skip(self):
+        """dropping shapes to their landing row gives exactly the score of dropping them tick by tick"""
+        other_game = HeadlessTetris(seed=3)
+        agent = Agent(self.game)
+        agent.set_weights(WEIGHT_LINE_CLEARED, WEIGHT_AGGREGATE_HEIGHT, WEIGHT_HOLES, WEIGHT_BUMPINESS, 0)
+        number_of_ticks = 0
+        for _ in range(100):
+            shape = self.game.tetris_model.get_current_shape()
+            agent.game = self.game
+            agent.calculate_next_move()
+            while self.game.tetris_model.get_current_shape() is shape and not self.game.tetris_model.game_over:
+                self.game.tetris_controller.drop()
+                number_of_ticks += 1
+            agent.game = other_game
+            agent.calculate_next_move()
+            other_game.tetris_controller.drop_to_landing()
+
+            self.assertEqual(self.game.tetris_model.score, other_game.tetris_model.score)
+            self.assertEqual(str(self.game.tetris_model.game_board), str(other_game.tetris_model.game_board))
+        self.assertGreater(self.game.tetris_model.lines, 0)
+        self.assertGreater(number_of_ticks, 10 * 100)
+
+    def test_agent_game(self):
+        agent = Agent(self.game)
+        agent.set_weights(WEIGHT_LINE_CLEARED, WEIGHT_AGGREGATE_HEIGHT, WEIGHT_HOLES, WEIGHT_BUMPINESS, 0)
+        for _ in range(2000):
+            agent.calculate_next_move()
+            self.game.step()
+        self.assertFalse(self.game.tetris_model.game_over)
+        self.assertGreater(self.game.tetris_model.lines, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import itertools
+import random
+import unittest
+from unittest.mock import patch
+
+from Parallel.HeadlessTraining import BATCH_ENGINE, play_agent_game, play_agent_games, play_batch_games
+from Parallel.TetrisParallel import TetrisParallel, TetrisParallelModel
+from Tetris_Game.Settings import *
+
+WEIGHTS = (WEIGHT_LINE_CLEARED, WEIGHT_AGGREGATE_HEIGHT, WEIGHT_HOLES, WEIGHT_BUMPINESS, 0.5)
+
+
+class HeadlessTrainingTestCase(unittest.TestCase):
+
+    def test_play_agent_game(self):
+        score, lines, weights = play_agent_game(WEIGHTS, seed=1, max_pieces=100)
+        self.assertEqual(WEIGHTS, weights)
+        self.assertGreater(lines, 0)
+        # a game with the same shapes and weights has the same result
+        self.assertEqual((score, lines), play_agent_game(WEIGHTS, seed=1, max_pieces=100)[:2])
+        # game stops after the maximal number of shapes, every shape has four cells
+        self.assertLessEqual(lines * GRID_COL_COUNT, 100 * 4)
+
+    def test_search_ignores_clock(self):
+        # a clock that passes a second with every reading would end every search with a time budget at once
+        for agent_type in ("lookahead", "expectimax"):
+            result = play_agent_game(WEIGHTS, seed=1, max_pieces=20, agent_type=agent_type)
+            with patch("time.perf_counter", side_effect=itertools.count()):
+                self.assertEqual(result, play_agent_game(WEIGHTS, seed=1, max_pieces=20, agent_type=agent_type))
+
+    def test_play_agent_games(self):
+        results = [play_agent_game(WEIGHTS, seed, max_pieces=50) for seed in (1, 2, 3)]
+        score, lines, weights = play_agent_games(WEIGHTS, (1, 2, 3), max_pieces=50)
+        self.assertAlmostEqual(sum(result[0] for result in results) / 3, score)
+        self.assertAlmostEqual(sum(result[1] for result in results) / 3, lines)
+        self.assertEqual(WEIGHTS, weights)
+
+    def test_play_batch_games(self):
+        # agents close to the optimal weights and random agents, which lose their games early
+        randomizer = random.Random(1)
+        agent_weights = [tuple(weight + randomizer.uniform(-0.2, 0.2) for weight in WEIGHTS) for _ in range(6)]
+        agent_weights += [tuple(randomizer.uniform(-1, 1) for _ in WEIGHTS) for _ in range(6)]
+        results = play_batch_games(agent_weights, (1, 2), max_pieces=100)
+        # every agent places the same shapes as in a game of its own
+        for weights, result in zip(agent_weights, results):
+            expected = play_agent_games(weights, (1, 2), "column", max_pieces=100)
+            self.assertAlmostEqual(expected[0], result[0])
+            self.assertEqual(expected[1:], result[1:])
+            self.assertEqual(expected.pieces, result.pieces)
+
+    def test_batch_generations(self):
+        tetris_parallel = TetrisParallel(6, BATCH_ENGINE, headless=True, number_of_generations=2)
+        model = tetris_parallel.tetris_parallel_model
+        self.assertEqual(2, model.generation)
+        self.assertGreater(model.high_score, 0)
+        # the batch engine has no games of its own
+        self.assertRaises(ValueError, lambda: TetrisParallelModel(6, BATCH_ENGINE))
+        self.assertRaises(ValueError, lambda: TetrisParallelModel(6, BATCH_ENGINE, True, "lookahead"))
+
+    def test_headless_generations(self):
+        tetris_parallel = TetrisParallel(6, headless=True, number_of_workers=2, number_of_generations=2)
+        model = tetris_parallel.tetris_parallel_model
+        self.assertEqual(2, model.generation)
+        self.assertEqual(6, len(model.agents))
+        self.assertEqual([], model.tetris_games)
+        self.assertGreater(model.high_score, 0)
+        self.assertEqual(PIECE_SEQUENCES_PER_GENERATION, len(model.generation_seeds))
+
+
+if __name__ == '__main__':
+    unittest.main()
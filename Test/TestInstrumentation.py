@@ -0,0 +1,109 @@
+import os
+import pstats
+import queue
+import tempfile
+import threading
+import time
+import unittest
+
+# rendered games need a display, tests run without one
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from Parallel.Instrumentation import Histogram, Instrumentation
+from Parallel.Snapshot import SnapshotBuffer
+from Parallel.TetrisParallel import TetrisParallel, TetrisParallelController, TetrisParallelModel, \
+    TetrisParallelView
+from Tetris_Game.Board import TetrisBoard
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.model = TetrisParallelModel(3, "column", turbo=True)
+        self.view = TetrisParallelView(self.model)
+        self.controller = TetrisParallelController(self.model)
+        self.instrumentation = Instrumentation(report_every=0)
+
+    def tearDown(self):
+        self.instrumentation.detach()
+
+    def test_histogram(self):
+        histogram = Histogram()
+        for value in (1000, 1000, 1000, 50000):
+            histogram.add(value)
+        self.assertEqual(4, histogram.count)
+        self.assertEqual(13250, histogram.get_mean())
+        self.assertEqual(1024, histogram.get_percentile(0.5))
+        self.assertEqual(50000, histogram.get_percentile(0.99))
+
+    def test_phases(self):
+        self.instrumentation.attach(self.controller, self.view)
+        for _ in range(3):
+            self.controller.step()
+            self.view.draw()
+        phases = self.instrumentation.phases
+        self.assertEqual(3, self.instrumentation.counters["ticks"])
+        self.assertEqual(3, phases["tick"].ticks.count)
+        self.assertEqual(3, phases["calculate_agent_moves"].calls.count)
+        self.assertEqual(3, phases["draw"].calls.count)
+        self.assertGreater(phases["column.place_shape"].calls.count, 0)
+        self.assertNotIn("bitboard.place_shape", {name for name, phase in phases.items() if phase.calls.count})
+
+        self.controller.start_new_round()
+        self.assertEqual(1, self.instrumentation.generation)
+        self.assertEqual(1, phases["drop"].generations.count)
+        self.assertIn("calculate_agent_moves", self.instrumentation.get_report())
+
+    def test_detach(self):
+        place_shape = TetrisBoard.place_shape
+        self.instrumentation.attach(self.controller, self.view)
+        self.assertIsNot(place_shape, TetrisBoard.place_shape)
+        self.assertIn("step", vars(self.controller))
+
+        self.instrumentation.detach()
+        self.assertIs(place_shape, TetrisBoard.place_shape)
+        self.assertNotIn("step", vars(self.controller))
+        self.assertNotIn("draw", vars(self.view))
+        self.assertNotIn("p", self.controller.key_actions)
+
+    def test_profile(self):
+        self.instrumentation.profile_generations = 1
+        self.instrumentation.attach(self.controller, board_operations=False)
+        # the capture window starts with the next tick
+        self.assertIsNone(self.instrumentation.profiler)
+        self.controller.step()
+        self.assertIsNotNone(self.instrumentation.profiler)
+        self.controller.start_new_round()
+        self.assertIsNone(self.instrumentation.profiler)
+
+    def test_profile_simulation_thread(self):
+        # build the parts without starting the game loop
+        tetris_parallel = TetrisParallel.__new__(TetrisParallel)
+        tetris_parallel.tetris_parallel_model = self.model
+        tetris_parallel.tetris_parallel_view = self.view
+        tetris_parallel.tetris_parallel_controller = self.controller
+        tetris_parallel.number_of_steps = 0
+        with tempfile.TemporaryDirectory() as directory:
+            self.instrumentation.profile_generations = 1
+            self.instrumentation.profile_file = os.path.join(directory, "profile.prof")
+            self.instrumentation.attach(self.controller, board_operations=False)
+            events = queue.SimpleQueue()
+            simulation = threading.Thread(target=tetris_parallel.run_simulation, args=(SnapshotBuffer(), events))
+            simulation.start()
+            while self.instrumentation.profiler is None:
+                time.sleep(0.01)
+            # the next generation ends the capture window in the simulation thread
+            events.put(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_c))
+            while self.instrumentation.profiler is not None:
+                time.sleep(0.01)
+            self.model.running = False
+            simulation.join()
+            function_names = {function_name for _, _, function_name in pstats.Stats(
+                self.instrumentation.profile_file).stats}
+        self.assertIn("calculate_agent_moves", function_names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from Parallel.MetricsLog import METRICS_FIELDS, MetricsLog, read_metrics
+from Parallel.TetrisParallel import TetrisParallel
+
+
+def get_record(generation: int) -> dict:
+    record = {field: 0.5 for field in METRICS_FIELDS}
+    record["generation"] = generation
+    return record
+
+
+class MetricsLogTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_jsonl(self):
+        path = os.path.join(self.directory.name, "metrics.jsonl")
+        metrics_log = MetricsLog(path)
+        for generation in range(3):
+            metrics_log.write(get_record(generation))
+        metrics_log.close()
+        self.assertEqual([get_record(generation) for generation in range(3)], read_metrics(path))
+
+    def test_csv_appends(self):
+        path = os.path.join(self.directory.name, "metrics.csv")
+        for generation in range(2):
+            metrics_log = MetricsLog(path)
+            metrics_log.write(get_record(generation))
+            metrics_log.close()
+        # a continued run does not repeat the header
+        self.assertEqual([get_record(generation) for generation in range(2)], read_metrics(path))
+
+    def test_headless_generations(self):
+        path = os.path.join(self.directory.name, "metrics.jsonl")
+        TetrisParallel(4, headless=True, number_of_workers=2, number_of_generations=2, metrics_file=path)
+        records = read_metrics(path)
+        self.assertEqual([0, 1], [record["generation"] for record in records])
+        for record in records:
+            self.assertEqual(set(METRICS_FIELDS), set(record))
+            self.assertGreater(record["pieces"], 0)
+            self.assertLessEqual(record["score_min"], record["score_median"])
+            self.assertLessEqual(record["score_median"], record["score_max"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from AI.AI_Agent import Agent
+from AI.Population import MUTATION_CHANCE, Population
+
+
+class PopulationTestCase(unittest.TestCase):
+
+    def test_random_weights(self):
+        population = Population(100)
+        self.assertEqual((100, 5), population.weights.shape)
+        self.assertTrue(np.all(np.abs(population.weights) < 1))
+        self.assertTrue(np.all(population.weights[:, MUTATION_CHANCE] >= 0))
+
+    def test_elites(self):
+        population = Population(10, number_of_elites=2)
+        weights = population.weights.copy()
+        population.set_fitness([5, 1, 9, 3, 9, 0, 2, 4, 6, 7])
+        population.breed()
+        self.assertEqual(10, len(population))
+        # rows with the same fitness keep their order
+        np.testing.assert_array_equal(weights[[2, 4]], population.weights[:2])
+
+    def test_child_without_mutation(self):
+        population = Population(3)
+        population.weights[:, MUTATION_CHANCE] = 0
+        weights = population.weights.copy()
+        population.set_fitness([1, 3, 2])
+        population.breed()
+        # every weight is the mean of the halved weights of the best and the next agent
+        np.testing.assert_allclose(population.weights[1:], (weights[1] + weights[[2, 0]]) / 4)
+
+    def test_tournament(self):
+        population = Population(1000, selection="tournament", number_of_elites=0, tournament_size=8)
+        population.weights[:, :] = 0
+        # only the fittest agents have weights, tournaments of eight agents mostly select them
+        population.weights[:100, 0] = 1
+        population.set_fitness(np.arange(1000)[::-1])
+        population.breed()
+        self.assertGreater(np.mean(population.weights[:, 0]), 0.25)
+
+    def test_invalid_selection(self):
+        with self.assertRaises(ValueError):
+            Population(10, selection="roulette")
+
+    def test_apply(self):
+        population = Population(4)
+        agents = [Agent(None) for _ in range(4)]
+        population.apply(agents)
+        self.assertEqual(population.get_weights(), [agent.get_weights() for agent in agents])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import random
+import unittest
+
+from Tetris_Game.BitBoard import TetrisBitBoard
+from Tetris_Game.Board import TetrisBoard
+from Tetris_Game.Controls import Turn
+from Tetris_Game.Settings import *
+from Tetris_Game.Shape import Shape, ShapeForms
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+
+class ShapeTestCase(unittest.TestCase):
+
+    def test_number_of_orientations(self):
+        self.assertEqual([2, 1, 4, 4, 4, 2, 2], [len(SHAPE_ORIENTATIONS[int(form)]) for form in ShapeForms])
+
+    def test_turned(self):
+        """turning with the orientation table matches turning the list representation"""
+        for shape_form in ShapeForms:
+            shape = Shape(shape_form, TetrisBoard(), 3, GRID_ROW_COUNT - 1)
+            for _ in range(4):
+                structure = shape.shape
+                self.assertEqual(tuple(zip(*structure[::-1])), shape.turned(Turn.RIGHT_TURN))
+                self.assertEqual(tuple(zip(*[e[::-1] for e in structure])), shape.turned(Turn.LEFT_TURN))
+                self.assertTrue(shape.turn_in_direction(Turn.LEFT_TURN))
+            self.assertEqual(0, shape.turns)
+
+    def test_landing_distance(self):
+        """landing distance from the skyline matches the distance found by checking every cell"""
+        randomizer = random.Random(3)
+        for board in (TetrisBoard(), TetrisBitBoard()):
+            for _ in range(300):
+                orientations = SHAPE_ORIENTATIONS[randomizer.randint(1, 7)]
+                for orientation in orientations:
+                    for x in range(GRID_COL_COUNT - orientation.width + 1):
+                        for y in range(GRID_ROW_COUNT):
+                            self.assertEqual(board.distance_to_collision(orientation.shape, x, y),
+                                             board.get_landing_distance(orientation, x, y))
+                orientation = randomizer.choice(orientations)
+                x = randomizer.randrange(GRID_COL_COUNT - orientation.width + 1)
+                if not board.place_shape(orientation.shape, x, GRID_ROW_COUNT - 1):
+                    board.reset_board()
+                board.remove_full_rows()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import queue
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pygame
+
+# rendered games need a display, tests run without one
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from Parallel.Snapshot import ParallelSnapshot, SnapshotBuffer
+from Parallel.TetrisParallel import TetrisParallel, TetrisParallelController, TetrisParallelModel, \
+    TetrisParallelView
+from Tetris_Game.Settings import *
+from Tetris_Game.TetrisUtilities import get_color_tuple
+
+
+class TetrisParallelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # build the parts without starting the game loop
+        self.tetris_parallel = TetrisParallel.__new__(TetrisParallel)
+        self.tetris_parallel.tetris_parallel_model = TetrisParallelModel(4, turbo=True)
+        self.tetris_parallel.tetris_parallel_view = TetrisParallelView(self.tetris_parallel.tetris_parallel_model)
+        self.tetris_parallel.tetris_parallel_controller = TetrisParallelController(
+            self.tetris_parallel.tetris_parallel_model)
+
+    def test_step(self):
+        model = self.tetris_parallel.tetris_parallel_model
+        self.tetris_parallel.tetris_parallel_controller.step()
+        self.assertEqual(1, model.timer)
+        self.assertTrue(all(game.tetris_model.score > 0 for game in model.tetris_games))
+
+    def test_simulate_frame(self):
+        with patch("Parallel.TetrisParallel.TURBO_STEPS_PER_FRAME", 7):
+            self.assertEqual(7, self.tetris_parallel.simulate_frame())
+
+    def test_simulate_frame_budget(self):
+        with patch("Parallel.TetrisParallel.TURBO_STEPS_PER_FRAME", None), \
+                patch("Parallel.TetrisParallel.TURBO_FRAME_BUDGET", 0.05):
+            start = time.perf_counter()
+            self.assertGreater(self.tetris_parallel.simulate_frame(), 1)
+            self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+    def test_toggle_turbo(self):
+        self.tetris_parallel.tetris_parallel_controller.toggle_turbo()
+        self.assertFalse(self.tetris_parallel.tetris_parallel_model.turbo)
+
+    def test_draw_changes_only(self):
+        model = self.tetris_parallel.tetris_parallel_model
+        view = self.tetris_parallel.tetris_parallel_view
+        view.draw()
+        self.assertTrue(all(game_view.get_dirty_rects() == [] for game_view in view.game_views))
+
+        self.tetris_parallel.tetris_parallel_controller.step()
+        view.get_game_views(ParallelSnapshot(model, view.last_snapshot))
+        rects = view.game_views[0].get_dirty_rects()
+        self.assertTrue(rects)
+        self.assertLess(sum(rect.width * rect.height for rect in rects),
+                        view.game_views[0].get_rect().width * view.game_views[0].get_rect().height)
+
+    def test_draw_matches_full_draw(self):
+        view = self.tetris_parallel.tetris_parallel_view
+        for _ in range(30):
+            self.tetris_parallel.simulate_frame()
+            view.draw()
+        pixels = pygame.image.tostring(view.screen, "RGB")
+        view.invalidate()
+        view.draw()
+        self.assertEqual(pixels, pygame.image.tostring(view.screen, "RGB"))
+
+    def test_best_agent_panel(self):
+        model = self.tetris_parallel.tetris_parallel_model
+        view = self.tetris_parallel.tetris_parallel_view
+        view.draw()
+        game_view = view.game_views[model.best_game]
+        board = view.best_agent_board[1]
+        # games are drawn offscreen, the panel reuses its enlarged copy while the game does not change
+        self.assertIsNot(view.screen, game_view.screen)
+        self.assertEqual(game_view.screen.get_width() * 1.5, board.get_width())
+        view.draw()
+        self.assertIs(board, view.best_agent_board[1])
+        self.tetris_parallel.tetris_parallel_controller.step()
+        view.draw()
+        self.assertIsNot(board, view.best_agent_board[1])
+
+    def test_visible_games(self):
+        with patch("Parallel.TetrisParallel.MAX_VISIBLE_GAMES", 6), \
+                patch("Parallel.TetrisParallel.VISIBLE_TOP_GAMES", 2):
+            model = TetrisParallelModel(12)
+        model.tetris_games = [SimpleNamespace(tetris_model=SimpleNamespace(score=i, game_over=False))
+                              for i in range(12)]
+        self.assertEqual((6, 2, 3), (model.number_of_visible_games, model.number_of_top_games,
+                                     model.get_number_of_pages()))
+        model.tetris_games[11].tetris_model.game_over = True
+        model.tetris_games[5].tetris_model.score = 1000
+        model.best_game = 7
+        self.assertEqual([7, 5, 0, 1, 2, 3], model.get_visible_games())
+        model.page = 2
+        self.assertEqual([7, 5, 8, 9, 10, 11], model.get_visible_games())
+
+    def test_change_page(self):
+        controller = self.tetris_parallel.tetris_parallel_controller
+        controller.change_page(1)
+        # every game fits on the screen
+        self.assertEqual(0, self.tetris_parallel.tetris_parallel_model.page)
+
+    def test_partial_last_page(self):
+        model = TetrisParallelModel(50, turbo=True)
+        view = TetrisParallelView(model)
+        controller = TetrisParallelController(model)
+        view.draw()
+        controller.change_page(1)
+        view.draw()
+        # the last page shows the top games and the remaining 22 games, the other boards are empty
+        self.assertEqual(model.number_of_top_games + 22, len(view.get_game_views(view.last_snapshot)))
+        background = get_color_tuple(COLORS.get("BACKGROUND_BLACK"))
+        for game_view in view.game_views[model.number_of_top_games + 22:]:
+            rect = game_view.screen.get_rect().move(game_view.screen_position)
+            self.assertEqual(background, tuple(view.screen.get_at(rect.center))[:3])
+        pixels = pygame.image.tostring(view.screen, "RGB")
+        view.invalidate()
+        view.draw()
+        self.assertEqual(pixels, pygame.image.tostring(view.screen, "RGB"))
+
+    def test_snapshot(self):
+        model = self.tetris_parallel.tetris_parallel_model
+        snapshot = ParallelSnapshot(model)
+        game = snapshot.get_game(0)
+        board = model.tetris_games[0].tetris_model.game_board
+        state = (game.score, game.game_board.zobrist_hash, game.game_board.get_cells(), game.get_current_shape().y)
+        self.assertEqual(set(board.get_cells()), game.game_board.get_cells())
+        self.tetris_parallel.tetris_parallel_controller.step()
+        # snapshots do not change with the games
+        self.assertEqual(state, (game.score, game.game_board.zobrist_hash, game.game_board.get_cells(),
+                                 game.get_current_shape().y))
+        # boards that did not change are shared with the last snapshot
+        snapshot = ParallelSnapshot(model, snapshot)
+        self.assertIs(snapshot.get_game(0).game_board, ParallelSnapshot(model, snapshot).get_game(0).game_board)
+
+    def test_simulation_thread(self):
+        model = self.tetris_parallel.tetris_parallel_model
+        self.tetris_parallel.number_of_steps = 0
+        snapshot_buffer = SnapshotBuffer()
+        events = queue.SimpleQueue()
+        events.put(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_TAB))
+        simulation = threading.Thread(target=self.tetris_parallel.run_simulation, args=(snapshot_buffer, events))
+        simulation.start()
+        time.sleep(0.2)
+        model.running = False
+        simulation.join()
+        snapshot = snapshot_buffer.get_latest()
+        self.assertGreater(self.tetris_parallel.number_of_steps, 0)
+        self.assertEqual(snapshot_buffer.number_of_published - 1, snapshot.number)
+        # events of the drawing thread are handled by the simulation
+        self.assertTrue(snapshot.display_best_of_generation)
+        self.tetris_parallel.tetris_parallel_view.draw(snapshot)
+
+
+    def test_simulation_thread_turbo_frames(self):
+        model = self.tetris_parallel.tetris_parallel_model
+        self.tetris_parallel.number_of_steps = 0
+        snapshot_buffer = SnapshotBuffer()
+        with patch("Parallel.TetrisParallel.MAX_FPS", 20), patch("Parallel.TetrisParallel.TURBO_RENDER_EVERY", 2):
+            simulation = threading.Thread(target=self.tetris_parallel.run_simulation,
+                                          args=(snapshot_buffer, queue.SimpleQueue()))
+            simulation.start()
+            time.sleep(0.5)
+            model.running = False
+            simulation.join()
+        number_of_frames = self.tetris_parallel.number_of_steps // TURBO_STEPS_PER_FRAME
+        # frames are capped at 20 per second, every second frame is published after the first snapshot. the last
+        # frame can be cut short by stopping the model
+        self.assertGreater(number_of_frames, 0)
+        self.assertLessEqual(number_of_frames, 12)
+        self.assertIn(snapshot_buffer.number_of_published, (1 + number_of_frames // 2, 1 + (number_of_frames + 1) // 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import unittest
+
+# texts are rendered without a display in the tests
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from Tetris_Game.Settings import FONT_NAME
+from Tetris_Game.TextCache import TextCache, get_text_cache
+
+WHITE = (255, 255, 255)
+
+
+class TextCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+
+    def test_render_once(self):
+        text_cache = TextCache(8)
+        surface = text_cache.render("Score", 16, WHITE)
+        self.assertIs(surface, text_cache.render("Score", 16, WHITE))
+        self.assertIsNot(surface, text_cache.render("Score", 16, (0, 0, 0)))
+        self.assertIsNot(surface, text_cache.render("Score", 32, WHITE))
+        self.assertEqual((1, 3), (text_cache.hits, text_cache.misses))
+        self.assertEqual(0.25, text_cache.get_hit_rate())
+        # the font of a size is looked up once for all texts
+        self.assertIs(text_cache.get_font(16), text_cache.get_font(16))
+        self.assertEqual(2, len(text_cache.fonts))
+
+    def test_least_recently_used(self):
+        text_cache = TextCache(2)
+        first = text_cache.render("1", 16, WHITE)
+        text_cache.render("2", 16, WHITE)
+        text_cache.render("1", 16, WHITE)
+        text_cache.render("3", 16, WHITE)
+        self.assertEqual((2, 1), (len(text_cache), text_cache.evictions))
+        self.assertIs(first, text_cache.render("1", 16, WHITE))
+        self.assertNotIn(("2", 16, WHITE, FONT_NAME), text_cache.surfaces)
+
+    def test_shared(self):
+        self.assertIs(get_text_cache(), get_text_cache())
+
+
+if __name__ == '__main__':
+    unittest.main()
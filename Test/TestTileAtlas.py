@@ -0,0 +1,35 @@
+import os
+import unittest
+
+# tiles are rendered without a display in the tests
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from Tetris_Game.Settings import *
+from Tetris_Game.TetrisUtilities import get_color_tuple
+from Tetris_Game.TileAtlas import get_tile_atlas
+
+
+class TileAtlasTestCase(unittest.TestCase):
+
+    def test_cached_per_grid_size(self):
+        atlas = get_tile_atlas(30)
+        self.assertIs(atlas, get_tile_atlas(30))
+        self.assertIsNot(atlas, get_tile_atlas(12))
+        self.assertEqual((30, 30), atlas.tiles[SHAPES_ID['T']].get_size())
+
+    def test_tiles(self):
+        atlas = get_tile_atlas(30)
+        for val in range(1, len(SHAPE_CHARS) + 1):
+            color = get_color_tuple(COLORS.get("TILE_" + SHAPE_CHARS[val - 1]))
+            tile = atlas.tiles[val]
+            self.assertEqual(color, tuple(tile.get_at((15, 15)))[:3])
+            self.assertEqual(get_color_tuple(COLORS.get("BACKGROUND_BLACK")), tuple(tile.get_at((0, 15)))[:3])
+            self.assertEqual(get_color_tuple(COLORS.get("TRIANGLE_GRAY")), tuple(tile.get_at((4, 4)))[:3])
+            # outlines are transparent inside
+            outline = atlas.outlines[val]
+            self.assertEqual(color, tuple(outline.get_at((1, 15)))[:3])
+            self.assertEqual(0, outline.get_at((15, 15)).a)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,331 @@
+import numpy as np
+
+from Tetris_Game.Settings import *
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+# maximal width and height of a shape and number of cells of every shape
+MAX_SHAPE_SIZE = 4
+SHAPE_CELL_COUNT = 4
+MAX_NUMBER_OF_TURNS = 4
+
+
+def _build_shape_tables():
+    """
+    builds lookup tables indexed by [shape form value, number of left turns] of all shapes,
+    index 0 of the shape form is not used
+
+    :return: cell rows and columns relative to the bottom left of the shape, lowest filled cell of every
+    column of the shape (MAX_SHAPE_SIZE * GRID_ROW_COUNT if column is not part of the shape) and height
+    and width of the shape
+    """
+    number_of_forms = len(SHAPE_ORIENTATIONS) + 1
+    cell_rows = np.zeros((number_of_forms, MAX_NUMBER_OF_TURNS, SHAPE_CELL_COUNT), dtype=np.int16)
+    cell_columns = np.zeros_like(cell_rows)
+    lowest_cells = np.full((number_of_forms, MAX_NUMBER_OF_TURNS, MAX_SHAPE_SIZE),
+                           MAX_SHAPE_SIZE * GRID_ROW_COUNT, dtype=np.int16)
+    heights = np.zeros((number_of_forms, MAX_NUMBER_OF_TURNS), dtype=np.int16)
+    widths = np.zeros_like(heights)
+
+    for shape_id, orientations in SHAPE_ORIENTATIONS.items():
+        for turns in range(MAX_NUMBER_OF_TURNS):
+            orientation = orientations[turns % len(orientations)]
+            for i, (rel_x, row) in enumerate(orientation.cells):
+                cell_columns[shape_id, turns, i] = rel_x
+                cell_rows[shape_id, turns, i] = row
+            lowest_cells[shape_id, turns, :orientation.width] = orientation.lowest_cells
+            heights[shape_id, turns] = orientation.height
+            widths[shape_id, turns] = orientation.width
+    return cell_rows, cell_columns, lowest_cells, heights, widths
+
+
+SHAPE_CELL_ROWS, SHAPE_CELL_COLUMNS, SHAPE_LOWEST_CELLS, SHAPE_HEIGHTS, SHAPE_WIDTHS = _build_shape_tables()
+
+
+def _build_placement_tables():
+    """
+    builds lookup tables of every placement of a shape, the placements are ordered like the placements of
+    TetrisBoard.evaluate_all_placements
+
+    :return: for every shape form value the number of left turns and the x position of every placement, the
+    lowest and highest filled cell of the shape in every column of the board (MAX_SHAPE_SIZE * GRID_ROW_COUNT and
+    -1 if the column is not part of the shape), the filled cells of every row of the shape, its height and the
+    index of the placement of every number of left turns and x position (-1 if the shape is not inside the board)
+    """
+    placement_tables = {}
+    for shape_id, orientations in SHAPE_ORIENTATIONS.items():
+        turns = []
+        columns = []
+        lowest_cells = []
+        highest_cells = []
+        row_counts = []
+        heights = []
+        for orientation in orientations:
+            for x in range(GRID_COL_COUNT - orientation.width + 1):
+                turns.append(orientation.turns)
+                columns.append(x)
+                lowest = [MAX_SHAPE_SIZE * GRID_ROW_COUNT] * GRID_COL_COUNT
+                highest = [-1] * GRID_COL_COUNT
+                lowest[x:x + orientation.width] = orientation.lowest_cells
+                highest[x:x + orientation.width] = orientation.highest_cells
+                lowest_cells.append(lowest)
+                highest_cells.append(highest)
+                row_counts.append(list(orientation.row_counts) + [0] * (MAX_SHAPE_SIZE - orientation.height))
+                heights.append(orientation.height)
+        placement_indices = np.full((MAX_NUMBER_OF_TURNS, GRID_COL_COUNT), -1, dtype=np.intp)
+        placement_indices[turns, columns] = np.arange(len(turns))
+        placement_tables[shape_id] = tuple(np.array(table, dtype=np.int16) for table in (
+            turns, columns, lowest_cells, highest_cells, row_counts, heights)) + (placement_indices,)
+    return placement_tables
+
+
+PLACEMENT_TABLES = _build_placement_tables()
+
+
+class BatchPlacements:
+    """
+    evaluation of every placement of a shape on every board like the PlacementBuffer of a single board, the
+    arrays of the evaluations have the shape (number_of_boards, number_of_placements)
+    """
+
+    def __init__(self, turns, x, landing_rows, lines_cleared, aggregate_height, number_of_holes, bumpiness, valid):
+        # number of left turns and x position of every placement
+        self.turns = turns
+        self.x = x
+        self.landing_rows = landing_rows
+        self.lines_cleared = lines_cleared
+        self.aggregate_height = aggregate_height
+        self.number_of_holes = number_of_holes
+        self.bumpiness = bumpiness
+        # placements whose shape does not collide in the top rows, the evaluations of the others are meaningless
+        self.valid = valid
+
+
+class TetrisBatchBoard:
+    """
+    the boards of a whole population in one (number_of_boards, GRID_ROW_COUNT, GRID_COL_COUNT) array,
+    row 0 is the bottom row like in TetrisBoard. every method works on all boards at once, shapes fall
+    from the top rows of the board, where the shapes of a game start
+    """
+
+    def __init__(self, number_of_boards: int):
+        self.number_of_boards = number_of_boards
+        self.cells = np.zeros((number_of_boards, GRID_ROW_COUNT, GRID_COL_COUNT), dtype=np.uint8)
+        # height of every column of every board
+        self.heights = np.zeros((number_of_boards, GRID_COL_COUNT), dtype=np.int16)
+        # boards on which a shape could not be placed anymore
+        self.game_over = np.zeros(number_of_boards, dtype=bool)
+
+    def reset_board(self, indices=None):
+        """
+        :param indices: indices of the boards that are cleared, all boards at default
+        """
+        if indices is None:
+            indices = slice(None)
+        self.cells[indices] = 0
+        self.heights[indices] = 0
+        self.game_over[indices] = False
+
+    def landing_rows(self, shape_forms, turns, columns):
+        """
+        :param shape_forms: value of the shape form of every board
+        :param turns: number of left turns of every shape
+        :param columns: x position of every shape
+        :return: lowest row of every shape after it fell from the top rows of its board
+        """
+        return self._landing_rows(*self._validate(shape_forms, turns, columns))
+
+    def _landing_rows(self, shape_forms, turns, columns):
+        # the lowest cell of every column of a shape falls onto the highest element below it, columns outside of
+        # the shape are masked by its lowest cells
+        lowest_cells = SHAPE_LOWEST_CELLS[shape_forms, turns]
+        start_rows = np.minimum(GRID_ROW_COUNT - SHAPE_HEIGHTS[shape_forms, turns, None] + lowest_cells,
+                                GRID_ROW_COUNT)
+        shape_columns = np.minimum(columns[:, None] + np.arange(MAX_SHAPE_SIZE), GRID_COL_COUNT - 1)
+        heights = self._get_heights_below()[np.arange(self.number_of_boards)[:, None], start_rows, shape_columns]
+        return (heights - lowest_cells).max(axis=1)
+
+    def _get_heights_below(self):
+        """
+        :return: (number_of_boards, GRID_ROW_COUNT + 1, GRID_COL_COUNT) array containing the height of every
+        column counting only the rows below the row of the second index
+        """
+        filled_rows = (self.cells != 0) * np.arange(1, GRID_ROW_COUNT + 1, dtype=np.int16)[:, None]
+        heights_below = np.zeros((self.number_of_boards, GRID_ROW_COUNT + 1, GRID_COL_COUNT), dtype=np.int16)
+        np.maximum.accumulate(filled_rows, axis=1, out=heights_below[:, 1:])
+        return heights_below
+
+    def _collides_at_top(self, shape_forms, turns, columns):
+        """:return: if the shape of every board collides with the board in the top rows, where it starts"""
+        rows = GRID_ROW_COUNT - SHAPE_HEIGHTS[shape_forms, turns, None] + SHAPE_CELL_ROWS[shape_forms, turns]
+        cell_columns = columns[:, None] + SHAPE_CELL_COLUMNS[shape_forms, turns]
+        return (self.cells[np.arange(self.number_of_boards)[:, None], rows, cell_columns] != 0).any(axis=1)
+
+    def place_shapes(self, shape_forms, turns, columns):
+        """
+        drops a shape on every board that is not game over. boards on which the shape collides in the top rows are
+        game over like a game whose shape can not fall
+
+        :param shape_forms: value of the shape form of every board
+        :param turns: number of left turns of every shape
+        :param columns: x position of every shape
+        :return: boolean array containing if the shape was placed on that board
+        """
+        shape_forms, turns, columns = self._validate(shape_forms, turns, columns)
+        landing_rows = self._landing_rows(shape_forms, turns, columns)
+        placed = ~self.game_over & ~self._collides_at_top(shape_forms, turns, columns)
+        self.game_over |= ~placed
+
+        boards = np.nonzero(placed)[0]
+        rows = landing_rows[boards, None] + SHAPE_CELL_ROWS[shape_forms[boards], turns[boards]]
+        cell_columns = columns[boards, None] + SHAPE_CELL_COLUMNS[shape_forms[boards], turns[boards]]
+        self.cells[boards[:, None], rows, cell_columns] = shape_forms[boards, None]
+        # shapes below the highest element of a column only fill holes
+        np.maximum.at(self.heights, (np.repeat(boards, SHAPE_CELL_COUNT), cell_columns.ravel()), rows.ravel() + 1)
+        return placed
+
+    def remove_full_rows(self):
+        """
+        removes all rows that are full on every board
+
+        :return: number of rows removed of every board
+        """
+        full_rows = (self.cells != 0).all(axis=2)
+        lines_cleared = full_rows.sum(axis=1)
+        boards = np.nonzero(lines_cleared)[0]
+        if len(boards) == 0:
+            return lines_cleared
+        # stable sort moves all full rows to the top and keeps the order of every other row
+        order = np.argsort(full_rows[boards], axis=1, kind="stable")
+        cells = np.take_along_axis(self.cells[boards], order[:, :, None], axis=1)
+        cells[np.arange(GRID_ROW_COUNT) >= GRID_ROW_COUNT - lines_cleared[boards, None]] = 0
+        self.cells[boards] = cells
+        self.heights[boards] = self._calculate_heights(cells)
+        return lines_cleared
+
+    def drop(self, shape_forms, turns, columns):
+        """
+        places a shape on every board and removes all full rows afterwards
+
+        :param shape_forms: value of the shape form of every board
+        :param turns: number of left turns of every shape
+        :param columns: x position of every shape
+        :return: number of rows removed of every board
+        """
+        self.place_shapes(shape_forms, turns, columns)
+        return self.remove_full_rows()
+
+    def evaluate_all_placements(self, shape_form) -> BatchPlacements:
+        """
+        evaluates every orientation of the shape at every column of every board at once. like the placements of a
+        single board the features are the ones of the board before the full rows are removed
+
+        :param shape_form: form of the shape placed on every board
+        :return: evaluation of every placement on every board, placements on boards that are game over are invalid
+        """
+        turns, columns, lowest_cells, highest_cells, row_counts, shape_heights, _ = PLACEMENT_TABLES[int(shape_form)]
+        # the lowest cell of every column of the shape falls onto the highest element below it, columns outside of
+        # the shape are masked by its lowest cells
+        start_rows = np.minimum(GRID_ROW_COUNT - shape_heights[:, None] + lowest_cells, GRID_ROW_COUNT)
+        heights_below = self._get_heights_below()[:, start_rows, np.arange(GRID_COL_COUNT)]
+        landing_rows = (heights_below - lowest_cells).max(axis=2)
+        new_heights = np.maximum(self.heights[:, None, :],
+                                 np.where(highest_cells >= 0, landing_rows[:, :, None] + highest_cells + 1, 0))
+        aggregate_height = new_heights.sum(axis=2)
+
+        # rows of the shape that are full together with the row of the board
+        board_row_counts = np.count_nonzero(self.cells, axis=2)
+        rows = np.minimum(landing_rows[:, :, None] + np.arange(MAX_SHAPE_SIZE), GRID_ROW_COUNT - 1)
+        landing_row_counts = board_row_counts[np.arange(self.number_of_boards)[:, None, None], rows]
+        lines_cleared = ((landing_row_counts + row_counts >= GRID_COL_COUNT) & (row_counts > 0)).sum(axis=2)
+        # every empty cell below the height of a column is a hole
+        number_of_holes = aggregate_height - (board_row_counts.sum(axis=1) + SHAPE_CELL_COUNT)[:, None]
+
+        valid = ~self.game_over[:, None] & ~self.get_spawn_collisions(shape_form)
+        return BatchPlacements(turns, columns, landing_rows, lines_cleared, aggregate_height, number_of_holes,
+                               np.abs(np.diff(new_heights, axis=2)).sum(axis=2), valid)
+
+    def get_spawn_collisions(self, shape_form):
+        """
+        :param shape_form: form of the shape of every board
+        :return: (number_of_boards, number_of_placements) array containing if the shape collides with the board in
+        the top rows, where it starts, for every placement of evaluate_all_placements
+        """
+        shape_form = int(shape_form)
+        turns, columns, _, _, _, shape_heights, _ = PLACEMENT_TABLES[shape_form]
+        rows = GRID_ROW_COUNT - shape_heights[:, None] + SHAPE_CELL_ROWS[shape_form, turns]
+        cell_columns = columns[:, None] + SHAPE_CELL_COLUMNS[shape_form, turns]
+        return (self.cells[:, rows, cell_columns] != 0).any(axis=2)
+
+    def move_from_spawn(self, shape_form, turns, columns):
+        """
+        turns the shape of every board at the position where the shapes of a game start and shifts it to its
+        column afterwards like an agent of a game. like in a game a turn or shift that collides is not done, so a
+        shape that is blocked on its way ends at another placement
+
+        :param shape_form: form of the shape of every board
+        :param turns: number of left turns of every shape
+        :param columns: x position of every shape
+        :return: number of left turns and x position every shape ends at
+        """
+        placement_indices = PLACEMENT_TABLES[int(shape_form)][-1]
+        number_of_orientations = len(SHAPE_ORIENTATIONS[int(shape_form)])
+        collisions = self.get_spawn_collisions(shape_form)
+        boards = np.arange(self.number_of_boards)
+        start_column = GRID_COL_COUNT // 2
+        turns = np.asarray(turns, dtype=np.intp) % number_of_orientations
+        columns = np.asarray(columns, dtype=np.intp)
+
+        # every turn after the first one that collides is not done either
+        final_turns = turns.copy()
+        turning = np.ones(self.number_of_boards, dtype=bool)
+        for turn in range(1, number_of_orientations):
+            collides = turning & (turn <= turns) & collisions[:, placement_indices[turn, start_column]]
+            final_turns[collides] = turn - 1
+            turning &= ~collides
+
+        # the shape stops in front of the first column it collides in or that is outside of the board
+        directions = np.sign(columns - start_column)
+        final_columns = np.full(self.number_of_boards, start_column)
+        shifting = np.ones(self.number_of_boards, dtype=bool)
+        for shift in range(1, GRID_COL_COUNT):
+            shifting &= shift <= np.abs(columns - start_column)
+            column = start_column + directions * shift
+            indices = placement_indices[final_turns, np.clip(column, 0, GRID_COL_COUNT - 1)]
+            shifting &= (column >= 0) & (column < GRID_COL_COUNT) & (indices >= 0)
+            shifting &= ~collisions[boards, indices]
+            final_columns[shifting] = column[shifting]
+        return final_turns, final_columns
+
+    def get_col_heights(self):
+        """
+        :return: (number_of_boards, GRID_COL_COUNT) array containing the height of each column
+        """
+        return self.heights.copy()
+
+    def get_hole_count(self):
+        """
+        :return: number of wholes of every board
+        """
+        # every cell below the height of a column that is not filled is a whole
+        return self.heights.sum(axis=1) - np.count_nonzero(self.cells, axis=(1, 2))
+
+    def get_bumpiness(self):
+        """
+        :return: sum of differences between adjacent columns of every board
+        """
+        return np.abs(np.diff(self.heights, axis=1)).sum(axis=1)
+
+    def _validate(self, shape_forms, turns, columns):
+        shape_forms = np.asarray(shape_forms, dtype=np.intp)
+        turns = np.asarray(turns, dtype=np.intp) % MAX_NUMBER_OF_TURNS
+        columns = np.asarray(columns, dtype=np.intp)
+        if np.any(columns < 0) or np.any(columns + SHAPE_WIDTHS[shape_forms, turns] > GRID_COL_COUNT):
+            raise ValueError("every shape has to be inside of the board")
+        return shape_forms, turns, columns
+
+    @staticmethod
+    def _calculate_heights(cells):
+        filled = cells != 0
+        # index of the highest filled cell counted from the top of the board
+        highest = np.argmax(filled[:, ::-1, :], axis=1)
+        return np.where(filled.any(axis=1), GRID_ROW_COUNT - highest, 0)
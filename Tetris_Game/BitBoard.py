@@ -0,0 +1,373 @@
+from Tetris_Game.Board import PlacementBuffer, UndoToken, ZOBRIST_KEYS, fill_placement_buffer
+from Tetris_Game.Settings import GRID_ROW_COUNT, GRID_COL_COUNT
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+# row mask in which every cell is filled
+FULL_ROW_MASK = (1 << GRID_COL_COUNT) - 1
+
+
+def _build_zobrist_row_keys():
+    """:return: zobrist hash of every possible row mask of every row indexed by [y][row mask]"""
+    row_keys = []
+    for y in range(GRID_ROW_COUNT):
+        keys = [0]
+        for mask in range(1, FULL_ROW_MASK + 1):
+            # hash of the mask without its lowest bit xor the key of the lowest bit
+            lowest_bit = (mask & -mask).bit_length() - 1
+            keys.append(keys[mask & (mask - 1)] ^ ZOBRIST_KEYS[lowest_bit][y])
+        row_keys.append(keys)
+    return row_keys
+
+
+# same hashes as TetrisBoard computed a whole row at once
+ZOBRIST_ROW_KEYS = _build_zobrist_row_keys()
+
+
+class TetrisBitBoard:
+    """
+    tetris board with the same interface as TetrisBoard that stores every row and every column
+    as an integer bitmask, bit x of row y and bit y of column x are set if the cell (x, y) is filled
+    """
+
+    def __init__(self):
+        self.row_masks = [0 for _ in range(GRID_ROW_COUNT)]
+        self.column_masks = [0 for _ in range(GRID_COL_COUNT)]
+        # shape values of all cells, only needed to draw the board
+        self.cell_rows = [[0 for _ in range(GRID_COL_COUNT)] for _ in range(GRID_ROW_COUNT)]
+        # reused by every call of evaluate_all_placements
+        self.placement_buffer = PlacementBuffer()
+        # zobrist hash of all filled cells, updated with every change of the board
+        self.zobrist_hash = 0
+
+    def clone(self):
+        """:return: copy of this board that does not share any row with it"""
+        board = TetrisBitBoard.__new__(TetrisBitBoard)
+        board.row_masks = self.row_masks[:]
+        board.column_masks = self.column_masks[:]
+        board.cell_rows = [row[:] for row in self.cell_rows]
+        board.placement_buffer = PlacementBuffer()
+        board.zobrist_hash = self.zobrist_hash
+        return board
+
+    def _violates_constraints(self, shape, x, y):
+        return x < 0 or x + len(shape) > GRID_COL_COUNT or y >= GRID_ROW_COUNT or y < 0
+
+    def has_collision(self, shape, x, y):
+        """
+        :param shape more dimensional list containing a shape
+        :param x position of shape
+        :param y position of shape
+        :returns if the shape at position x, y collides with any other block or the wall of the board"""
+        if self._violates_constraints(shape, x, y):
+            return True
+        # for every line in shape
+        for rel_x, line in enumerate(shape):
+            column_mask = self.column_masks[x + rel_x]
+            for rel_y, val in enumerate(line):
+                if val == 0:
+                    continue
+                # cell is below the floor or column has already element at that position
+                if y - rel_y < 0 or column_mask >> (y - rel_y) & 1:
+                    return True
+        return False
+
+    def distance_to_collision(self, shape, x, y):
+        """
+        :param shape more dimensional list containing a shape
+        :param x position of shape
+        :param y position of shape
+        :returns distance to collision regarding the given shape
+        ans its coordinates x, y"""
+        result = y + 1 - len(shape[0])
+        if result < 0:
+            return result
+
+        # for every line of the shape
+        for rel_x, line in enumerate(shape):
+            column_mask = self.column_masks[x + rel_x]
+            for rel_y, val in enumerate(line):
+                if val == 0:
+                    continue
+                cell_y = y - rel_y
+                # bit length of the masked column is the height of the highest element at or below the cell
+                distance = cell_y - (column_mask & ((2 << cell_y) - 1)).bit_length()
+                # check if distance is smaller than current min distance
+                if distance < result:
+                    result = distance
+                    # check if collision happened
+                    if result < 0:
+                        return result
+
+        return result
+
+    def get_landing_row(self, orientation, x):
+        """
+        :param orientation ShapeOrientation of the shape
+        :param x position of shape
+        :returns lowest row the shape can be placed in without being inside of a column"""
+        landing_row = 0
+        for rel_x, lowest_cell in enumerate(orientation.lowest_cells):
+            row = self.column_masks[x + rel_x].bit_length() - lowest_cell
+            if row > landing_row:
+                landing_row = row
+        return landing_row
+
+    def get_landing_distance(self, orientation, x, y):
+        """
+        :param orientation ShapeOrientation of the shape
+        :param x position of shape
+        :param y position of shape
+        :returns distance to collision like distance_to_collision, if the shape is above every column
+        it covers the distance is calculated from the column heights without checking every cell"""
+        landing_row = self.get_landing_row(orientation, x)
+        lowest_row = y + 1 - orientation.height
+        # shape is already below the highest element of a column
+        if lowest_row < landing_row:
+            return self.distance_to_collision(orientation.shape, x, y)
+        return lowest_row - landing_row
+
+    def place_shape(self, shape, x, y, distance_to_collision=None):
+        """
+        :param shape more dimensional list containing a shape
+        :param x position of shape
+        :param y position of shape
+        :param distance_to_collision: optional distance to collision, if it is already known to prevent
+        calculating values again
+        :returns if shape was placed on the board
+        """
+        # check if distance is not known yet
+        if distance_to_collision is None:
+            distance_to_collision = self.distance_to_collision(shape, x, y)
+
+        # set y value where the ship will be placed
+        y -= distance_to_collision
+        # if y coordinate is bigger or equal to GRID_ROW_COUNT -> shape can not be placed
+        if y >= GRID_ROW_COUNT:
+            return False
+        # for every line in shape
+        for rel_x, line in enumerate(shape):
+            column = x + rel_x
+            column_bit = 1 << column
+            for rel_y, val in enumerate(line):
+                if val == 0:
+                    continue
+                cell_y = y - rel_y
+                if self.row_masks[cell_y] & column_bit:
+                    raise IndexError("column already has element at given index ")
+                self.row_masks[cell_y] |= column_bit
+                self.column_masks[column] |= 1 << cell_y
+                self.cell_rows[cell_y][column] = val
+                self.zobrist_hash ^= ZOBRIST_KEYS[column][cell_y]
+        return True
+
+    def remove_full_rows(self):
+        """
+        removed all rows that are full (not contain any zeros)
+
+        :return: number of rows removed
+        """
+        # find all indices of of full rows
+        remove_indices = self._get_full_rows()
+        # check if any rows have to be removed
+        if len(remove_indices) == 0:
+            return 0
+        # every row from the lowest removed row upwards changes its hash
+        lowest_index = remove_indices[len(remove_indices) - 1]
+        self.zobrist_hash ^= self._get_rows_hash(lowest_index)
+        # remove rows from highest to lowest so that the lower indices stay valid
+        for index in remove_indices:
+            del self.row_masks[index]
+            del self.cell_rows[index]
+            # drop bit index of every column and shift all higher bits down
+            lower_bits = (1 << index) - 1
+            self.column_masks = [(mask & lower_bits) | (mask >> (index + 1) << index)
+                                 for mask in self.column_masks]
+        # refill the board with empty rows at the top
+        for _ in remove_indices:
+            self.row_masks.append(0)
+            self.cell_rows.append([0 for _ in range(GRID_COL_COUNT)])
+        self.zobrist_hash ^= self._get_rows_hash(lowest_index)
+        # return number of rows removed
+        return len(remove_indices)
+
+    def _get_rows_hash(self, start_index):
+        """:return: zobrist hash of all filled cells at row start_index or higher"""
+        result = 0
+        for y in range(start_index, GRID_ROW_COUNT):
+            result ^= ZOBRIST_ROW_KEYS[y][self.row_masks[y]]
+        return result
+
+    def _get_full_rows(self):
+        """:return: indices of all full rows from highest to lowest"""
+        return [index for index in range(GRID_ROW_COUNT - 1, -1, -1) if self.row_masks[index] == FULL_ROW_MASK]
+
+    def apply(self, placement):
+        """
+        drops a shape from above the board onto it and removes all full rows afterwards
+
+        :param placement: (shape form, number of left turns, x position) of the shape
+        :return: undo token to restore the board with undo, None if the shape can not be placed
+        """
+        shape_form, turns, x = placement
+        orientations = SHAPE_ORIENTATIONS[int(shape_form)]
+        orientation = orientations[turns % len(orientations)]
+        landing_row = self.get_landing_row(orientation, x)
+        # shape would be above the board
+        if landing_row + orientation.height > GRID_ROW_COUNT:
+            return None
+        zobrist_hash = self.zobrist_hash
+
+        self.place_shape(orientation.shape, x, landing_row + orientation.height - 1, 0)
+        remove_indices = self._get_full_rows()
+        # removed rows are taken out of the board and not changed afterwards
+        removed_rows = [self.cell_rows[index] for index in remove_indices]
+        lines_cleared = self.remove_full_rows()
+
+        cells = [(x + rel_x, landing_row + row) for rel_x, row in orientation.cells]
+        return UndoToken(cells, remove_indices, removed_rows, None, lines_cleared, zobrist_hash)
+
+    def undo(self, token: UndoToken):
+        """
+        restores the board to its state before the placement that returned the token,
+        placements have to be undone in reverse order
+
+        :param token: undo token returned by apply
+        """
+        # insert removed rows again from lowest to highest, the highest rows are empty
+        for index, row in zip(reversed(token.removed_indices), reversed(token.removed_rows)):
+            self.row_masks.insert(index, FULL_ROW_MASK)
+            self.row_masks.pop()
+            self.cell_rows.insert(index, row)
+            self.cell_rows.pop()
+            # shift all bits from index upwards up and set bit index of every column
+            lower_bits = (1 << index) - 1
+            self.column_masks = [(mask & lower_bits) | (mask >> index << (index + 1)) | (1 << index)
+                                 for mask in self.column_masks]
+        # remove the placed shape
+        for x, y in token.cells:
+            self.row_masks[y] &= ~(1 << x)
+            self.column_masks[x] &= ~(1 << y)
+            self.cell_rows[y][x] = 0
+        self.zobrist_hash = token.zobrist_hash
+
+    def evaluate_position(self, shape, x, y, distance_to_collision=None):
+        """
+        :param shape more dimensional list containing a shape
+        :param x position of shape
+        :param y position of shape
+        :param distance_to_collision: optional distance to collision, if it is already known to prevent
+        calculating values again
+        :returns dictionary with lines cleared, sum of heights, number of holes and bumpiness if the shape
+        would be placed
+        """
+        # check if distance is not known yet
+        if distance_to_collision is None:
+            distance_to_collision = self.distance_to_collision(shape, x, y)
+
+        result = {"lines_cleared": 0,
+                  "max_heights": [],
+                  "number_of_holes": 0,
+                  "bumpiness": [],
+                  "valid": False}
+
+        # set y value where the ship will be placed
+        y -= distance_to_collision
+        # if y coordinate is bigger or equal to GRID_ROW_COUNT -> shape can not be placed
+        if self._violates_constraints(shape, x, y) or distance_to_collision < 0:
+            # shape is not placeable at this position
+            return result
+
+        heights = self.get_col_heights()
+        number_of_holes = self.get_hole_count()
+        # row masks of all rows the shape would be placed in
+        changed_rows = {}
+        # for every line in shape
+        for rel_x, line in enumerate(shape):
+            column = x + rel_x
+            column_mask = self.column_masks[column]
+            new_column_mask = column_mask
+            for rel_y, val in enumerate(line):
+                if val == 0:
+                    continue
+                cell_y = y - rel_y
+                new_column_mask |= 1 << cell_y
+                changed_rows[cell_y] = changed_rows.get(cell_y, self.row_masks[cell_y]) | (1 << column)
+            # holes of a column are all empty cells below its highest element
+            number_of_holes += new_column_mask.bit_length() - new_column_mask.bit_count() \
+                - column_mask.bit_length() + column_mask.bit_count()
+            heights[column] = new_column_mask.bit_length()
+
+        result["lines_cleared"] = len([mask for mask in changed_rows.values() if mask == FULL_ROW_MASK])
+        # set number of holes
+        result["number_of_holes"] = number_of_holes
+        # set heights
+        result["max_heights"] = sum(heights)
+        # get bumpiness with test shape
+        result["bumpiness"] = sum([abs(heights[i] - heights[i - 1]) for i in range(1, len(heights))])
+        result["valid"] = True
+        return result
+
+    def evaluate_all_placements(self, shape_form, y=GRID_ROW_COUNT - 1):
+        """
+        evaluates every orientation of the shape at every column like evaluate_position
+        without creating a dictionary for every placement
+
+        :param shape_form: form of the shape
+        :param y: position of shape
+        :return: placement buffer of this board, it is overwritten by the next call
+        """
+        return fill_placement_buffer(self, self.placement_buffer, shape_form, y, self.get_col_heights(),
+                                     self.get_hole_count(), [mask.bit_count() for mask in self.row_masks])
+
+    def reset_board(self):
+        """clear board by deleting all rows and columns"""
+        self.row_masks = [0 for _ in range(GRID_ROW_COUNT)]
+        self.column_masks = [0 for _ in range(GRID_COL_COUNT)]
+        self.cell_rows = [[0 for _ in range(GRID_COL_COUNT)] for _ in range(GRID_ROW_COUNT)]
+        self.zobrist_hash = 0
+
+    def get_hole_count(self):
+        """
+        :return: number of wholes on the board
+        """
+        result = 0
+        for mask in self.column_masks:
+            result += mask.bit_length() - mask.bit_count()
+        return result
+
+    def get_col_heights(self):
+        """
+        :return: list containing height of each column
+        """
+        return [mask.bit_length() for mask in self.column_masks]
+
+    def get_bumpiness(self):
+        """
+        :return: sum of differences between adjacent columns
+        """
+        heights = self.get_col_heights()
+        result = 0
+        for i in range(1, GRID_COL_COUNT):
+            result += abs(heights[i] - heights[i - 1])
+        return result
+
+    def get_cells(self):
+        """
+        :return: generator of (x, y, value) for every filled cell of the board
+        """
+        for y, mask in enumerate(self.row_masks):
+            if mask == 0:
+                continue
+            row = self.cell_rows[y]
+            for x in range(GRID_COL_COUNT):
+                if row[x] != 0:
+                    yield x, y, row[x]
+
+    def __str__(self):
+        result = ""
+        for i in range(GRID_ROW_COUNT):
+            for j in range(GRID_COL_COUNT):
+                result += str(self.cell_rows[GRID_ROW_COUNT - 1 - i][j]) + '-'
+            result += "\n"
+
+        return result
@@ -1,4 +1,24 @@
+import random
+from array import array
+
 from Tetris_Game.Settings import GRID_ROW_COUNT, GRID_COL_COUNT
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
+
+# every orientation of a shape at every column
+MAX_NUMBER_OF_PLACEMENTS = 4 * GRID_COL_COUNT
+
+# fixed seed so that every process and every board engine uses the same keys
+ZOBRIST_SEED = 20
+
+
+def _build_zobrist_keys():
+    """:return: random 64 bit key of every cell indexed by [x][y]"""
+    randomizer = random.Random(ZOBRIST_SEED)
+    return [[randomizer.getrandbits(64) for _ in range(GRID_ROW_COUNT)] for _ in range(GRID_COL_COUNT)]
+
+
+# the hash of a board is the xor of the keys of all filled cells
+ZOBRIST_KEYS = _build_zobrist_keys()
 
 
 class TetrisColumn:
@@ -15,12 +35,6 @@ class TetrisColumn:
             result += sign if self.column[i] == 0 else 0
         return result
 
-    def _update_number_of_wholes(self, prev_max_height, new_max_height):
-        """find all new wholes that have formed between previous max height
-        and new max height"""
-        sign = 1 if new_max_height > prev_max_height else -1
-        self.number_of_wholes += new_max_height - prev_max_height + sign
-
     def _find_next_highest_element(self, start_index=GRID_COL_COUNT - 1):
         """find next element starting at start index
         finds highest element at default"""
@@ -56,6 +70,14 @@ class TetrisColumn:
                 self.column[i] = 0
             self.highest_index -= shift
 
+    def clone(self):
+        """:return: copy of this column"""
+        column = TetrisColumn.__new__(TetrisColumn)
+        column.column = self.column[:]
+        column.highest_index = self.highest_index
+        column.number_of_wholes = self.number_of_wholes
+        return column
+
     def increase_element(self, index):
         """increases counter by one"""
         # if counter zero add element at position
@@ -89,8 +111,8 @@ class TetrisColumn:
             raise IndexError("column already has element at given index ")
         n = len(indices)
         if indices[0] > self.highest_index:
-            # check if new wholes were formed
-            self._update_number_of_wholes(self.highest_index, indices[n - 1])
+            # every cell between previous and new highest element that is not filled now is a new whole
+            self.number_of_wholes += indices[0] - self.highest_index - n
             self.highest_index = indices[0]
         else:
             self.number_of_wholes -= n
@@ -112,8 +134,8 @@ class TetrisColumn:
         # max height changed but no element has to move down
         if is_highest_element:
             self.highest_index = self._find_next_highest_element(indices[0] - 1)
-            # check if new wholes were removed
-            self._update_number_of_wholes(indices[0], self.highest_index)
+            # wholes above the new highest element are no wholes anymore
+            self.number_of_wholes = len([i for i in range(self.highest_index) if self.column[i] == 0])
 
     def has_element_at_position(self, y):
         return self.column[y] > 0
@@ -126,11 +148,137 @@ class TetrisColumn:
         return y - self.highest_index - 1 if y >= self.highest_index else y - self._find_next_highest_element(y) - 1
 
 
+class PlacementBuffer:
+    """preallocated arrays containing the evaluation of every valid placement of a shape,
+    only the first size entries are valid"""
+
+    def __init__(self):
+        self.size = 0
+        self.turns = array('b', [0]) * MAX_NUMBER_OF_PLACEMENTS
+        self.x = array('b', [0]) * MAX_NUMBER_OF_PLACEMENTS
+        self.lines_cleared = array('b', [0]) * MAX_NUMBER_OF_PLACEMENTS
+        self.aggregate_height = array('h', [0]) * MAX_NUMBER_OF_PLACEMENTS
+        self.number_of_holes = array('h', [0]) * MAX_NUMBER_OF_PLACEMENTS
+        self.bumpiness = array('h', [0]) * MAX_NUMBER_OF_PLACEMENTS
+
+
+def fill_placement_buffer(board, buffer: PlacementBuffer, shape_form, y, heights, number_of_holes, row_counts):
+    """
+    evaluates every orientation of a shape at every column like evaluate_position of the board
+    and writes the results into the buffer
+
+    :param board: board the shape is placed on
+    :param buffer: buffer the evaluations are written to
+    :param shape_form: form of the shape
+    :param y: position of the shape
+    :param heights: height of every column of the board
+    :param number_of_holes: number of holes of the board
+    :param row_counts: number of elements in every row of the board
+    :return: the buffer
+    """
+    aggregate_height = sum(heights)
+    bumpiness = 0
+    for i in range(1, GRID_COL_COUNT):
+        bumpiness += abs(heights[i] - heights[i - 1])
+
+    size = 0
+    for orientation in SHAPE_ORIENTATIONS[int(shape_form)]:
+        lowest_cells = orientation.lowest_cells
+        highest_cells = orientation.highest_cells
+        width = orientation.width
+        lowest_row = y + 1 - orientation.height
+        for x in range(GRID_COL_COUNT - width + 1):
+            # lowest row the shape can be placed in without being inside of a column
+            landing_row = 0
+            for rel_x in range(width):
+                row = heights[x + rel_x] - lowest_cells[rel_x]
+                if row > landing_row:
+                    landing_row = row
+
+            if lowest_row < landing_row:
+                # shape is below the highest element of a column -> evaluate every cell
+                val = board.evaluate_position(orientation.shape, x, y)
+                if not val["valid"]:
+                    continue
+                lines_cleared = val["lines_cleared"]
+                new_aggregate_height = val["max_heights"]
+                new_number_of_holes = val["number_of_holes"]
+                new_bumpiness = val["bumpiness"]
+            else:
+                # shape lands at or below y and is therefore inside of the board
+                lines_cleared = 0
+                for rel_row, count in enumerate(orientation.row_counts):
+                    if row_counts[landing_row + rel_row] + count >= GRID_COL_COUNT:
+                        lines_cleared += 1
+                new_aggregate_height = aggregate_height
+                new_number_of_holes = number_of_holes
+                new_bumpiness = bumpiness
+                # only the columns of the shape and the differences to their neighbours change
+                previous_height = heights[x - 1] if x > 0 else 0
+                previous_new_height = previous_height
+                for rel_x in range(width):
+                    height = heights[x + rel_x]
+                    new_height = landing_row + highest_cells[rel_x] + 1
+                    new_aggregate_height += new_height - height
+                    # every cell between column and shape is a new hole
+                    new_number_of_holes += landing_row + lowest_cells[rel_x] - height
+                    if x + rel_x > 0:
+                        new_bumpiness += abs(new_height - previous_new_height) - abs(height - previous_height)
+                    previous_height = height
+                    previous_new_height = new_height
+                if x + width < GRID_COL_COUNT:
+                    next_height = heights[x + width]
+                    new_bumpiness += abs(next_height - previous_new_height) - abs(next_height - previous_height)
+
+            buffer.turns[size] = orientation.turns
+            buffer.x[size] = x
+            buffer.lines_cleared[size] = lines_cleared
+            buffer.aggregate_height[size] = new_aggregate_height
+            buffer.number_of_holes[size] = new_number_of_holes
+            buffer.bumpiness[size] = new_bumpiness
+            size += 1
+    buffer.size = size
+    return buffer
+
+
+class UndoToken:
+    def __init__(self, cells, removed_indices, removed_rows, column_states, lines_cleared, zobrist_hash):
+        """
+        everything needed to restore a board after a placement
+
+        :param cells: (x, y) of every cell filled by the placement
+        :param removed_indices: indices of the full rows that were removed from highest to lowest
+        :param removed_rows: values of the removed rows
+        :param column_states: state of the columns before the placement, depends on the board
+        :param lines_cleared: number of rows removed by the placement
+        :param zobrist_hash: hash of the board before the placement
+        """
+        self.cells = cells
+        self.removed_indices = removed_indices
+        self.removed_rows = removed_rows
+        self.column_states = column_states
+        self.lines_cleared = lines_cleared
+        self.zobrist_hash = zobrist_hash
+
+
 class TetrisBoard:
     def __init__(self):
         self.column_list = [TetrisColumn() for _ in range(GRID_COL_COUNT)]
         # count how many elements are in a given row
         self.row_counter_list = TetrisColumn()
+        # reused by every call of evaluate_all_placements
+        self.placement_buffer = PlacementBuffer()
+        # zobrist hash of all filled cells, updated with every change of the board
+        self.zobrist_hash = 0
+
+    def clone(self):
+        """:return: copy of this board that does not share any column with it"""
+        board = TetrisBoard.__new__(TetrisBoard)
+        board.column_list = [column.clone() for column in self.column_list]
+        board.row_counter_list = self.row_counter_list.clone()
+        board.placement_buffer = PlacementBuffer()
+        board.zobrist_hash = self.zobrist_hash
+        return board
 
     def _violates_constraints(self, shape, x, y):
         return x < 0 or x + len(shape) > GRID_COL_COUNT or y >= GRID_ROW_COUNT or y < 0
@@ -179,6 +327,32 @@ class TetrisBoard:
 
         return result
 
+    def get_landing_row(self, orientation, x):
+        """
+        :param orientation ShapeOrientation of the shape
+        :param x position of shape
+        :returns lowest row the shape can be placed in without being inside of a column"""
+        landing_row = 0
+        for rel_x, lowest_cell in enumerate(orientation.lowest_cells):
+            row = self.column_list[x + rel_x].highest_index + 1 - lowest_cell
+            if row > landing_row:
+                landing_row = row
+        return landing_row
+
+    def get_landing_distance(self, orientation, x, y):
+        """
+        :param orientation ShapeOrientation of the shape
+        :param x position of shape
+        :param y position of shape
+        :returns distance to collision like distance_to_collision, if the shape is above every column
+        it covers the distance is calculated from the column heights without checking every cell"""
+        landing_row = self.get_landing_row(orientation, x)
+        lowest_row = y + 1 - orientation.height
+        # shape is already below the highest element of a column
+        if lowest_row < landing_row:
+            return self.distance_to_collision(orientation.shape, x, y)
+        return lowest_row - landing_row
+
     def place_shape(self, shape, x, y, distance_to_collision=None):
         """
         :param shape more dimensional list containing a shape
@@ -208,6 +382,7 @@ class TetrisBoard:
                 indices.append(y - rel_y)
                 # increase counter by one
                 self.row_counter_list.increase_element(y - rel_y)
+                self.zobrist_hash ^= ZOBRIST_KEYS[x + rel_x][y - rel_y]
             self.column_list[x + rel_x].add_elements(elements, indices)
         return True
 
@@ -218,21 +393,100 @@ class TetrisBoard:
         :return: number of rows removed
         """
         # find all indices of of full rows
-        remove_indices = [index for index in range(GRID_ROW_COUNT - 1, -1, -1)
-                          if self.row_counter_list.column[index] == GRID_COL_COUNT]
+        remove_indices = self._get_full_rows()
         # check if any rows have to be removed
         if len(remove_indices) == 0:
             return 0
+        # every row from the lowest removed row upwards changes its hash
+        lowest_index = remove_indices[len(remove_indices) - 1]
+        self.zobrist_hash ^= self._get_rows_hash(lowest_index)
         # remove all of the found indices from all columns
         for column in self.column_list:
             column.remove_elements(remove_indices)
         # also remove the indices from counter list
         self.row_counter_list.remove_elements(remove_indices)
+        self.zobrist_hash ^= self._get_rows_hash(lowest_index)
         # return number of rows removed
         return len(remove_indices)
 
-    def evaluate_position(self, shape, x, y):
-        distance_to_collision = self.distance_to_collision(shape, x, y)
+    def _get_rows_hash(self, start_index):
+        """:return: zobrist hash of all filled cells at row start_index or higher"""
+        result = 0
+        for x, column in enumerate(self.column_list):
+            keys = ZOBRIST_KEYS[x]
+            for y in range(start_index, column.highest_index + 1):
+                if column.column[y] != 0:
+                    result ^= keys[y]
+        return result
+
+    def _get_full_rows(self):
+        """:return: indices of all full rows from highest to lowest"""
+        return [index for index in range(GRID_ROW_COUNT - 1, -1, -1)
+                if self.row_counter_list.column[index] == GRID_COL_COUNT]
+
+    def apply(self, placement):
+        """
+        drops a shape from above the board onto it and removes all full rows afterwards
+
+        :param placement: (shape form, number of left turns, x position) of the shape
+        :return: undo token to restore the board with undo, None if the shape can not be placed
+        """
+        shape_form, turns, x = placement
+        orientations = SHAPE_ORIENTATIONS[int(shape_form)]
+        orientation = orientations[turns % len(orientations)]
+        landing_row = self.get_landing_row(orientation, x)
+        # shape would be above the board
+        if landing_row + orientation.height > GRID_ROW_COUNT:
+            return None
+        column_states = [(column.highest_index, column.number_of_wholes)
+                         for column in self.column_list + [self.row_counter_list]]
+        zobrist_hash = self.zobrist_hash
+
+        self.place_shape(orientation.shape, x, landing_row + orientation.height - 1, 0)
+        remove_indices = self._get_full_rows()
+        removed_rows = [[column.column[index] for column in self.column_list] for index in remove_indices]
+        lines_cleared = self.remove_full_rows()
+
+        cells = [(x + rel_x, landing_row + row) for rel_x, row in orientation.cells]
+        return UndoToken(cells, remove_indices, removed_rows, column_states, lines_cleared, zobrist_hash)
+
+    def undo(self, token: UndoToken):
+        """
+        restores the board to its state before the placement that returned the token,
+        placements have to be undone in reverse order
+
+        :param token: undo token returned by apply
+        """
+        # insert removed rows again from lowest to highest, the highest rows are empty
+        for index, row in zip(reversed(token.removed_indices), reversed(token.removed_rows)):
+            for column, val in zip(self.column_list, row):
+                column.column.insert(index, val)
+                column.column.pop()
+            self.row_counter_list.column.insert(index, GRID_COL_COUNT)
+            self.row_counter_list.column.pop()
+        # remove the placed shape
+        for x, y in token.cells:
+            self.column_list[x].column[y] = 0
+            self.row_counter_list.column[y] -= 1
+        for column, (highest_index, number_of_wholes) in zip(self.column_list + [self.row_counter_list],
+                                                             token.column_states):
+            column.highest_index = highest_index
+            column.number_of_wholes = number_of_wholes
+        self.zobrist_hash = token.zobrist_hash
+
+    def evaluate_position(self, shape, x, y, distance_to_collision=None):
+        """
+        :param shape more dimensional list containing a shape
+        :param x position of shape
+        :param y position of shape
+        :param distance_to_collision: optional distance to collision, if it is already known to prevent
+        calculating values again
+        :returns dictionary with lines cleared, sum of heights, number of holes and bumpiness if the shape
+        would be placed
+        """
+        # check if distance is not known yet
+        if distance_to_collision is None:
+            distance_to_collision = self.distance_to_collision(shape, x, y)
 
         result = {"lines_cleared": 0,
                   "max_heights": [],
@@ -262,7 +516,7 @@ class TetrisBoard:
             hole_count_list[x + rel_x] = number_of_holes
             heights[x + rel_x] = height + 1
 
-        result["lines_cleared"] = len([x for x in line_counter if x >= GRID_ROW_COUNT])
+        result["lines_cleared"] = len([x for x in line_counter if x >= GRID_COL_COUNT])
         # set number of holes
         result["number_of_holes"] = sum(hole_count_list)
         # set heights
@@ -272,11 +526,24 @@ class TetrisBoard:
         result["valid"] = True
         return result
 
+    def evaluate_all_placements(self, shape_form, y=GRID_ROW_COUNT - 1):
+        """
+        evaluates every orientation of the shape at every column like evaluate_position
+        without creating a dictionary for every placement
+
+        :param shape_form: form of the shape
+        :param y: position of shape
+        :return: placement buffer of this board, it is overwritten by the next call
+        """
+        return fill_placement_buffer(self, self.placement_buffer, shape_form, y, self.get_col_heights(),
+                                     self.get_hole_count(), self.row_counter_list.column)
+
     def reset_board(self):
         """clear board by deleting all columns"""
         self.column_list = [TetrisColumn() for _ in range(GRID_COL_COUNT)]
         # count how many elements are in a given row
         self.row_counter_list = TetrisColumn()
+        self.zobrist_hash = 0
 
     def get_hole_count(self):
         """
@@ -302,6 +569,15 @@ class TetrisBoard:
             result += abs(self.column_list[i].highest_index - self.column_list[i - 1].highest_index)
         return result
 
+    def get_cells(self):
+        """
+        :return: generator of (x, y, value) for every filled cell of the board
+        """
+        for x, column in enumerate(self.column_list):
+            for y in range(column.highest_index + 1):
+                if column.column[y] != 0:
+                    yield x, y, column.column[y]
+
     def __str__(self):
         result = ""
         for i in range(GRID_ROW_COUNT):
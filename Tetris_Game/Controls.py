@@ -9,3 +9,13 @@ class Direction(Enum):
 class Turn(Enum):
     LEFT_TURN = -1
     RIGHT_TURN = 1
+
+
+class Action(Enum):
+    NONE = 0
+    LEFT = 1
+    RIGHT = 2
+    ROTATE_LEFT = 3
+    ROTATE_RIGHT = 4
+    SOFT_DROP = 5
+    HARD_DROP = 6
@@ -0,0 +1,259 @@
+from Tetris_Game.BitBoard import TetrisBitBoard
+from Tetris_Game.Board import TetrisBoard
+from Tetris_Game.Controls import Action, Direction, Turn
+from Tetris_Game.PieceSequence import PieceSequence, get_piece_sequence
+from Tetris_Game.Settings import *
+from Tetris_Game.Shape import Shape
+from Tetris_Game.TetrisUtilities import log
+
+# board implementations a tetris model can use
+BOARD_ENGINES = {
+    "column": TetrisBoard,
+    "bitboard": TetrisBitBoard,
+}
+
+
+class TetrisModel:
+    def __init__(self, interactive: bool, visible: bool, board_engine=BOARD_ENGINE):
+        self.interactive = interactive
+        self.visible = visible
+
+        if board_engine not in BOARD_ENGINES:
+            raise ValueError("Value {} is no valid board engine".format(board_engine))
+        self.game_board = BOARD_ENGINES[board_engine]()
+
+        self.shapes = []
+
+        self.paused = False
+        self.game_over = False
+        self.running = True
+
+        self.score = 0
+        self.lines = 0
+        # shapes placed in the current game
+        self.pieces = 0
+        self.high_score = 0
+        self.high_score_lines = 0
+
+        self.on_score_changed_callbacks = []
+
+    # GETTERS
+    def get_next_shape(self):
+        return self.shapes[len(self.shapes) - 2]
+
+    def get_current_shape(self):
+        """get current shape"""
+        # if no shape is left, generate new shapes
+        return self.shapes[len(self.shapes) - 1]
+
+
+class TetrisEngine:
+    """
+    rules of a tetris game without any dependency on pygame. the game only advances when drop, step or place
+    is called, so it runs as fast as the cpu allows
+    """
+
+    def __init__(self, tetris_model: TetrisModel):
+        self.tetris_model = tetris_model
+        # shape forms of the current game and number of bags taken from them
+        self.piece_sequence = PieceSequence()
+        self.bag_index = 0
+
+        self.generate_shapes()
+
+    def generate_shapes(self):
+        """add the next bag of the piece sequence containing all shapes exactly twice"""
+        list_of_shape_forms = self.piece_sequence.get_bag(self.bag_index)
+        self.bag_index += 1
+        list_of_shapes = [Shape(shape_form, self.tetris_model.game_board, GRID_COL_COUNT // 2,
+                                GRID_ROW_COUNT - 1) for shape_form in list_of_shape_forms]
+        self.tetris_model.shapes = list_of_shapes + self.tetris_model.shapes
+
+    def pop_current_shape(self):
+        """remove current shape from list"""
+        if len(self.tetris_model.shapes) < 3:
+            self.generate_shapes()
+        self.tetris_model.shapes.pop()
+
+    def calculate_scores(self) -> int:
+        """
+        removes all full rows and adds their score
+
+        :return: number of rows removed
+        """
+        score_count = self.tetris_model.game_board.remove_full_rows()
+
+        # If cleared nothing, early return
+        if score_count == 0:
+            return 0
+        # Calculate total score based on algorithm
+        total_score = MULTI_SCORE_ALGORITHM(score_count)
+        # Callback
+        for callback in self.tetris_model.on_score_changed_callbacks:
+            callback(self.tetris_model.score, self.tetris_model.score + total_score)
+
+        self.tetris_model.score += total_score
+        self.tetris_model.lines += score_count
+        log("Cleared {} row{} with score {}".format(score_count, 's' if score_count > 1 else '', total_score), 3)
+        return score_count
+
+    def reset_game(self, seed=None):
+        """
+        :param seed: seed of the piece sequence of the next game, games with the same seed get the same shapes.
+        random sequence if None
+        """
+        self.piece_sequence = get_piece_sequence(seed) if seed is not None else PieceSequence()
+        self.bag_index = 0
+        self.tetris_model.game_board.reset_board()
+        self.tetris_model.shapes.clear()
+        self.generate_shapes()
+        self.tetris_model.game_over = False
+
+        self.tetris_model.high_score = self.tetris_model.score
+        self.tetris_model.high_score_lines = self.tetris_model.lines
+        self.tetris_model.score = 0
+        self.tetris_model.lines = 0
+        self.tetris_model.pieces = 0
+        self.tetris_model.fitness = 0
+
+    def reset(self, seed=None):
+        """
+        starts a new game
+
+        :param seed: seed of the shape sequence, games with the same seed get the same shapes
+        """
+        self.reset_game(seed)
+
+    # GAME CONTROL METHODS
+    def toggle_pause(self):
+        """set paused of tetris model to true"""
+        self.tetris_model.paused = not self.tetris_model.paused
+
+    def move_shape(self, direc):
+        """
+        :param direc direction to which the shape is moved
+        moves shape left or right
+        """
+        self.tetris_model.get_current_shape().shift_to_direction(direc)
+
+    def _drop(self, prev_y):
+        # y coordinate was not changed -> shape can not be placed
+        if not self.tetris_model.get_current_shape().placed and prev_y == self.tetris_model.get_current_shape().y:
+            self.tetris_model.game_over = True
+        # shape was placed
+        elif self.tetris_model.get_current_shape().placed:
+            self.tetris_model.score += PER_STEP_SCORE_GAIN * (self.tetris_model.get_current_shape().y - prev_y)
+            # remove current shape from list
+            self.pop_current_shape()
+            self.tetris_model.pieces += 1
+            self.calculate_scores()
+        # y value has changed
+        else:
+            self.tetris_model.score += PER_STEP_SCORE_GAIN
+
+    def drop(self, instant=False):
+        """
+        :param instant if true shape will be placed instantly
+        if false decreases y coordinate of shape if instant is false
+        """
+        y = self.tetris_model.get_current_shape().y
+        if instant:
+            self.tetris_model.get_current_shape().place_shape()
+            self._drop(y)
+        else:
+            self.tetris_model.get_current_shape().decrease_y()
+            # if shape is placed remove it from list
+            self._drop(y)
+
+    def drop_to_landing(self):
+        """
+        lets the current shape fall to its landing row and places it in one step. the score is the same as if
+        the shape fell row by row with drop
+        """
+        shape = self.tetris_model.get_current_shape()
+        if not shape.placed:
+            # one addition per row like every tick of drop, so the sum is exactly the same
+            for _ in range(shape.fall_to_landing_row()):
+                self.tetris_model.score += PER_STEP_SCORE_GAIN
+        self.drop()
+
+    def rotate_tile(self, direc):
+        """
+        :param direc direction in which the shape is turned
+        turn shapes clockwise or counter clockwise
+        """
+        self.tetris_model.get_current_shape().turn_in_direction(direc)
+
+    def step(self, action=Action.NONE):
+        """
+        executes an action and advances the game by one tick like the timer of the game
+
+        :param action: action of the player before the tick, drops replace the tick
+        :return: score gained in this step and if the game is over
+        """
+        score = self.tetris_model.score
+        if self.tetris_model.game_over:
+            return 0, True
+
+        if action == Action.HARD_DROP:
+            self.drop(True)
+        elif action == Action.SOFT_DROP:
+            self.drop()
+        else:
+            if action == Action.LEFT:
+                self.move_shape(Direction.LEFT)
+            elif action == Action.RIGHT:
+                self.move_shape(Direction.RIGHT)
+            elif action == Action.ROTATE_LEFT:
+                self.rotate_tile(Turn.LEFT_TURN)
+            elif action == Action.ROTATE_RIGHT:
+                self.rotate_tile(Turn.RIGHT_TURN)
+            elif action != Action.NONE:
+                raise ValueError("Value {} is no valid action".format(action))
+            self.drop()
+        return self.tetris_model.score - score, self.tetris_model.game_over
+
+    def place(self, rotation: int, column: int):
+        """
+        turns the current shape, moves it as far as possible to the column and lets it fall to its landing row
+
+        :param rotation: number of left turns from the starting orientation of the shape
+        :param column: x position the shape is moved to
+        :return: score gained by placing the shape and if the game is over
+        """
+        score = self.tetris_model.score
+        if self.tetris_model.game_over:
+            return 0, True
+
+        shape = self.tetris_model.get_current_shape()
+        for _ in range((rotation - shape.turns) % len(shape.orientations)):
+            if not shape.turn_in_direction(Turn.LEFT_TURN):
+                break
+        direction = Direction.LEFT if column < shape.x else Direction.RIGHT
+        while shape.x != column and shape.shift_to_direction(direction):
+            pass
+
+        self.drop_to_landing()
+        return self.tetris_model.score - score, self.tetris_model.game_over
+
+    def quit(self):
+        self.tetris_model.running = False
+
+
+class HeadlessTetris:
+    """tetris game without view, can be played by an agent like Tetris"""
+
+    def __init__(self, interactive=False, board_engine=BOARD_ENGINE, seed=None):
+        self.tetris_model = TetrisModel(interactive, False, board_engine)
+        self.tetris_controller = TetrisEngine(self.tetris_model)
+        if seed is not None:
+            self.tetris_controller.reset(seed)
+
+    def reset(self, seed=None):
+        self.tetris_controller.reset(seed)
+
+    def step(self, action=Action.NONE):
+        return self.tetris_controller.step(action)
+
+    def place(self, rotation: int, column: int):
+        return self.tetris_controller.place(rotation, column)
@@ -1,19 +1,18 @@
-import random
-from datetime import *
-
 import pygame as pygame
 
 from Tetris_Game import TetrisUtilities
-from Tetris_Game.Board import TetrisBoard
 from Tetris_Game.Controls import Direction, Turn
+from Tetris_Game.GameCore import BOARD_ENGINES, TetrisEngine, TetrisModel
 from Tetris_Game.Settings import *
-from Tetris_Game.Shape import Shape, ShapeForms
+from Tetris_Game.TetrisUtilities import log
+from Tetris_Game.TextCache import get_text_cache
+from Tetris_Game.TileAtlas import get_tile_atlas
 
 
 class Tetris:
     def __init__(self, interactive=True, visible=True, offset_x=0, offset_y=0, display_statistics=True,
-                 display_controls=True, title="Tetris", lock_step=False, scale=1):
-        self.tetris_model = TetrisModel(interactive, visible)
+                 display_controls=True, title="Tetris", lock_step=False, scale=1, board_engine=BOARD_ENGINE):
+        self.tetris_model = TetrisModel(interactive, visible, board_engine)
         self.tetris_view = TetrisView(tetris_model=self.tetris_model,
                                       offset_x=offset_x,
                                       offset_y=offset_y,
@@ -55,34 +54,19 @@ class Tetris:
         return self.tetris_view.offset_x
 
 
-class TetrisModel:
-    def __init__(self, interactive: bool, visible: bool):
-        self.interactive = interactive
-        self.visible = visible
-
-        self.game_board = TetrisBoard()
-
-        self.shapes = []
-
-        self.paused = False
-        self.game_over = False
-        self.running = True
+class ViewFrame:
+    """what a view drew in a frame, compared with the next frame to find the rectangles that changed"""
 
-        self.score = 0
-        self.lines = 0
-        self.high_score = 0
-        self.high_score_lines = 0
+    __slots__ = ("geometry", "board_hash", "cells", "shape", "shape_rects", "statistics")
 
-        self.on_score_changed_callbacks = []
-
-    # GETTERS
-    def get_next_shape(self):
-        return self.shapes[len(self.shapes) - 2]
-
-    def get_current_shape(self):
-        """get current shape"""
-        # if no shape is left, generate new shapes
-        return self.shapes[len(self.shapes) - 1]
+    def __init__(self, geometry: tuple, board_hash: int, cells: frozenset, shape: tuple, shape_rects: tuple,
+                 statistics: tuple):
+        self.geometry = geometry
+        self.board_hash = board_hash
+        self.cells = cells
+        self.shape = shape
+        self.shape_rects = shape_rects
+        self.statistics = statistics
 
 
 class TetrisView:
@@ -140,6 +124,14 @@ class TetrisView:
             self.screen = pygame.display.get_surface()
         log("Screen size set to: ({}, {})".format(self.screen_width, self.screen_height), 2)
         self.obs_size = GRID_ROW_COUNT * GRID_COL_COUNT
+        # pre-rendered tiles of the current grid size, fetched at the first draw
+        self.tile_atlas = None
+        # what was drawn in the last frame, None if everything has to be drawn
+        self.last_frame = None
+        # number of frames that changed the drawn game, copies of the drawn game are only updated if it changed
+        self.version = 0
+        # position of the own surface on the screen if the game is drawn offscreen
+        self.screen_position = None
 
     # SETTER
     def set_scale(self, scale, text_scale=None):
@@ -152,6 +144,9 @@ class TetrisView:
         self.grid_size = self.screen_height // GRID_ROW_COUNT
         # correct height to multiple of gid size
         self.screen_height = self.grid_size * GRID_ROW_COUNT
+        # tiles are only rendered again if the grid size changed
+        if self.tile_atlas is not None and self.tile_atlas.grid_size != self.grid_size:
+            self.tile_atlas = get_tile_atlas(self.grid_size)
 
         # Coordinates calculations
         self.margin = MARGIN * self.game_scale
@@ -165,16 +160,132 @@ class TetrisView:
         self.offset_x = x
         self.offset_y = y
 
+    def set_offscreen(self):
+        """
+        the game is drawn into its own surface instead of the screen. the owner of the view copies the surface
+        to the screen at the former offset, which is kept in screen_position
+        """
+        self.screen_position = (self.offset_x, self.offset_y)
+        self.set_offset(0, 0)
+        self.screen = pygame.Surface(self.get_rect().size, 0, pygame.display.get_surface())
+        self.invalidate()
+
     def get_color_tuple(self, color_hex="11c5bf"):
         if color_hex not in self.color_hash:
             self.color_hash[color_hex] = TetrisUtilities.get_color_tuple(color_hex)
         return self.color_hash[color_hex]
 
-    def draw(self):
-        # do not draw if not visible
+    def get_rect(self) -> pygame.Rect:
+        """:return: rectangle of the screen the game is drawn in"""
+        rect = pygame.Rect(self.offset_x, self.offset_y, GRID_COL_COUNT * self.grid_size, self.screen_height)
+        if self.display_statistics:
+            rect.union_ip(self._get_statistics_rect())
+        return rect
+
+    def _get_statistics_rect(self) -> pygame.Rect:
+        return pygame.Rect(self.text_x_start - self.margin + self.offset_x, self.offset_y,
+                           self.screen_width - self.text_x_start + self.margin, self.screen_height)
+
+    def _get_frame(self) -> ViewFrame:
+        model = self.tetris_model
+        board_hash = model.game_board.zobrist_hash
+        # cells only need to be collected if the board changed
+        if self.last_frame is not None and self.last_frame.board_hash == board_hash:
+            cells = self.last_frame.cells
+        else:
+            cells = frozenset(model.game_board.get_cells())
+        shape = model.get_current_shape()
+        statistics = None
+        if self.display_statistics:
+            statistics = (self.title, model.paused, model.score, model.lines, model.high_score,
+                          model.high_score_lines, model.get_next_shape().name)
+        geometry = (self.offset_x, self.offset_y, self.grid_size, self.text_scale, self.display_statistics,
+                    model.game_over)
+        return ViewFrame(geometry, board_hash, cells, (shape.shape_form, shape.x, shape.y, shape.turns),
+                         self._get_shape_rects(), statistics)
+
+    def _get_shape_rects(self) -> tuple:
+        """:return: rectangles of the current shape and its prediction"""
+        if self.tetris_model.game_over:
+            return ()
+        shape = self.tetris_model.get_current_shape()
+        orientation = shape.get_orientation()
+        rect = pygame.Rect(shape.x * self.grid_size + self.offset_x,
+                           (GRID_ROW_COUNT - shape.y - 1) * self.grid_size + self.offset_y,
+                           orientation.width * self.grid_size, orientation.height * self.grid_size)
+        if not DISPLAY_PREDICTION:
+            return (rect,)
+        return rect, rect.move(0, shape.get_y_distance_to_collision() * self.grid_size)
+
+    def _get_dirty_rects(self, last_frame, frame) -> list:
+        """:return: rectangles that changed between the frames"""
+        if last_frame is None:
+            return [self.get_rect()]
+        if last_frame.geometry != frame.geometry:
+            # shapes can reach above the board, the old ones are removed as well
+            return [self.get_rect(), *last_frame.shape_rects]
+        board_rects = []
+        if last_frame.cells is not frame.cells:
+            board_rects += [pygame.Rect(self.offset_x + x * self.grid_size,
+                                        self.offset_y + (GRID_ROW_COUNT - y - 1) * self.grid_size,
+                                        self.grid_size, self.grid_size)
+                            for x, y, _ in last_frame.cells ^ frame.cells]
+        if last_frame.shape != frame.shape or last_frame.shape_rects != frame.shape_rects:
+            board_rects += last_frame.shape_rects + frame.shape_rects
+        rects = [board_rects[0].unionall(board_rects[1:])] if board_rects else []
+        if last_frame.statistics != frame.statistics:
+            rects.append(self._get_statistics_rect())
+        return rects
+
+    def invalidate(self):
+        """the whole game is drawn again at the next frame"""
+        self.last_frame = None
+
+    def get_dirty_rects(self) -> list:
+        """
+        compares the game with the last frame, the current state becomes the last frame
+
+        :return: rectangles of the screen that have to be drawn again
+        """
         if not self.tetris_model.visible:
+            return []
+        frame = self._get_frame()
+        # shapes can reach outside of the screen, fill does not crop rectangles with a negative position
+        screen_rect = self.screen.get_rect()
+        rects = [rect.clip(screen_rect) for rect in self._get_dirty_rects(self.last_frame, frame)]
+        self.last_frame = frame
+        return [rect for rect in rects if rect.width > 0 and rect.height > 0]
+
+    def draw_rects(self, rects: list):
+        """
+        draws all layers of the game, but only inside of the rectangles
+
+        :param rects: rectangles of the screen that are drawn
+        """
+        if not self.tetris_model.visible or not rects:
             return
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.screen.fill(self.get_color_tuple(COLORS.get("BACKGROUND_BLACK")))
+            self._draw_game()
+        self.screen.set_clip(None)
+        self.version += 1
+
+    def draw(self) -> list:
+        """
+        draws everything that changed since the last frame
+
+        :return: rectangles of the screen that were drawn
+        """
+        rects = self.get_dirty_rects()
+        self.draw_rects(rects)
 
+        # only if view initialized screen it will update the screen
+        if self.master and rects:
+            pygame.display.update(rects)
+        return rects
+
+    def _draw_game(self):
         ################
         # Tetris Board #
         ################
@@ -201,18 +312,14 @@ class TetrisView:
 
         if self.display_statistics:
             self.draw_statistics()
-        # only if view initialized screen it will update the screen
-        if self.master:
-            pygame.display.update()
 
     def draw_text(self, text: str, font_size: int, x: int, y: int, color_str="WHITE"):
-        text_image = pygame.font.SysFont(FONT_NAME, int(font_size * self.text_scale)) \
-            .render(text, False, self.get_color_tuple(COLORS[color_str]))
+        text_image = get_text_cache().render(text, int(font_size * self.text_scale),
+                                             self.get_color_tuple(COLORS[color_str]))
         self.screen.blit(text_image, (x + self.offset_x, y + self.offset_y))
 
     def get_text_central(self, text: str, font_size: int, color_str="WHITE"):
-        return pygame.font.SysFont(FONT_NAME, int(font_size * self.text_scale)) \
-            .render(text, False, self.get_color_tuple(COLORS[color_str]))
+        return get_text_cache().render(text, int(font_size * self.text_scale), self.get_color_tuple(COLORS[color_str]))
 
     def draw_game_over(self):
         text_image = self.get_text_central(text="GAME OVER", font_size=64, color_str="WHITE")
@@ -290,20 +397,21 @@ class TetrisView:
 
         self.draw_next_shape((text_x_start, text_y_start))
 
+    def get_tile_atlas(self):
+        """:return: pre-rendered tiles of the current grid size"""
+        if self.tile_atlas is None:
+            self.tile_atlas = get_tile_atlas(self.grid_size)
+        return self.tile_atlas
+
     def draw_board(self):
         """draws current board with all placed shapes to the screen"""
-        # list of all columns
-        column_list = self.tetris_model.game_board.column_list
-        # for every position
-        for x in range(len(column_list)):
-            for y in range(GRID_ROW_COUNT):
-                # shape value
-                val = column_list[x].column[y]
-                if val == 0:
-                    continue
-                coordinate_x = self.grid_size * x
-                coordinate_y = (GRID_ROW_COUNT - y - 1) * self.grid_size
-                self._draw_shape(coordinate_x, coordinate_y, val)
+        tiles = self.get_tile_atlas().tiles
+        grid_size = self.grid_size
+        offset_x = self.offset_x
+        offset_y = self.offset_y + (GRID_ROW_COUNT - 1) * grid_size
+        # blit every filled position in one batch
+        self.screen.blits([(tiles[val], (offset_x + grid_size * x, offset_y - grid_size * y))
+                           for x, y, val in self.tetris_model.game_board.get_cells()], False)
 
     def draw_shape(self, outline_only=False):
         """ :param outline_only if true only the outline will be visible
@@ -311,14 +419,14 @@ class TetrisView:
         # get current shape
         shape = self.tetris_model.get_current_shape()
         offset_y = shape.get_y_distance_to_collision() if outline_only else 0
+        atlas = self.get_tile_atlas()
+        tiles = atlas.outlines if outline_only else atlas.tiles
         # for all shape positions
-        for rel_x, line in enumerate(shape.shape):
-            for rel_y, val in enumerate(line):
-                if val == 0:
-                    continue
-                x = (shape.x + rel_x) * self.grid_size
-                y = (GRID_ROW_COUNT - shape.y - 1 + rel_y + offset_y) * self.grid_size
-                self._draw_shape(x, y, val, outline_only)
+        self.screen.blits([(tiles[val], ((shape.x + rel_x) * self.grid_size + self.offset_x,
+                                         (GRID_ROW_COUNT - shape.y - 1 + rel_y + offset_y) * self.grid_size
+                                         + self.offset_y))
+                           for rel_x, line in enumerate(shape.shape)
+                           for rel_y, val in enumerate(line) if val != 0], False)
 
     def draw_next_shape(self, pos):
         next_shape = self.tetris_model.get_next_shape()
@@ -331,40 +439,16 @@ class TetrisView:
                 self._draw_shape(x, y, val)
 
     def _draw_shape(self, x, y, val, outline_only=False):
-        if outline_only:
-            # Outline-only for prediction location
-            pygame.draw.rect(self.screen,
-                             self.get_color_tuple(COLORS.get("TILE_" + SHAPE_CHARS[val - 1])),
-                             (x + 1 + self.offset_x,
-                              y + 1 + self.offset_y, self.grid_size - 2,
-                              self.grid_size - 2),
-                             1)
-        else:
-            pygame.draw.rect(self.screen,
-                             self.get_color_tuple(COLORS.get("TILE_" + SHAPE_CHARS[val - 1])),
-                             (x + self.offset_x,
-                              y + self.offset_y,
-                              self.grid_size,
-                              self.grid_size))
-            pygame.draw.rect(self.screen,
-                             self.get_color_tuple(COLORS.get("BACKGROUND_BLACK")),
-                             (x + self.offset_x,
-                              y + self.offset_y,
-                              self.grid_size,
-                              self.grid_size),
-                             1)
-            # Draw highlight triangle
-            offset = int(self.grid_size / 10)
-            pygame.draw.polygon(self.screen, self.get_color_tuple(COLORS.get("TRIANGLE_GRAY")),
-                                ((x + offset + self.offset_x, y + offset + self.offset_y),
-                                 (x + 3 * offset + self.offset_x, y + offset + self.offset_y),
-                                 (x + offset + self.offset_x, y + 3 * offset + self.offset_y)))
-
-
-class TetrisControl:
-    def __init__(self, tetris_model: TetrisModel):
-        self.tetris_model = tetris_model
+        atlas = self.get_tile_atlas()
+        # Outline-only for prediction location
+        tile = atlas.outlines[val] if outline_only else atlas.tiles[val]
+        self.screen.blit(tile, (x + self.offset_x, y + self.offset_y))
+
 
+class TetrisControl(TetrisEngine):
+    """pygame adapter of the game engine, maps key presses and timer events to the engine"""
+
+    def __init__(self, tetris_model: TetrisModel):
         # map keys to methods
         self.key_actions = {
             "ESCAPE": self.toggle_pause,
@@ -376,22 +460,7 @@ class TetrisControl:
             "r": lambda: self.rotate_tile(Turn.RIGHT_TURN)
         }
 
-        self.generate_shapes()
-
-    def generate_shapes(self):
-        """generate list containing all shapes exactly twice and
-        shuffle it"""
-        list_of_shape_forms = list(ShapeForms) + list(ShapeForms)
-        random.shuffle(list_of_shape_forms)
-        list_of_shapes = [Shape(shape_form, self.tetris_model.game_board, GRID_COL_COUNT // 2,
-                                GRID_ROW_COUNT - 1) for shape_form in list_of_shape_forms]
-        self.tetris_model.shapes = list_of_shapes + self.tetris_model.shapes
-
-    def pop_current_shape(self):
-        """remove current shape from list"""
-        if len(self.tetris_model.shapes) < 3:
-            self.generate_shapes()
-        self.tetris_model.shapes.pop()
+        super().__init__(tetris_model)
 
     def update(self):
         for event in pygame.event.get():
@@ -404,91 +473,10 @@ class TetrisControl:
                     if event.key == eval("pygame.K_" + key):
                         self.key_actions[key]()
 
-    def calculate_scores(self):
-        score_count = self.tetris_model.game_board.remove_full_rows()
-
-        # If cleared nothing, early return
-        if score_count == 0:
-            return
-        # Calculate total score based on algorithm
-        total_score = MULTI_SCORE_ALGORITHM(score_count)
-        # Callback
-        for callback in self.tetris_model.on_score_changed_callbacks:
-            callback(self.tetris_model.score, self.tetris_model.score + total_score)
-
-        self.tetris_model.score += total_score
-        self.tetris_model.lines += score_count
-        log("Cleared {} row{} with score {}".format(score_count, 's' if score_count > 1 else '', total_score), 3)
+    def calculate_scores(self) -> int:
+        score_count = super().calculate_scores()
         # Calculate game speed
-        if self.tetris_model.interactive:
+        if score_count > 0 and self.tetris_model.interactive:
             pygame.time.set_timer(pygame.USEREVENT + 1, SPEED_DEFAULT if not SPEED_SCALE_ENABLED else int(
                 max(25, SPEED_DEFAULT - self.tetris_model.score * SPEED_SCALE)))
-
-    def reset_game(self):
-        self.tetris_model.game_board.reset_board()
-        self.tetris_model.shapes.clear()
-        self.generate_shapes()
-        self.tetris_model.game_over = False
-
-        self.tetris_model.high_score = self.tetris_model.score
-        self.tetris_model.high_score_lines = self.tetris_model.lines
-        self.tetris_model.score = 0
-        self.tetris_model.lines = 0
-        self.tetris_model.fitness = 0
-
-    # GAME CONTROL METHODS
-    def toggle_pause(self):
-        """set paused of tetris model to true"""
-        self.tetris_model.paused = not self.tetris_model.paused
-
-    def move_shape(self, direc):
-        """
-        :param direc direction to which the shape is moved
-        moves shape left or right
-        """
-        self.tetris_model.get_current_shape().shift_to_direction(direc)
-
-    def _drop(self, prev_y):
-        # y coordinate was not changed -> shape can not be placed
-        if not self.tetris_model.get_current_shape().placed and prev_y == self.tetris_model.get_current_shape().y:
-            self.tetris_model.game_over = True
-        # shape was placed
-        elif self.tetris_model.get_current_shape().placed:
-            self.tetris_model.score += PER_STEP_SCORE_GAIN * (self.tetris_model.get_current_shape().y - prev_y)
-            # remove current shape from list
-            self.pop_current_shape()
-            self.calculate_scores()
-        # y value has changed
-        else:
-            self.tetris_model.score += PER_STEP_SCORE_GAIN
-
-    def drop(self, instant=False):
-        """
-        :param instant if true shape will be placed instantly
-        if false decreases y coordinate of shape if instant is false
-        """
-        y = self.tetris_model.get_current_shape().y
-        if instant:
-            self.tetris_model.get_current_shape().place_shape()
-            self._drop(y)
-        else:
-            self.tetris_model.get_current_shape().decrease_y()
-            # if shape is placed remove it from list
-            self._drop(y)
-
-    def rotate_tile(self, direc):
-        """
-        :param direc direction in which the shape is turned
-        turn shapes clockwise or counter clockwise
-        """
-        self.tetris_model.get_current_shape().turn_in_direction(direc)
-
-    def quit(self):
-        self.tetris_model.running = False
-
-
-def log(message, level):
-    if MIN_DEBUG_LEVEL > level:
-        return
-    current_time = datetime.now().strftime("%H:%M:%S:%f")[:-3]
-    print(f"[{level}] {current_time} >> {message}")
+        return score_count
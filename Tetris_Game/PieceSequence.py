@@ -0,0 +1,37 @@
+import random
+from functools import lru_cache
+
+from Tetris_Game.Settings import PIECE_SEQUENCE_CACHE_SIZE
+from Tetris_Game.Shape import ShapeForms
+
+
+class PieceSequence:
+    """
+    shape forms of a game in bags containing every shape form exactly twice. every bag is shuffled once and
+    reused by every game that plays this sequence
+    """
+
+    def __init__(self, seed=None):
+        """
+        :param seed: seed of the shuffles, random sequence if None
+        """
+        self.seed = seed
+        self.randomizer = random.Random(seed)
+        self.bags = []
+
+    def get_bag(self, index: int) -> tuple:
+        """
+        :param index: number of bags played before this bag
+        :return: shape forms of the bag in the order they are appended to the shapes of a game
+        """
+        while len(self.bags) <= index:
+            list_of_shape_forms = list(ShapeForms) + list(ShapeForms)
+            self.randomizer.shuffle(list_of_shape_forms)
+            self.bags.append(tuple(list_of_shape_forms))
+        return self.bags[index]
+
+
+@lru_cache(maxsize=PIECE_SEQUENCE_CACHE_SIZE)
+def get_piece_sequence(seed) -> PieceSequence:
+    """:return: sequence of the seed, shared by every game of this process with the same seed"""
+    return PieceSequence(seed)
@@ -15,6 +15,58 @@ FONT_NAME = "Consolas"
 # debug level
 MIN_DEBUG_LEVEL = 10
 
+# board implementation used by a tetris model, "column" (lists per column) or "bitboard" (integer bitmasks).
+# headless trainings of greedy agents can also use "batch", which plays all games of a generation at once in numpy
+BOARD_ENGINE = "column"
+
+# memory bound of the placement evaluations shared by all agents in bytes, 0 disables the cache
+EVALUATION_CACHE_SIZE = 32 * 1024 * 1024
+
+# headless training: a game ends after this number of placed shapes, workers default to the number of cores
+HEADLESS_MAX_PIECES = 500
+HEADLESS_WORKERS = None
+
+# every generation plays this number of seeded piece sequences, the fitness of an agent is its mean score
+PIECE_SEQUENCES_PER_GENERATION = 3
+# seed of the piece sequences of all generations, different sequences every training if None
+TRAINING_SEED = None
+# number of piece sequences kept by every process
+PIECE_SEQUENCE_CACHE_SIZE = 64
+
+# breeding of a generation: "best" breeds every child from the best agent and the next agent of the ranking,
+# "tournament" from the winners of two tournaments of GA_TOURNAMENT_SIZE agents. the GA_ELITES best agents are
+# kept without a change
+GA_SELECTION = "best"
+GA_ELITES = 1
+GA_TOURNAMENT_SIZE = 3
+
+# agent of a training, "greedy" (current shape only), "lookahead" (beam search with the preview shape)
+# or "expectimax" (lookahead averaged over the shapes after the preview shape)
+AGENT_TYPE = "greedy"
+# beam search of the lookahead agent: placements kept per shape, number of shapes searched,
+# score difference to the best placement above which placements are pruned and budget of every search
+LOOKAHEAD_BEAM_WIDTH = 5
+LOOKAHEAD_DEPTH = 2
+LOOKAHEAD_PRUNE_MARGIN = 25.0
+LOOKAHEAD_MAX_NODES = 2000
+LOOKAHEAD_TIME_BUDGET = 0.005  # seconds, None disables the limit
+
+# expectimax agent: number of unknown shapes searched, average over the current bag instead of all shapes,
+# placements kept per shape, budget of every search and number of cached chance nodes of every agent
+EXPECTIMAX_DEPTH = 1
+EXPECTIMAX_USE_BAG = True
+EXPECTIMAX_BEAM_WIDTH = 3
+EXPECTIMAX_MAX_NODES = 20000
+EXPECTIMAX_TIME_BUDGET = 0.05  # seconds, None disables the limit
+EXPECTIMAX_CACHE_SIZE = 100000
+# worker processes evaluating the leaves of rendered expectimax agents, 0 evaluates them in the main process
+EXPECTIMAX_WORKERS = 0
+# leaves of a search are split into this number of tasks for the workers
+EXPECTIMAX_CHUNKS_PER_SEARCH = 8
+
+# agents place their shape in one tick instead of letting it fall one row per tick, the score is the same
+TIME_SKIP = True
+
 # grid dimensions
 GRID_ROW_COUNT = 20
 GRID_COL_COUNT = 10
@@ -22,6 +74,41 @@ GRID_COL_COUNT = 10
 SCREEN_RATIO = 0.55
 MAX_FPS = 60
 
+# turbo mode of the rendered parallel games (toggled with t): every frame executes TURBO_STEPS_PER_FRAME steps,
+# or as many steps as fit into TURBO_FRAME_BUDGET seconds if None. only every TURBO_RENDER_EVERY-th frame is
+# drawn and TURBO_UNLIMITED removes the frame rate cap, with SIMULATION_THREAD both limit the simulation thread
+TURBO_MODE = False
+TURBO_STEPS_PER_FRAME = 10
+TURBO_FRAME_BUDGET = 1 / MAX_FPS
+TURBO_RENDER_EVERY = 1
+TURBO_UNLIMITED = False
+
+# rendered parallel games: at most MAX_VISIBLE_GAMES boards are drawn. with more agents the first
+# VISIBLE_TOP_GAMES boards show the best running games, the others a page of all games (page up / page down)
+MAX_VISIBLE_GAMES = 32
+VISIBLE_TOP_GAMES = 4
+
+# number of rendered texts kept by the views, 0 renders every text again
+TEXT_CACHE_SIZE = 512
+
+# rendered parallel games are simulated in a thread of their own, which publishes snapshots of the games that
+# the main thread draws at MAX_FPS. False alternates simulating and drawing in the main thread
+SIMULATION_THREAD = True
+
+# times the phases of the training and logs them after every generation, the timed methods are only wrapped
+# if it is enabled. PROFILE_GENERATIONS > 0 also profiles that many generations with cProfile
+INSTRUMENTATION = False
+PROFILE_GENERATIONS = 0
+PROFILE_FILE = None
+
+# jsonl file, or csv file if it ends with .csv, every generation appends its metrics to. None logs nothing
+METRICS_FILE = None
+
+# file the population is saved to every CHECKPOINT_EVERY generations, None saves nothing. main.py --resume continues
+# a training from it
+CHECKPOINT_FILE = None
+CHECKPOINT_EVERY = 1
+
 ALWAYS_DRAW = True
 STEP_ACTION = True
 
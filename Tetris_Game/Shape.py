@@ -3,6 +3,7 @@ from enum import Enum
 from Tetris_Game import Board
 from Tetris_Game.Controls import Turn, Direction
 from Tetris_Game.Settings import *
+from Tetris_Game.ShapeOrientations import SHAPE_ORIENTATIONS
 
 
 class ShapeForms(Enum):
@@ -32,37 +33,35 @@ class Shape:
         :param y: y-position of the shape
         """
 
-        # find the correct shape and saveit as list representation
+        # find the correct shape
         if shape_form == ShapeForms.I_SHAPE:
-            self.shape = I_shape
             self.name = SHAPE_CHARS[0]
             self.max_number_of_turns = 1
         elif shape_form == ShapeForms.O_SHAPE:
-            self.shape = O_shape
             self.name = SHAPE_CHARS[1]
             self.max_number_of_turns = 0
         elif shape_form == ShapeForms.T_SHAPE:
-            self.shape = T_shape
             self.name = SHAPE_CHARS[2]
             self.max_number_of_turns = 3
         elif shape_form == ShapeForms.J_SHAPE:
-            self.shape = J_shape
             self.name = SHAPE_CHARS[3]
             self.max_number_of_turns = 3
         elif shape_form == ShapeForms.L_SHAPE:
-            self.shape = L_shape
             self.name = SHAPE_CHARS[4]
             self.max_number_of_turns = 3
         elif shape_form == ShapeForms.S_SHAPE:
-            self.shape = S_shape
             self.name = SHAPE_CHARS[5]
             self.max_number_of_turns = 1
         elif shape_form == ShapeForms.Z_SHAPE:
-            self.shape = Z_shape
             self.name = SHAPE_CHARS[6]
             self.max_number_of_turns = 1
         else:
             raise ValueError("Value {} is no valid shape form".format(shape_form))
+        self.shape_form = shape_form
+        # all orientations of the shape, the current one is the shape turned left turns times
+        self.orientations = SHAPE_ORIENTATIONS[int(shape_form)]
+        self.turns = 0
+        self.shape = self.orientations[0].shape
         # initial position
         self.x = x
         self.y = y
@@ -77,17 +76,26 @@ class Shape:
         :param direction: the direction to which the shape should be turned
         :return: turned list representation of the shape
         """
+        return self.orientations[self._turns_after(direction)].shape
+
+    def _turns_after(self, direction) -> int:
+        """
+        :param direction: the direction to which the shape should be turned
+        :return: index of the orientation after turning the shape
+        """
         # check if direction is right or left
         if direction.value == Turn.RIGHT_TURN.value:
-            # return right turned list representation of the shape
-            return list(zip(*self.shape[::-1]))
+            return (self.turns - 1) % len(self.orientations)
         elif direction.value == Turn.LEFT_TURN.value:
-            # return left turned list representation of the shape
-            return list(zip(*[e[::-1] for e in self.shape]))
+            return (self.turns + 1) % len(self.orientations)
         else:
             # given direction was not valid
             raise ValueError("Wrong value direction should be {} or {}".format(Turn.LEFT_TURN, Turn.RIGHT_TURN))
 
+    def get_orientation(self):
+        """:return: current orientation of the shape"""
+        return self.orientations[self.turns]
+
     def get_y_distance_to_collision(self) -> int:
         """
         finds the distance until the shape collides with something (placed shape or bottom of board)
@@ -95,7 +103,7 @@ class Shape:
         :return: distance to collision from this shape
         """
         if self.y_distance_to_collision == -1:
-            self.y_distance_to_collision = self.board.distance_to_collision(self.shape, self.x, self.y)
+            self.y_distance_to_collision = self.board.get_landing_distance(self.get_orientation(), self.x, self.y)
             return self.y_distance_to_collision
         # correct distance is already known
         return self.y_distance_to_collision
@@ -118,7 +126,7 @@ class Shape:
         if self.placed: raise ValueError("shape is already placed and should not decrease y any further")
         # if distance not set, find distance to collision
         if self.y_distance_to_collision == -1:
-            self.y_distance_to_collision = self.board.distance_to_collision(self.shape, self.x, self.y)
+            self.y_distance_to_collision = self.board.get_landing_distance(self.get_orientation(), self.x, self.y)
         # check if shape is already at bottom
         if self.y_distance_to_collision <= 0:
             # place shape on board
@@ -128,6 +136,20 @@ class Shape:
         self.y -= 1
         self.y_distance_to_collision -= 1
 
+    def fall_to_landing_row(self) -> int:
+        """
+        moves the shape down to the lowest row it can reach without placing it
+
+        :return: number of rows the shape fell
+        """
+        if self.placed: raise ValueError("shape is already placed and should not decrease y any further")
+        distance = self.get_y_distance_to_collision()
+        if distance <= 0:
+            return 0
+        self.y -= distance
+        self.y_distance_to_collision = 0
+        return distance
+
     def shift_to_direction(self, direction: Direction) -> bool:
         """
         shifts the shape left or right
@@ -153,10 +175,12 @@ class Shape:
         :returns if shape was turned
         """
         # check how shape would look after turn
-        potential_shape_structure = self.turned(direction)
+        potential_turns = self._turns_after(direction)
+        potential_shape_structure = self.orientations[potential_turns].shape
         # check if new shape would have collision
         if self.board.has_collision(potential_shape_structure, self.x, self.y): return False
         # -> shape can be turned safely
+        self.turns = potential_turns
         self.shape = potential_shape_structure
         # distance is set to not known
         self.y_distance_to_collision = -1
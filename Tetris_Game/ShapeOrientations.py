@@ -0,0 +1,54 @@
+from Tetris_Game.Settings import *
+
+
+class ShapeOrientation:
+    def __init__(self, shape, turns: int):
+        """
+        :param shape: list representation of the shape in this orientation
+        :param turns: number of left turns from the starting orientation of the shape
+        """
+        self.shape = tuple(tuple(line) for line in shape)
+        self.turns = turns
+        self.width = len(shape)
+        self.height = len(shape[0])
+        # (rel_x, row) of every filled cell, rows are counted upwards from the lowest row of the shape
+        self.cells = tuple((rel_x, self.height - 1 - rel_y) for rel_x, line in enumerate(shape)
+                           for rel_y, val in enumerate(line) if val != 0)
+        # lowest and highest filled row of every column of the shape
+        self.lowest_cells = tuple(min(row for cell_x, row in self.cells if cell_x == rel_x)
+                                  for rel_x in range(self.width))
+        self.highest_cells = tuple(max(row for cell_x, row in self.cells if cell_x == rel_x)
+                                   for rel_x in range(self.width))
+        # number of filled cells in every row of the shape
+        self.row_counts = tuple(len([row for cell_x, row in self.cells if row == rel_row])
+                                for rel_row in range(self.height))
+
+
+def turned_left(shape) -> list:
+    """:return: left turned list representation of the shape"""
+    return list(zip(*[e[::-1] for e in shape]))
+
+
+def _build_orientations(shape) -> tuple:
+    """:return: every distinct orientation of the shape ordered by the number of left turns"""
+    orientations = []
+    shapes = []
+    shape = tuple(tuple(line) for line in shape)
+    # turn shape left until it looks like its starting orientation again
+    while shape not in shapes:
+        orientations.append(ShapeOrientation(shape, len(orientations)))
+        shapes.append(shape)
+        shape = tuple(turned_left(shape))
+    return tuple(orientations)
+
+
+# all orientations of every shape, built once and indexed by the shape id
+SHAPE_ORIENTATIONS = {
+    SHAPES_ID['I']: _build_orientations(I_shape),
+    SHAPES_ID['O']: _build_orientations(O_shape),
+    SHAPES_ID['T']: _build_orientations(T_shape),
+    SHAPES_ID['J']: _build_orientations(J_shape),
+    SHAPES_ID['L']: _build_orientations(L_shape),
+    SHAPES_ID['S']: _build_orientations(S_shape),
+    SHAPES_ID['Z']: _build_orientations(Z_shape),
+}
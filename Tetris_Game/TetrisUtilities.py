@@ -1,6 +1,15 @@
+from datetime import *
+
 from Tetris_Game.Settings import *
 
 
 def get_color_tuple(color_hex="11c5bf"):
     color_hex_temp = color_hex.replace("#", "")
     return tuple(int(color_hex_temp[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def log(message, level):
+    if MIN_DEBUG_LEVEL > level:
+        return
+    current_time = datetime.now().strftime("%H:%M:%S:%f")[:-3]
+    print(f"[{level}] {current_time} >> {message}")
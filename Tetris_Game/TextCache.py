@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+import pygame
+
+from Tetris_Game.Settings import FONT_NAME, TEXT_CACHE_SIZE
+
+
+class TextCache:
+    """
+    least recently used cache of rendered texts. fonts are looked up once for every name and size, so static
+    texts like titles and the controls are rendered only once
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        :param max_entries: number of rendered texts, least recently used texts are evicted above it
+        """
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_font(self, size: int, name=FONT_NAME) -> pygame.font.Font:
+        """:return: font of the name and size, the system font lookup is done at its first use"""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text: str, size: int, color: tuple, name=FONT_NAME) -> pygame.Surface:
+        """
+        :return: rendered text like font.render without antialiasing, the surface is shared and must not be
+        changed
+        """
+        key = (text, size, color, name)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.get_font(size, name).render(text, False, color)
+        if self.max_entries > 0:
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+                self.evictions += 1
+        return surface
+
+    def get_hit_rate(self) -> float:
+        """:return: share of texts that were not rendered again"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def clear(self):
+        """removes every text and font, counters are kept"""
+        self.surfaces.clear()
+        self.fonts.clear()
+
+    def __len__(self):
+        return len(self.surfaces)
+
+
+# texts of every view of this process
+_text_cache = None
+
+
+def get_text_cache() -> TextCache:
+    """:return: text cache shared by every view"""
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = TextCache(TEXT_CACHE_SIZE)
+    return _text_cache
@@ -0,0 +1,52 @@
+import pygame
+
+from Tetris_Game.Settings import *
+from Tetris_Game.TetrisUtilities import get_color_tuple
+
+
+class TileAtlas:
+    """tiles of every shape pre-rendered once for a grid size, indexed by the shape id"""
+
+    def __init__(self, grid_size: int):
+        self.grid_size = grid_size
+        # index 0 is not used, shape ids start at 1
+        self.tiles = [None] + [self._render_tile(val) for val in range(1, len(SHAPE_CHARS) + 1)]
+        self.outlines = [None] + [self._render_outline(val) for val in range(1, len(SHAPE_CHARS) + 1)]
+
+    def _render_tile(self, val) -> pygame.Surface:
+        """:return: filled tile with border and highlight triangle"""
+        size = self.grid_size
+        tile = pygame.Surface((size, size))
+        pygame.draw.rect(tile, get_color_tuple(COLORS.get("TILE_" + SHAPE_CHARS[val - 1])), (0, 0, size, size))
+        pygame.draw.rect(tile, get_color_tuple(COLORS.get("BACKGROUND_BLACK")), (0, 0, size, size), 1)
+        # Draw highlight triangle
+        offset = int(size / 10)
+        pygame.draw.polygon(tile, get_color_tuple(COLORS.get("TRIANGLE_GRAY")),
+                            ((offset, offset), (3 * offset, offset), (offset, 3 * offset)))
+        return self._convert(tile, False)
+
+    def _render_outline(self, val) -> pygame.Surface:
+        """:return: transparent tile with only an outline for the prediction location"""
+        size = self.grid_size
+        outline = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.rect(outline, get_color_tuple(COLORS.get("TILE_" + SHAPE_CHARS[val - 1])),
+                         (1, 1, size - 2, size - 2), 1)
+        return self._convert(outline, True)
+
+    @staticmethod
+    def _convert(surface: pygame.Surface, alpha: bool) -> pygame.Surface:
+        """:return: surface in the pixel format of the screen if it already exists, blits are faster then"""
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            return surface.convert_alpha() if alpha else surface.convert()
+        return surface
+
+
+# atlases of every grid size that was drawn, shared by every view
+_tile_atlases = {}
+
+
+def get_tile_atlas(grid_size: int) -> TileAtlas:
+    """:return: atlas of the grid size, rendered at its first use"""
+    if grid_size not in _tile_atlases:
+        _tile_atlases[grid_size] = TileAtlas(grid_size)
+    return _tile_atlases[grid_size]
@@ -1,10 +1,40 @@
-import cProfile
-import pstats
+import argparse
 
 from Parallel.TetrisParallel import TetrisParallel
 from Tetris_Game.MainGame import Tetris
-from Tetris_Game.Settings import I_shape, SPEED_DEFAULT
+from Tetris_Game.Settings import AGENT_TYPE, BOARD_ENGINE, CHECKPOINT_EVERY, CHECKPOINT_FILE, HEADLESS_WORKERS, \
+    INSTRUMENTATION, METRICS_FILE, PROFILE_GENERATIONS, TURBO_MODE, I_shape, SPEED_DEFAULT
 
 if __name__ == '__main__':
-    TetrisParallel(18)
+    parser = argparse.ArgumentParser(description="Trains tetris agents with a genetic algorithm")
+    parser.add_argument("--agents", type=int, default=18, help="number of agents of every generation")
+    parser.add_argument("--headless", action="store_true", help="train in worker processes without rendering")
+    parser.add_argument("--workers", type=int, default=HEADLESS_WORKERS,
+                        help="number of worker processes of headless training")
+    parser.add_argument("--generations", type=int, default=None, help="number of generations of headless training")
+    parser.add_argument("--board-engine", default=BOARD_ENGINE,
+                        help="board of the games, column, bitboard or batch (headless greedy training only)")
+    parser.add_argument("--agent-type", default=AGENT_TYPE,
+                        help="agent of the population, greedy, lookahead or expectimax")
+    parser.add_argument("--turbo", action="store_true", default=TURBO_MODE,
+                        help="advance rendered games independent of the timer")
+    parser.add_argument("--instrument", action="store_true", default=INSTRUMENTATION,
+                        help="log the time of every phase after every generation")
+    parser.add_argument("--profile-generations", type=int, default=PROFILE_GENERATIONS,
+                        help="profile this number of generations with cProfile")
+    parser.add_argument("--metrics", default=METRICS_FILE,
+                        help="jsonl or csv file the metrics of every generation are appended to")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE,
+                        help="file the population is saved to, the resumed file if not set")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+                        help="number of generations between two checkpoints")
+    parser.add_argument("--resume", default=None, help="checkpoint the training continues from")
+    args = parser.parse_args()
+    checkpoint_file = args.checkpoint if args.checkpoint is not None else args.resume
+
+    TetrisParallel(args.agents, board_engine=args.board_engine, headless=args.headless, number_of_workers=args.workers,
+                   number_of_generations=args.generations, agent_type=args.agent_type,
+                   turbo=args.turbo, instrument=args.instrument, profile_generations=args.profile_generations,
+                   metrics_file=args.metrics, checkpoint_file=checkpoint_file,
+                   checkpoint_every=args.checkpoint_every, resume_file=args.resume)
     # Tetris(scale=1.0)